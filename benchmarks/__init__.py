@@ -0,0 +1,2 @@
+# __init__.py
+# 패키지 인식용 초기화 파일
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+질문 Hash 조회 경로 벤치마크 (HGETALL + 문자열 디코딩 vs HMGET 필드 투영 + bytes 디코딩)
+
+    python -m benchmarks.bench_question_fetch --n 20000 --extra-bytes 512
+    python -m benchmarks.bench_question_fetch --fake          # Redis 없이 fakeredis 로 실행
+
+  - 벤치마크 전용 방(room=bench-fetch-*)에 N개 질문을 심고 끝나면 삭제한다
+  - --extra-bytes: 응답에 쓰지 않는 필드(첨부/메타데이터 등)를 흉내 낸 크기
+  - 결과는 JSON 한 줄로 출력 (경로별 best/median 초, 질문/초)
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import Any, Dict, List
+
+from models.max_slide_report import Question
+from services.question_fetch import TOP_SLIDE_FIELDS, decode_top_slide_question, hmget_questions
+
+
+def _clients(url: str, fake: bool):
+    if fake:
+        import fakeredis  # type: ignore
+
+        server = fakeredis.FakeServer()
+        return (
+            fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+            fakeredis.FakeAsyncRedis(server=server),
+        )
+    from redis import asyncio as aioredis
+
+    return (
+        aioredis.from_url(url, decode_responses=True),
+        aioredis.from_url(url, decode_responses=False),
+    )
+
+
+async def _seed(r, room_id: str, n: int, extra_bytes: int) -> List[str]:
+    qids = [uuid.uuid4().hex for _ in range(n)]
+    extra = "x" * extra_bytes
+    pipe = r.pipeline(transaction=False)
+    for i, qid in enumerate(qids):
+        row: Dict[str, Any] = dict(
+            id=qid, roomId=room_id, slide=i % 20 + 1, audienceId=f"aud-{i % 300}",
+            content=f"{i}번 질문입니다. 이 부분 다시 설명해 주실 수 있나요?", ts=1700000000000 + i,
+        )
+        if extra_bytes:
+            row["meta"] = extra
+        pipe.hset(f"room:{room_id}:question:{qid}", mapping=row)
+        if len(pipe) >= 1000:
+            await pipe.execute()
+    await pipe.execute()
+    return qids
+
+
+async def _old_path(r, room_id: str, qids: List[str], chunk: int) -> int:
+    # 기존 경로: decode_responses=True 클라이언트로 HGETALL → dict → Question
+    n = 0
+    for i in range(0, len(qids), chunk):
+        pipe = r.pipeline()
+        for qid in qids[i:i + chunk]:
+            pipe.hgetall(f"room:{room_id}:question:{qid}")
+        for qid, row in zip(qids[i:i + chunk], await pipe.execute()):
+            if not row:
+                continue
+            Question(
+                id=qid,
+                slide=int(row.get("slide", 0)),
+                content=row.get("content", ""),
+                ts=int(row.get("ts", "0")),
+                audienceId=row.get("audienceId"),
+            )
+            n += 1
+    return n
+
+
+async def _new_path(r_raw, room_id: str, qids: List[str], chunk: int) -> int:
+    # 새 경로: raw 클라이언트로 HMGET(필요 필드) → bytes 에서 직접 Question
+    n = 0
+    for i in range(0, len(qids), chunk):
+        ids = qids[i:i + chunk]
+        for qid, values in zip(ids, await hmget_questions(r_raw, room_id, ids, TOP_SLIDE_FIELDS)):
+            if decode_top_slide_question(qid, values, 0) is not None:
+                n += 1
+    return n
+
+
+async def _time(fn, repeat: int) -> Dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        runs.append(time.perf_counter() - t0)
+    return {"best": min(runs), "median": statistics.median(runs)}
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    from redis.utils import HIREDIS_AVAILABLE
+
+    r, r_raw = _clients(args.redis_url, args.fake)
+    room_id = f"bench-fetch-{uuid.uuid4().hex[:8]}"
+    qids = await _seed(r, room_id, args.n, args.extra_bytes)
+    try:
+        assert await _old_path(r, room_id, qids, args.chunk) == await _new_path(r_raw, room_id, qids, args.chunk)
+        old = await _time(lambda: _old_path(r, room_id, qids, args.chunk), args.repeat)
+        new = await _time(lambda: _new_path(r_raw, room_id, qids, args.chunk), args.repeat)
+    finally:
+        pipe = r.pipeline(transaction=False)
+        for qid in qids:
+            pipe.delete(f"room:{room_id}:question:{qid}")
+        await pipe.execute()
+        await r.aclose()
+        await r_raw.aclose()
+
+    return {
+        "bench": "question_fetch",
+        "n": args.n,
+        "extraBytes": args.extra_bytes,
+        "chunk": args.chunk,
+        "parser": "hiredis" if HIREDIS_AVAILABLE else "python",
+        "backend": "fakeredis" if args.fake else "redis",
+        "hgetall": {**old, "qps": args.n / old["best"]},
+        "hmget": {**new, "qps": args.n / new["best"]},
+        "speedup": old["best"] / new["best"],
+    }
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--n", type=int, default=20000, help="방 질문 수")
+    p.add_argument("--extra-bytes", type=int, default=0, help="응답에 쓰지 않는 필드 크기")
+    p.add_argument("--chunk", type=int, default=500, help="파이프라인 청크 크기 (READER_CHUNK_SIZE)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--redis-url", default="redis://localhost:6379/15")
+    p.add_argument("--fake", action="store_true", help="fakeredis 사용 (경로 검증용, 수치는 참고만)")
+    print(json.dumps(asyncio.run(main(p.parse_args())), ensure_ascii=False))
@@ -0,0 +1,171 @@
+"""
+text_sim 단계별 + TOP3 클러스터링 마이크로 벤치마크
+
+    python -m benchmarks.bench_text_sim                          # 100/1k/10k/50k, 스텁 임베더
+    python -m benchmarks.bench_text_sim --sizes 1000,10000 --repeat 5
+    python -m benchmarks.bench_text_sim --embedder model         # 실제 KR-SBERT (모델 다운로드 필요)
+    python -m benchmarks.bench_text_sim --out now.json --baseline prev.json
+
+  - 입력은 benchmarks.synth_questions (같은 seed 면 커밋이 달라도 같은 질문)
+  - 단계: normalize / char_ngrams / murmur64(_batch) / simhash64(_many) / hamming_many / jaccard /
+          char_ngrams_multi / build_idf / tfidf_vector / cosine_dict / embed / cluster / top3
+    cluster 는 build_top3 의 CPU 구간(_fold_questions: 전처리 + 그룹 합류)과 같고, top3 는 순위/응답 변환
+  - 스텁 임베더: 문자 2-gram 해싱 벡터(768차원, L2 정규화). 모델 없이 돌고 결과가 결정적이라
+    cluster 결과(그룹 수/TOP3 크기)까지 커밋 간에 비교할 수 있다 (값 자체는 실제 모델과 다름)
+  - 결과는 JSON (단계별 best/median 초, 초당 처리량). --baseline 을 주면 이전 결과 대비 배율을 붙인다
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# top3_service → core.db 임포트에 DB_URL 이 필요 (엔진만 만들고 벤치마크 중 DB 에 연결하지 않음)
+os.environ.setdefault("DB_URL", "mysql://localhost:3306/bench")
+
+from benchmarks.synth_questions import generate_questions
+from services import text_sim as TS
+
+STUB_DIM = 768           # KR-SBERT 출력 차원과 동일
+HAMMING_POOL = 1024      # hamming_many 비교 대상 수 (방 하나의 대략적인 그룹 수)
+SLOW_RUN_SEC = 5.0       # 한 번에 이보다 오래 걸리는 단계는 반복하지 않음 (50k 클러스터링 등)
+
+
+def stub_embed(texts: List[str], dim: int = STUB_DIM) -> np.ndarray:
+    # 문자 2-gram 을 crc32 로 차원/부호 해싱 → 표면이 비슷한 문장끼리 코사인이 높음
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, t in enumerate(texts):
+        for g in TS.char_ngrams(t, 2):
+            h = zlib.crc32(g.encode("utf-8"))
+            out[i, h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return out / norms
+
+
+def _model_embed(texts: List[str]) -> np.ndarray:
+    from services.top3_service import _embed_batch
+
+    return _embed_batch(texts)
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> Tuple[Dict[str, float], Any]:
+    runs: List[float] = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - t0)
+        if runs[-1] > SLOW_RUN_SEC:
+            break
+    return {"best": min(runs), "median": statistics.median(runs), "runs": len(runs)}, result
+
+
+def _pairs(n: int, seed: int) -> List[Tuple[int, int]]:
+    rng = random.Random(seed)
+    return [(i, rng.randrange(n)) for i in range(n)]
+
+
+def bench_size(n: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from services.top3_service import _fold_questions, _to_report
+
+    qs = generate_questions(n, room_id=f"bench-{n}", seed=args.seed)
+    texts = [q.content for q in qs]
+    pairs = _pairs(n, args.seed)
+    rows: List[Dict[str, Any]] = []
+
+    def run(stage: str, fn: Callable[[], Any], items: int, **extra: Any) -> Any:
+        timing, result = _time(fn, args.repeat)
+        rows.append({"stage": stage, "n": n, "items": items, **timing,
+                     "perSec": items / timing["best"] if timing["best"] else None, **extra})
+        return result
+
+    norms = run("normalize", lambda: [TS.normalize(t) for t in texts], n)
+    shingles = run("char_ngrams", lambda: [TS.char_ngrams(s, 2) for s in norms], n)
+    feats = [g for sh in shingles for g in sh]
+    run("murmur64", lambda: [TS.murmur64(g) for g in feats], len(feats))
+    simhs = run("simhash64", lambda: [TS.simhash64(sh) for sh in shingles], n)
+    batch = run("simhash64_many", lambda: TS.simhash64_many(shingles), n)
+    assert batch.tolist() == simhs, "simhash64_many 결과가 simhash64 와 다름"
+    run("murmur64_batch", lambda: TS.murmur64_batch(feats), len(feats))
+    pool = np.array(simhs[:HAMMING_POOL], dtype=np.uint64)
+    run("hamming_many", lambda: [TS.hamming_many(h, pool) for h in simhs], n, pool=len(pool))
+    run("jaccard", lambda: [TS.jaccard(shingles[a], shingles[b]) for a, b in pairs], len(pairs))
+
+    toks = run("char_ngrams_multi", lambda: [TS.char_ngrams_multi(t) for t in texts], n)
+    idf = run("build_idf", lambda: TS.build_idf(toks), n)
+    rows[-1]["vocab"] = len(idf)
+    vecs = run("tfidf_vector", lambda: [TS.tfidf_vector(t, idf) for t in toks], n)
+    run("cosine_dict", lambda: [TS.cosine_dict(vecs[a], vecs[b]) for a, b in pairs], len(pairs))
+
+    embed = stub_embed if args.embedder == "stub" else _model_embed
+    embs = run("embed", lambda: embed(norms), n, embedder=args.embedder)
+    index = run("cluster", lambda: _fold_questions(None, qs, norms, embs), n)
+    report = run("top3", lambda: _to_report(qs[0].roomId, n, index), n)
+    rows[-2]["groups"] = report.uniqueGroups
+    rows[-1]["top3Counts"] = [t.count for t in report.top3]
+    return rows
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _attach_baseline(rows: List[Dict[str, Any]], path: str) -> None:
+    # 이전 결과 대비 배율 (>1 이면 느려짐)
+    with open(path, encoding="utf-8") as f:
+        prev = {(r["stage"], r["n"]): r for r in json.load(f)["results"]}
+    for r in rows:
+        p = prev.get((r["stage"], r["n"]))
+        if p and p["best"]:
+            r["vsBaseline"] = r["best"] / p["best"]
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    rows: List[Dict[str, Any]] = []
+    for n in sizes:
+        t0 = time.perf_counter()
+        rows.extend(bench_size(n, args))
+        print(f"[bench] n={n} 완료 ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+    if args.baseline:
+        _attach_baseline(rows, args.baseline)
+    return {
+        "bench": "text_sim",
+        "commit": _git_rev(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "embedder": args.embedder,
+        "results": rows,
+    }
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--sizes", default="100,1000,10000,50000", help="질문 수 목록 (쉼표 구분)")
+    p.add_argument("--repeat", type=int, default=3, help="단계별 반복 횟수 (best/median 계산)")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--embedder", choices=("stub", "model"), default="stub")
+    p.add_argument("--out", help="결과 JSON 저장 경로 (없으면 stdout)")
+    p.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = p.parse_args()
+    result = json.dumps(main(args), ensure_ascii=False, indent=1)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(result)
+    else:
+        print(result)
@@ -0,0 +1,109 @@
+"""
+벤치마크/부하 테스트용 합성 한국어 질문 생성기
+
+    from benchmarks.synth_questions import generate_questions
+    qs = generate_questions(10000, room_id="bench", seed=7)
+
+  - 주제(명사구) x 문장 틀로 질문을 만들고, 일부는 다음과 같이 변형해 실제 방과 비슷한 분포를 만든다
+      near-duplicate : 앞에서 나온 질문을 띄어쓰기/문장부호/오타/이모티콘만 바꿔 다시 씀
+      paraphrase     : 같은 주제를 다른 문장 틀로 씀
+      noise          : 무작위 음절열, "ㅋㅋ", "!!" 같은 짧은 잡음, 주제 없는 일회성 질문
+  - 주제 수는 질문 수에 비례 (n / TOPIC_DIVISOR) → 방 크기가 커져도 그룹 수가 현실적으로 늘어남
+    (형용사 x 명사 조합보다 주제가 많으면 고유명사를 붙여 구분)
+  - 같은 seed 면 항상 같은 질문 목록 (커밋 간 결과 비교용)
+"""
+import random
+from typing import List, Optional
+
+from models.question_report import QuestionRecord
+
+TOPIC_DIVISOR = 25  # 주제 1개당 평균 질문 수
+
+_ADJ = [
+    "분산", "비동기", "실시간", "대용량", "캐시", "트랜잭션", "인덱스", "배포", "보안", "테스트",
+    "모니터링", "로그", "스트리밍", "배치", "검색", "추천", "결제", "인증", "알림", "임베딩",
+]
+_NOUN = [
+    "처리 방식", "설계", "성능", "구조", "전략", "장애 대응", "비용", "한계", "적용 사례", "설정 방법",
+    "운영 경험", "도입 이유", "대안", "병목", "확장성", "일관성", "자동화", "튜닝", "데이터 모델", "API",
+]
+_TEMPLATES = [
+    "{s}은 어떻게 하셨나요?",
+    "{s}에 대해 좀 더 자세히 설명해 주실 수 있나요?",
+    "{s} 관련해서 참고할 만한 자료가 있을까요",
+    "{s}을 선택하신 이유가 궁금합니다",
+    "혹시 {s} 예시 코드도 공유 가능한가요?",
+    "{s}에서 가장 어려웠던 점은 무엇인가요",
+    "{s} 부분 다시 한 번 설명 부탁드려요!",
+    "{s}이 실제 서비스에서도 잘 동작하나요?",
+    "발표에서 말씀하신 {s} 말고 다른 방법은 없나요?",
+    "{s} 쪽은 팀에서 어떻게 나눠서 작업하셨나요",
+]
+_TAILS = ["", "", "", " ㅎㅎ", " ㅋㅋ", "??", " !!", " 🙏", " 😀", "..."]
+_SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초"
+_SHORT_NOISE = ["ㅋㅋㅋ", "!!", "?", "ㅎㅇ", "좋아요", "감사합니다", "잘 들었습니다", "👍", "ㅠㅠ"]
+
+
+def _perturb(rng: random.Random, s: str) -> str:
+    # near-duplicate: 의미는 그대로 두고 표면만 살짝 바꿈
+    k = rng.random()
+    if k < 0.25:
+        s = s.replace(" ", "", 1) if " " in s else s + " "
+    elif k < 0.5:
+        s = s.rstrip("?!. ") + rng.choice(["?", "??", "!", ".", ""])
+    elif k < 0.75 and len(s) > 4:
+        i = rng.randrange(len(s))
+        if "가" <= s[i] <= "힣":
+            s = s[:i] + rng.choice(_SYLLABLES) + s[i + 1:]  # 오타 1글자
+    return s + rng.choice(_TAILS)
+
+
+def _noise(rng: random.Random) -> str:
+    k = rng.random()
+    if k < 0.4:
+        return rng.choice(_SHORT_NOISE)
+    if k < 0.7:
+        return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 14)))
+    return rng.choice(_TEMPLATES).format(s=f"{rng.choice(_SYLLABLES)}{rng.choice(_SYLLABLES)} {rng.choice(_NOUN)}")
+
+
+def generate_questions(
+    n: int,
+    room_id: str = "bench",
+    seed: int = 7,
+    dup_ratio: float = 0.3,
+    para_ratio: float = 0.3,
+    noise_ratio: float = 0.15,
+    slides: int = 20,
+    topics: Optional[int] = None,
+) -> List[QuestionRecord]:
+    rng = random.Random(seed)
+    n_topics = topics or max(3, n // TOPIC_DIVISOR)
+    subjects = [f"{rng.choice(_ADJ)} {rng.choice(_NOUN)}" for _ in range(n_topics)]
+    if n_topics > len(_ADJ) * len(_NOUN):
+        # 조합이 모자라는 큰 방: 서비스/라이브러리 이름 같은 고유명사를 붙여 주제를 구분
+        subjects = [f"{''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))} {s}" for s in subjects]
+    # 인기 주제가 몰리도록 가중치를 둠 (상위 몇 개 주제가 TOP3 로 뽑히는 실제 분포와 비슷하게)
+    weights = [1.0 / (i + 1) ** 0.8 for i in range(n_topics)]
+
+    out: List[QuestionRecord] = []
+    for i in range(n):
+        k = rng.random()
+        if out and k < dup_ratio:
+            content = _perturb(rng, rng.choice(out).content)
+        elif k < dup_ratio + noise_ratio:
+            content = _noise(rng)
+        else:
+            # 새 질문과 paraphrase 모두 주제 x 문장 틀 (paraphrase 는 같은 주제가 다른 틀로 반복되는 것)
+            subject = rng.choices(subjects, weights)[0]
+            templates = _TEMPLATES if k < dup_ratio + noise_ratio + para_ratio else _TEMPLATES[:3]
+            content = rng.choice(templates).format(s=subject) + rng.choice(_TAILS)
+        out.append(QuestionRecord(
+            id=f"q{i:07d}",
+            roomId=room_id,
+            slide=rng.randint(1, slides),
+            audienceId=f"aud-{rng.randrange(max(1, n // 3))}",
+            content=content,
+            ts=1700000000000 + i * 137,
+        ))
+    return out
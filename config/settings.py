@@ -6,6 +6,7 @@ class Settings(BaseSettings):
     APP_NAME: str = "Boini AI Report"
     API_PREFIX: str = "/report"
     REDIS_URL: str = "redis://redis:6379/0"
+    REDIS_PROTOCOL: int = 2               # 2=RESP2, 3=RESP3 (Redis 6+ 에서만 3 사용)
     ALLOW_ORIGINS: str = (
         "http://localhost:8080, "
         "http://localhost:5173, "
@@ -18,6 +19,92 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None  # [추가] 없으면 요약 기능 비활성
     OPENAI_MODEL: str = "gpt-4o-mini"     # [추가] 기본 요약 모델
     SUMMARY_MAX_LINES: int = 3            # [추가] 요약 줄 수 (기본 3줄)
+    OPENAI_BASE_URL: Optional[str] = None # 호환 엔드포인트/로컬 스텁 서버 주소 (없으면 기본값)
+    LLM_TIMEOUT_SEC: float = 15.0         # 호출당 타임아웃
+    LLM_MAX_RETRIES: int = 2              # 타임아웃/429/5xx 재시도 횟수
+    LLM_RETRY_BACKOFF_SEC: float = 0.5    # 재시도 백오프 시작값 (지수 증가)
+    LLM_MAX_CONCURRENCY: int = 8          # 동시 LLM 호출 수
+    LLM_MAX_CONNECTIONS: int = 16         # HTTP 커넥션 풀 크기
+    SUMMARY_CACHE_TTL_SEC: int = 60 * 60 * 24 * 7  # 요약 캐시 TTL (입력 해시 기반이라 길게 유지)
+
+    # ===== 임베딩 설정 =====
+    EMB_BATCH_SIZE: int = 64              # encode 한 번에 넣을 문장 수
+    EMB_CACHE_SIZE: int = 20000           # 프로세스 내 LRU 임베딩 캐시 최대 항목 수
+    EMB_CACHE_REDIS: bool = True          # Redis 2차 캐시 사용 여부
+    EMB_CACHE_TTL_SEC: int = 60 * 60 * 24 # Redis 임베딩 TTL (질문 해시 TTL과 동일하게)
+    TOP3_INCREMENTAL: bool = True         # 방별 클러스터 상태 + 워터마크 기반 증분 TOP3
+    TOP3_STATE_MAX_IDS: int = 200         # 증분 상태에 클러스터별로 남길 질문 ID 수 (응답은 멤버 ZSET 에서 전체를 읽음)
+    TOP3_STATE_MAX_SAMPLES: int = 3       # 증분 상태에 클러스터별로 남길 샘플 문장 수
+    TOP3_REBUILD_NEW_SHARE: float = 0.2   # 마지막 전체 계산 이후 질문이 방 전체의 이 비율을 넘으면 전체 재계산
+    TOP3_REBUILD_EVERY: int = 50          # 증분 반영이 이 횟수만큼 쌓이면 전체 재계산
+    EMB_WARMUP: bool = True               # 기동 시 백그라운드로 모델 로드 + 워밍업 encode (READY_REQUIRES_MODEL=True 면 이 값은 무시되고 항상 로드)
+    READY_REQUIRES_MODEL: bool = True     # /ready 가 모델 로드 완료까지 기다릴지 (/top-slide 전용 파드·지연 로드는 False)
+
+    # ===== 질문 조회 (스트리밍) =====
+    READER_PAGE_SIZE: int = 2000          # ZRANGEBYSCORE LIMIT 페이지 크기
+    READER_CHUNK_SIZE: int = 500          # 질문 Hash 파이프라인/임베딩 배치 청크 크기
+
+    # ===== 슬라이드 질문 수 인덱스 =====
+    SLIDE_INDEX_SYNC_MAX: int = 5000      # 낡은 인덱스를 증분으로 맞출 최대 질문 수 (넘으면 SCAN 재구성)
+    SLIDE_INDEX_TTL_SEC: int = 60 * 60 * 24  # 인덱스 키 TTL (질문 해시 TTL과 동일하게, 반영할 때마다 갱신)
+
+    # ===== CPU 작업 실행기 (임베딩/클러스터링) =====
+    CPU_EXECUTOR: str = "thread"          # "thread" 또는 "process"
+    CPU_WORKERS: int = 2                  # 동시에 실행할 CPU 작업 수
+    CPU_QUEUE_MAX: int = 16               # 대기 가능한 작업 수 (초과 시 429)
+    TORCH_THREADS: int = 2                # torch intra-op 스레드 수 (process 모드는 워커당, thread 모드는 프로세스 전체. 0이면 기본값)
+
+    # ===== 리포트 결과 캐시 =====
+    REPORT_CACHE_ENABLED: bool = True     # 질문 ZSET 지문이 같으면 저장된 리포트 반환
+    REPORT_CACHE_TTL_SEC: int = 60 * 60   # 리포트 캐시 TTL
+
+    # ===== 리포트 동시 요청 합치기 (single-flight) =====
+    SINGLEFLIGHT_REDIS: bool = False      # True면 Redis 락으로 uvicorn 워커 간에도 합침
+    SINGLEFLIGHT_LOCK_TTL_MS: int = 60000 # 리더 락 TTL (= 다른 워커의 최대 대기 시간)
+    SINGLEFLIGHT_RESULT_TTL_MS: int = 10000  # 리더 결과 공유 키 TTL
+    SINGLEFLIGHT_POLL_MS: int = 100       # 다른 워커 결과 확인 주기
+
+    # ===== 리포트 DB 저장 (write-behind) =====
+    REPORT_WRITER_ENABLED: bool = True    # False면 리포트마다 바로 저장 (write-through)
+    REPORT_WRITER_FLUSH_MS: int = 500     # 버퍼 flush 주기
+    REPORT_WRITER_MAX_ROWS: int = 200     # 버퍼에 쌓인 방 수가 이 값을 넘으면 바로 flush
+
+    # ===== 여러 방 배치 리포트 =====
+    BATCH_MAX_ROOMS: int = 200            # 요청 1번에 받을 최대 방 수
+    BATCH_CONCURRENCY: int = 8            # 방별 Redis 조회/요약 동시 실행 수
+    BATCH_EMBED_MAX: int = 20000          # 한 번에 묶어서 임베딩할 최대 질문 수 (메모리 상한)
+
+    # ===== 리포트 작업 큐 =====
+    JOB_WORKERS: int = 2                  # 앱 안에서 돌릴 워커 코루틴 수 (0이면 API 만, 워커는 별도 프로세스)
+    JOB_MAX_ATTEMPTS: int = 3             # 작업당 최대 시도 횟수 (5xx/429 등 일시적 오류만 재시도)
+    JOB_RETRY_BACKOFF_SEC: float = 1.0    # 재시도 백오프 시작값 (지수 증가)
+    JOB_LEASE_SEC: int = 30               # 워커 생존 신호 TTL (이 시간 동안 신호가 끊긴 워커의 작업은 큐로 되돌림)
+    JOB_RESULT_TTL_SEC: int = 60 * 60     # 작업 상태/결과 보관 시간
+    JOB_MAX_WAIT_SEC: int = 30            # 상태 조회 long-poll 최대 대기 시간
+    JOB_POLL_MS: int = 200                # long-poll 상태 확인 주기
+
+    # ===== 이벤트 기반 리포트 미리 계산 =====
+    EVENTS_ENABLED: bool = True           # Redis Stream 이벤트 소비자 실행 여부
+    EVENTS_STREAM: str = "report:events"  # XADD report:events * type session_ended|question_added roomId {id}
+    EVENTS_GROUP: str = "report-precompute"  # 소비자 그룹 (uvicorn 워커들이 나눠서 소비)
+    EVENTS_DEBOUNCE_SEC: float = 5.0      # question_added 후 이 시간 동안 추가 이벤트가 없으면 계산
+    EVENTS_MAX_DELAY_SEC: float = 30.0    # 이벤트가 계속 와도 첫 이벤트 후 이 시간 안에는 계산
+    EVENTS_CONCURRENCY: int = 2           # 동시에 미리 계산할 방 수
+    EVENTS_CLAIM_IDLE_MS: int = 60000     # 이 시간 이상 ACK 되지 않은 이벤트를 다시 가져옴 (계산 실패/죽은 소비자 복구)
+    EVENTS_RECLAIM_SEC: float = 30.0      # ACK 되지 않은 이벤트 확인 주기
+    EVENTS_MAX_DELIVERIES: int = 5        # 이 횟수만큼 전달돼도 ACK 되지 않으면 dead-letter 스트림으로 옮김
+    EVENTS_DEAD_STREAM: str = "report:events:dead"  # 처리 포기한 이벤트 (원본 필드 + eventId + deliveries)
+    EVENTS_DEAD_MAXLEN: int = 10000       # dead-letter 스트림 최대 길이 (MAXLEN ~)
+
+    # ===== 요청 프로파일링 (opt-in) =====
+    PROFILE_TOKEN: Optional[str] = None   # X-Profile-Token 헤더가 이 값이면 해당 요청 프로파일링 (None이면 헤더 방식 꺼짐)
+    PROFILE_SAMPLE_RATE: float = 0.0      # /top3, /top-slide 요청 중 무작위로 프로파일링할 비율 (0이면 꺼짐)
+    PROFILE_INTERVAL_MS: int = 5          # CPU 스택 샘플링 주기
+    PROFILE_TRACEMALLOC: bool = True      # 할당 스냅샷(tracemalloc) 수집 여부 (켜면 요청이 눈에 띄게 느려짐)
+    PROFILE_ALLOC_TOP: int = 30           # 저장할 할당 상위 줄 수
+    PROFILE_STORE: str = "redis"          # redis | dir
+    PROFILE_DIR: str = "/tmp/report-profiles"  # PROFILE_STORE=dir 일 때 저장 경로
+    PROFILE_TTL_SEC: int = 24 * 60 * 60   # Redis 보관 시간
 
     DB_URL: Optional[str] = None           # 예) jdbc:mysql://host:3306/boini  또는  mysql://host:3306/boini
     DB_USERNAME: Optional[str] = None      # 예) root
@@ -0,0 +1,88 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from config.settings import settings
+from exception.errors import AppException, ReportErrorCode
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[Executor] = None
+_pending = 0  # 실행 중 + 대기 중인 작업 수 (이벤트 루프 스레드에서만 증감)
+_torch_threads_set = False
+_torch_threads_lock = threading.Lock()
+
+
+def _set_torch_threads(torch_threads: int) -> None:
+    # torch intra-op 스레드 수 제한. torch.set_num_threads 는 프로세스 전체 설정이다
+    #   - process 모드: 워커 프로세스마다 initializer 로 호출 → 워커당 torch_threads 개
+    #   - thread 모드: 첫 워커 스레드에서 한 번만 적용 → 모든 워커 스레드가 torch_threads 개 스레드 풀을 같이 씀
+    #     (torch 임포트가 이벤트 루프를 막지 않도록 풀 생성 시점이 아니라 워커 스레드에서 실행)
+    global _torch_threads_set
+    with _torch_threads_lock:
+        if _torch_threads_set:
+            return
+        _torch_threads_set = True
+    if torch_threads <= 0:
+        return
+    try:
+        import torch  # type: ignore
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+
+def get_cpu_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.CPU_EXECUTOR == "process":
+            # fork 는 torch 내부 스레드와 충돌할 수 있어 spawn 사용
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.CPU_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_set_torch_threads,
+                initargs=(settings.TORCH_THREADS,),
+            )
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CPU_WORKERS,
+                thread_name_prefix="cpu",
+                initializer=_set_torch_threads,
+                initargs=(settings.TORCH_THREADS,),
+            )
+        logger.info(f"[executor] {settings.CPU_EXECUTOR} 풀 생성 (workers={settings.CPU_WORKERS})")
+    return _executor
+
+
+##  CPU 바운드 작업(임베딩/클러스터링)을 전용 풀에서 실행
+##     - 동시 실행 수는 풀 크기(CPU_WORKERS)로 제한
+##     - 대기열이 CPU_QUEUE_MAX 를 넘으면 바로 429 로 거절 (이벤트 루프/메모리 보호)
+##     - process 모드에서는 fn 과 인자가 pickle 가능해야 한다
+async def run_cpu(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    global _pending
+    if _pending >= settings.CPU_WORKERS + settings.CPU_QUEUE_MAX:
+        logger.warning(f"[executor] 대기열 초과로 거절 (pending={_pending})")
+        raise AppException(ReportErrorCode.TOO_MANY_REQUESTS, detail={"pending": _pending})
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_cpu_executor(), functools.partial(fn, *args, **kwargs))
+    finally:
+        _pending -= 1
+
+
+def cpu_queue_depth() -> int:
+    return _pending
+
+
+def shutdown_cpu_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None                                # openai.AsyncOpenAI (앱 전체에서 1개 공유)
+_sem: Optional[asyncio.Semaphore] = None      # 동시 LLM 호출 수 제한
+
+
+def init_llm_client():
+    """
+    lifespan 시작 시 1번 호출: 커넥션 풀을 가진 비동기 OpenAI 클라이언트 생성.
+    OPENAI_BASE_URL 을 지정하면 로컬 스텁 서버 등 호환 엔드포인트로 보낼 수 있다.
+    """
+    global _client, _sem
+    if _client is not None:
+        return _client
+    if not settings.OPENAI_API_KEY:
+        return None
+
+    import httpx
+    from openai import AsyncOpenAI  # type: ignore
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+        ),
+        timeout=settings.LLM_TIMEOUT_SEC,
+    )
+    _client = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        http_client=http_client,
+        max_retries=0,  # 재시도는 아래 chat_completion 에서 직접 제어
+        timeout=settings.LLM_TIMEOUT_SEC,
+    )
+    _sem = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    logger.info(f"[LLM] 비동기 클라이언트 생성 (base_url={settings.OPENAI_BASE_URL or 'default'})")
+    return _client
+
+
+async def close_llm_client() -> None:
+    global _client, _sem
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _sem = None
+
+
+def _is_retryable(e: Exception) -> bool:
+    import openai  # type: ignore
+    return isinstance(e, (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    ))
+
+
+async def chat_completion(messages: List[Dict[str, Any]], **kwargs: Any) -> Optional[str]:
+    """
+    chat.completions.create 비동기 호출
+      - 호출당 타임아웃: LLM_TIMEOUT_SEC
+      - 타임아웃/연결 오류/429/5xx 만 지수 백오프(+지터)로 LLM_MAX_RETRIES 회 재시도
+      - 동시 호출 수는 LLM_MAX_CONCURRENCY 로 제한
+    클라이언트가 없으면(API 키 없음) None 반환
+    """
+    client = init_llm_client()
+    if client is None:
+        return None
+
+    attempt = 0
+    while True:
+        try:
+            async with _sem:
+                resp = await client.chat.completions.create(
+                    messages=messages, timeout=settings.LLM_TIMEOUT_SEC, **kwargs
+                )
+            return resp.choices[0].message.content
+        except Exception as e:
+            if attempt >= settings.LLM_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = settings.LLM_RETRY_BACKOFF_SEC * (2 ** attempt) * (1 + random.random() * 0.25)
+            attempt += 1
+            logger.warning(f"[LLM] 호출 실패, {delay:.2f}s 후 재시도 ({attempt}/{settings.LLM_MAX_RETRIES}): {e}")
+            await asyncio.sleep(delay)
@@ -0,0 +1,155 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, List, Optional, Tuple
+
+from prometheus_client import REGISTRY, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+##  Prometheus 지표 + 요청별 Server-Timing
+##     - stage("이름") 블록의 소요 시간을 report_stage_seconds{stage} 히스토그램에 기록
+##     - 요청 안에서 실행된 stage 는 contextvar 목록에도 쌓아 Server-Timing 응답 헤더로 내려준다
+##       (single-flight 로 합류한 요청은 계산을 직접 하지 않으므로 해당 stage 가 없음)
+##     - DB 풀/Redis 커넥션/임베딩 캐시/CPU 대기열은 /metrics 수집 시점에 읽는 Collector 로 노출
+##   uvicorn 워커가 여러 개면 워커별 지표가 따로 나온다 (스크레이프 대상별로 합산)
+
+STAGE_SECONDS = Histogram(
+    "report_stage_seconds", "리포트 단계별 소요 시간(초)", ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+ROOM_QUESTIONS = Histogram(
+    "report_room_questions", "리포트 1건이 다룬 질문 수", ["report"],
+    buckets=(0, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000),
+)
+TOP3_CLUSTERS = Histogram(
+    "report_top3_clusters", "TOP3 계산 시 만들어진 클러스터(그룹) 수",
+    buckets=(0, 1, 3, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+
+_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("server_timings", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.labels(name).observe(dt)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((name, dt))
+
+
+def start_timings() -> Tuple[List[Tuple[str, float]], Token]:
+    timings: List[Tuple[str, float]] = []
+    return timings, _timings.set(timings)
+
+
+def reset_timings(token: Token) -> None:
+    _timings.reset(token)
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total: float) -> str:
+    # 같은 stage 가 여러 번(청크별) 실행되면 합산: "embed;dur=12.3, cluster;dur=4.5, total;dur=20.1"
+    merged = {}
+    for name, dt in timings:
+        merged[name] = merged.get(name, 0.0) + dt
+    parts = [f"{name};dur={dt * 1000:.1f}" for name, dt in merged.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """prefix 로 시작하는 요청의 응답에 Server-Timing 헤더 추가 (순수 ASGI 미들웨어)
+
+    헤더는 http.response.start 시점에 붙이므로 total 은 응답 시작까지의 시간이고,
+    스트리밍 응답에서 본문을 보내는 동안 실행된 stage 는 헤더에 들어가지 않는다 (히스토그램에는 기록).
+    """
+
+    def __init__(self, app, prefix: str):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # scope["path"] 에는 root_path("/ai") 가 붙어 있을 수 있으므로 떼고 비교
+        path, root = scope["path"], scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root):]
+        if not path.startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_timings()
+        t0 = time.perf_counter()
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                header = server_timing_header(timings, time.perf_counter() - t0)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            reset_timings(token)
+
+
+def _pool_counts(client) -> Tuple[int, int]:
+    # redis-py ConnectionPool: (사용 중, 유휴) 커넥션 수
+    pool = getattr(client, "connection_pool", None)
+    in_use = len(getattr(pool, "_in_use_connections", ()) or ())
+    idle = len(getattr(pool, "_available_connections", ()) or ())
+    return in_use, idle
+
+
+class ResourceCollector(Collector):
+    """/metrics 수집 시점에 커넥션 풀/캐시/실행기 상태를 읽어 게이지로 노출"""
+
+    def collect(self):
+        from core import db as _db
+        from core import redis as _redis
+        from core.executor import cpu_queue_depth
+        from services.top3_service import embedding_cache_stats
+
+        pool = _db.engine.pool
+        g = GaugeMetricFamily("report_db_pool_connections", "SQLAlchemy 커넥션 풀 상태", labels=["state"])
+        g.add_metric(["checked_out"], pool.checkedout())
+        g.add_metric(["idle"], pool.checkedin())
+        g.add_metric(["overflow"], max(0, pool.overflow()))
+        g.add_metric(["size"], pool.size())
+        yield g
+
+        g = GaugeMetricFamily("report_redis_connections", "Redis 커넥션 풀 상태", labels=["client", "state"])
+        for name, client in (("decoded", _redis._redis), ("raw", _redis._redis_raw)):
+            if client is not None:
+                in_use, idle = _pool_counts(client)
+                g.add_metric([name, "in_use"], in_use)
+                g.add_metric([name, "idle"], idle)
+        yield g
+
+        stats = embedding_cache_stats()
+        yield GaugeMetricFamily("report_embedding_cache_items", "프로세스 내 임베딩 LRU 항목 수", value=stats["size"])
+        c = CounterMetricFamily("report_embedding_cache_lookups", "임베딩 캐시 조회 결과", labels=["result"])
+        c.add_metric(["local_hit"], stats["localHits"])
+        c.add_metric(["redis_hit"], stats["redisHits"])
+        c.add_metric(["miss"], stats["misses"])
+        yield c
+
+        yield GaugeMetricFamily("report_cpu_queue_depth", "CPU 실행기에 제출된(실행 + 대기) 작업 수", value=cpu_queue_depth())
+
+
+_resource_collector: Optional[ResourceCollector] = None
+
+
+def register_resource_collector() -> None:
+    # 기본 REGISTRY 에 한 번만 등록 (앱 모듈 재임포트/lifespan 재실행 시 중복 등록 오류 방지)
+    global _resource_collector
+    if _resource_collector is None:
+        _resource_collector = ResourceCollector()
+        REGISTRY.register(_resource_collector)
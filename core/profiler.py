@@ -0,0 +1,279 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+##  요청 단위 프로파일링 (opt-in)
+##     - 켜는 방법: X-Profile-Token 헤더 == PROFILE_TOKEN, 또는 PROFILE_SAMPLE_RATE 확률로 샘플링
+##       ProfilerMiddleware 는 순수 ASGI 미들웨어라 둘 다 꺼져 있으면 설정값 두 개만 보고 바로 앱을 호출
+##       (요청/응답 래핑, 태스크 생성 없음)
+##     - CPU: 별도 스레드가 PROFILE_INTERVAL_MS 마다 sys._current_frames() 로 모든 스레드 스택을 샘플링
+##       → folded stack 형식("스레드;모듈:함수:줄;... 횟수", flamegraph.pl / speedscope 에서 바로 열림)
+##       프로세스 전체 샘플이다: 이벤트 루프와 CPU 실행기 스레드는 모든 요청이 같이 쓰므로
+##       캡처 중 동시에 처리된 다른 요청/백그라운드 작업(작업 큐, 이벤트 미리 계산)의 스택도 섞인다
+##       (스택 첫 칸이 스레드 이름이라 스레드별로는 나눠 볼 수 있음, 정확히 보려면 한가한 파드에서 캡처)
+##     - 메모리: tracemalloc 스냅샷에서 할당 상위 줄 (tracemalloc 은 프로세스 전역이라 동시에 1건만 캡처)
+##     - 방 ID/질문 수 등은 tag_profile() 로 붙이고, Redis(profile:{id}) 또는 PROFILE_DIR 에 저장
+##   샘플링/tracemalloc 는 요청이 느려지므로 운영에서는 토큰 방식이나 아주 낮은 비율로만 사용
+
+PROFILE_KEY_FMT = "profile:{profileId}"      # HASH: meta(JSON) / folded / alloc
+PROFILE_INDEX_KEY = "profile:index"          # ZSET: member=profileId, score=생성 시각(ms)
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_PATH_SUFFIXES = ("/top3", "/top-slide")  # 프로파일 대상 엔드포인트
+PROFILE_PARTS = ("meta", "folded", "alloc")
+
+_current: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+_busy = threading.Lock()  # 동시에 하나만 캡처
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.PROFILE_TOKEN) or settings.PROFILE_SAMPLE_RATE > 0
+
+
+def should_profile(path: str, headers) -> bool:
+    # 꺼져 있을 때는 설정값 두 개만 보고 바로 False (요청당 추가 비용 없음)
+    if not profiling_enabled():
+        return False
+    if not path.endswith(PROFILE_PATH_SUFFIXES):
+        return False
+    if check_profile_token(headers.get(PROFILE_TOKEN_HEADER)):
+        return True
+    rate = settings.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def check_profile_token(value: Optional[str]) -> bool:
+    # 조회 API 는 토큰이 설정되어 있고 일치할 때만 허용
+    token = settings.PROFILE_TOKEN
+    return bool(token) and value is not None and hmac.compare_digest(value, token)
+
+
+def tag_profile(**tags: Any) -> None:
+    # 프로파일 중인 요청이면 태그 추가 (아니면 아무것도 하지 않음)
+    p = _current.get()
+    if p is not None:
+        p.tags.update(tags)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    mod = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{mod}:{code.co_name}:{frame.f_lineno}"
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval_sec: float):
+        super().__init__(name="report-profiler", daemon=True)
+        self.interval_sec = interval_sec
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_evt = threading.Event()
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop_evt.wait(self.interval_sec):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+        self.join()
+
+
+class Profile:
+    def __init__(self, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.path = path
+        self.tags: Dict[str, Any] = {}
+        self.started_at = int(time.time() * 1000)
+        self.duration_ms = 0.0
+        self.folded = ""
+        self.alloc = ""
+        self._sampler = _Sampler(settings.PROFILE_INTERVAL_MS / 1000)
+        self._own_tracemalloc = False
+        self._t0 = 0.0
+        self._token = None
+
+    def start(self) -> None:
+        if settings.PROFILE_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+        self._t0 = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._sampler.stop()
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+        self.folded = "\n".join(f"{stack} {n}" for stack, n in self._sampler.stacks.most_common())
+        if tracemalloc.is_tracing():
+            snap = tracemalloc.take_snapshot()
+            stats = snap.statistics("lineno")[: settings.PROFILE_ALLOC_TOP]
+            current, peak = tracemalloc.get_traced_memory()
+            lines = [f"# traced current={current} peak={peak} bytes"]
+            lines += [f"{s.size}\t{s.count}\t{s.traceback}" for s in stats]
+            self.alloc = "\n".join(lines)
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "profileId": self.id,
+            "path": self.path,
+            "createdAt": self.started_at,
+            "durationMs": round(self.duration_ms, 1),
+            "samples": self._sampler.samples,
+            "intervalMs": settings.PROFILE_INTERVAL_MS,
+            "scope": "process",  # CPU 샘플은 프로세스 전체 스레드 기준 (동시 요청 포함)
+            "tags": self.tags,
+        }
+
+
+def begin_profile(path: str) -> Optional[Profile]:
+    if not _busy.acquire(blocking=False):
+        return None  # 다른 요청을 캡처 중
+    p = Profile(path)
+    try:
+        p.start()
+    except Exception:
+        _busy.release()
+        raise
+    p._token = _current.set(p)
+    return p
+
+
+def end_profile(p: Profile) -> None:
+    try:
+        p.stop()
+    finally:
+        _current.reset(p._token)
+        _busy.release()
+
+
+async def save_profile(r, p: Profile) -> None:
+    meta = json.dumps(p.meta(), ensure_ascii=False)
+    if settings.PROFILE_STORE == "dir":
+        def _write() -> None:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            for ext, body in (("json", meta), ("folded", p.folded), ("alloc.txt", p.alloc)):
+                with open(os.path.join(settings.PROFILE_DIR, f"{p.id}.{ext}"), "w", encoding="utf-8") as f:
+                    f.write(body)
+        await asyncio.to_thread(_write)
+    else:
+        key = PROFILE_KEY_FMT.format(profileId=p.id)
+        pipe = r.pipeline()
+        pipe.hset(key, mapping={"meta": meta, "folded": p.folded, "alloc": p.alloc})
+        pipe.expire(key, settings.PROFILE_TTL_SEC)
+        pipe.zadd(PROFILE_INDEX_KEY, {p.id: p.started_at})
+        pipe.zremrangebyscore(PROFILE_INDEX_KEY, "-inf", p.started_at - settings.PROFILE_TTL_SEC * 1000)
+        await pipe.execute()
+    logger.info(f"[프로파일] {p.id} 저장 ({p.path}, {p.duration_ms:.0f}ms, tags={p.tags})")
+
+
+async def list_profiles(r) -> List[Dict[str, Any]]:
+    if settings.PROFILE_STORE == "dir":
+        def _read() -> List[Dict[str, Any]]:
+            if not os.path.isdir(settings.PROFILE_DIR):
+                return []
+            out = []
+            for name in os.listdir(settings.PROFILE_DIR):
+                if name.endswith(".json"):
+                    with open(os.path.join(settings.PROFILE_DIR, name), encoding="utf-8") as f:
+                        out.append(json.load(f))
+            return out
+        metas = await asyncio.to_thread(_read)
+    else:
+        ids = await r.zrevrange(PROFILE_INDEX_KEY, 0, 99)
+        pipe = r.pipeline(transaction=False)
+        for pid in ids:
+            pipe.hget(PROFILE_KEY_FMT.format(profileId=pid), "meta")
+        metas = [json.loads(m) for m in await pipe.execute() if m]
+    return sorted(metas, key=lambda m: m["createdAt"], reverse=True)
+
+
+async def load_profile_part(r, profile_id: str, part: str) -> Optional[str]:
+    # part: meta | folded | alloc
+    if settings.PROFILE_STORE == "dir":
+        ext = {"meta": "json", "folded": "folded", "alloc": "alloc.txt"}[part]
+        path = os.path.join(settings.PROFILE_DIR, f"{os.path.basename(profile_id)}.{ext}")
+
+        def _read() -> Optional[str]:
+            if not os.path.isfile(path):
+                return None
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        return await asyncio.to_thread(_read)
+    return await r.hget(PROFILE_KEY_FMT.format(profileId=profile_id), part)
+
+
+class ProfilerMiddleware:
+    """/top3, /top-slide 요청 opt-in 프로파일링 (순수 ASGI 미들웨어)
+
+    프로파일링이 꺼져 있거나 대상이 아니면 앱을 그대로 호출한다.
+    캡처 중이면 응답 헤더에 X-Profile-Id 를 붙이고, 응답(스트리밍 포함)이 끝난 뒤 저장한다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not profiling_enabled():
+            await self.app(scope, receive, send)
+            return
+        # scope["path"] 에는 root_path("/ai") 가 붙어 있을 수 있으므로 떼고 비교
+        path, root = scope["path"], scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root):]
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        if not should_profile(path, headers):
+            await self.app(scope, receive, send)
+            return
+        profile = begin_profile(path)
+        if profile is None:  # 다른 요청을 캡처 중이면 그냥 처리
+            await self.app(scope, receive, send)
+            return
+
+        status = 0
+
+        async def send_with_id(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            room_id = scope.get("path_params", {}).get("room_id")
+            tag_profile(status=status, **({"roomId": room_id} if room_id else {}))
+            end_profile(profile)
+            try:
+                await save_profile(await get_redis(), profile)
+            except Exception as e:
+                logger.warning(f"[프로파일] {profile.id} 저장 실패: {e}")
@@ -1,16 +1,32 @@
 from redis import asyncio as aioredis
+from redis.utils import HIREDIS_AVAILABLE
 from config.settings import settings
 
 _redis = None
+_redis_raw = None
 
 async def get_redis() -> aioredis.Redis:
     global _redis
     if _redis is None:
-        _redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        _redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True, protocol=settings.REDIS_PROTOCOL)
     return _redis
 
+# 바이너리 값(임베딩 벡터 등)용 클라이언트: 응답을 디코딩하지 않고 bytes 그대로 받는다
+async def get_redis_raw() -> aioredis.Redis:
+    global _redis_raw
+    if _redis_raw is None:
+        _redis_raw = aioredis.from_url(settings.REDIS_URL, decode_responses=False, protocol=settings.REDIS_PROTOCOL)
+    return _redis_raw
+
+# hiredis 가 설치되어 있으면 redis-py 가 응답 파싱을 C 파서로 처리
+def redis_parser_name() -> str:
+    return "hiredis" if HIREDIS_AVAILABLE else "python"
+
 async def close_redis():
-    global _redis
+    global _redis, _redis_raw
     if _redis is not None:
         await _redis.close()
         _redis = None
+    if _redis_raw is not None:
+        await _redis_raw.close()
+        _redis_raw = None
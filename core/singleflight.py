@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LOCK_KEY_FMT = "singleflight:{key}:lock"
+RESULT_KEY_FMT = "singleflight:{key}:result:{token}"
+
+# 락 해제: 내가 잡은 락(token 일치)일 때만 삭제
+_UNLOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 요청을 하나의 계산으로 합친다 (single-flight).
+      - 프로세스 내: 키별 in-flight Task 하나를 모든 요청이 함께 await
+      - redis(decode_responses=True 클라이언트) 지정 시: SET NX 락으로 워커 간에도 합친다.
+        락을 못 잡은 워커는 리더가 저장한 결과(토큰별 키)를 기다렸다가 읽고,
+        리더가 실패/타임아웃되면 직접 계산한다.
+    먼저 온 요청이 끊겨도(cancel) 계산 Task 는 끝까지 실행되어 나머지 요청에 결과를 준다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        redis: Optional[Redis] = None,
+        dumps: Optional[Callable[[T], str]] = None,
+        loads: Optional[Callable[[str], T]] = None,
+    ) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            if redis is not None and dumps is not None and loads is not None:
+                coro = self._do_distributed(key, fn, redis, dumps, loads)
+            else:
+                coro = fn()
+            task = asyncio.ensure_future(coro)
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            logger.debug(f"[singleflight] {self.name}:{key} 진행 중인 계산에 합류")
+        return await asyncio.shield(task)
+
+    async def _do_distributed(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        redis: Redis,
+        dumps: Callable[[T], str],
+        loads: Callable[[str], T],
+    ) -> T:
+        full_key = f"{self.name}:{key}"
+        lock_key = LOCK_KEY_FMT.format(key=full_key)
+        token = uuid.uuid4().hex
+        try:
+            acquired = await redis.set(lock_key, token, nx=True, px=settings.SINGLEFLIGHT_LOCK_TTL_MS)
+        except RedisError as e:
+            logger.warning(f"[singleflight] 락 획득 실패, 단독 계산: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+                try:
+                    await redis.set(
+                        RESULT_KEY_FMT.format(key=full_key, token=token), dumps(result),
+                        px=settings.SINGLEFLIGHT_RESULT_TTL_MS,
+                    )
+                except RedisError as e:
+                    logger.warning(f"[singleflight] 결과 공유 실패: {e}")
+                return result
+            finally:
+                try:
+                    await redis.eval(_UNLOCK_LUA, 1, lock_key, token)
+                except RedisError as e:
+                    logger.warning(f"[singleflight] 락 해제 실패 (TTL 만료로 해제됨): {e}")
+
+        # 다른 워커가 계산 중 → 그 워커의 결과를 기다린다
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.SINGLEFLIGHT_LOCK_TTL_MS / 1000
+        try:
+            leader = await redis.get(lock_key)
+            while leader is not None and loop.time() < deadline:
+                raw = await redis.get(RESULT_KEY_FMT.format(key=full_key, token=leader))
+                if raw is not None:
+                    logger.debug(f"[singleflight] {full_key} 다른 워커의 결과 사용")
+                    return loads(raw)
+                await asyncio.sleep(settings.SINGLEFLIGHT_POLL_MS / 1000)
+                current = await redis.get(lock_key)
+                if current != leader:
+                    # 락이 풀렸다면 결과가 막 저장됐을 수 있으니 한 번 더 확인
+                    raw = await redis.get(RESULT_KEY_FMT.format(key=full_key, token=leader))
+                    if raw is not None:
+                        return loads(raw)
+                    break
+        except RedisError as e:
+            logger.warning(f"[singleflight] 결과 대기 중 Redis 오류, 단독 계산: {e}")
+
+        logger.info(f"[singleflight] {full_key} 리더 결과 없음 → 직접 계산")
+        return await fn()
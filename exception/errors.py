@@ -17,6 +17,17 @@ class ReportErrorCode(Enum):
     CALC_ERROR         = ("Q008", status.HTTP_500_INTERNAL_SERVER_ERROR, "유사도 계산 중 오류가 발생했습니다.")
     PREPROCESS_ERROR   = ("Q009", status.HTTP_500_INTERNAL_SERVER_ERROR, "질문 전처리 중 오류가 발생했습니다.")
 
+    # 페이지 조회 관련 예외 코드
+    INVALID_CURSOR     = ("Q010", status.HTTP_400_BAD_REQUEST,        "유효하지 않은 페이지 커서입니다.")
+    BATCH_TOO_LARGE    = ("Q011", status.HTTP_400_BAD_REQUEST,        "한 번에 요청할 수 있는 방 수를 초과했습니다.")
+
+    # 작업 큐 관련 예외 코드
+    JOB_NOT_FOUND      = ("Q012", status.HTTP_404_NOT_FOUND,           "작업을 찾을 수 없습니다. (만료되었거나 잘못된 ID)")
+
+    # 프로파일 조회 관련 예외 코드
+    PROFILE_FORBIDDEN  = ("Q013", status.HTTP_403_FORBIDDEN,           "프로파일 조회 권한이 없습니다.")
+    PROFILE_NOT_FOUND  = ("Q014", status.HTTP_404_NOT_FOUND,           "프로파일을 찾을 수 없습니다. (만료되었거나 잘못된 ID)")
+
 
     @property
     def code(self) -> str:
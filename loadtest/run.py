@@ -0,0 +1,337 @@
+"""
+리포트 API 종단 부하 테스트 (/top3 + /top-slide 동시 구동)
+
+    # 앱을 같은 프로세스에서 띄워 측정 (Redis 는 로컬 또는 fakeredis, DB/LLM 은 대역)
+    python -m loadtest.run --fake --rooms 20 --room-size 2000 --rps top3=5,top-slide=20 --duration 60
+    python -m loadtest.run --redis-url redis://localhost:6379/15 --llm-latency-ms 800 --write-rps 50
+
+    # 이미 떠 있는 서버에 부하만 줄 때 (시드는 서버와 같은 Redis 에)
+    python -m loadtest.run --base-url http://localhost:8000/ai --redis-url redis://localhost:6379/0 --rps top3=2
+
+  - 부하: 엔드포인트별 open-loop (고정 간격 또는 --poisson), 지연은 '예정 시각'부터 재서 밀린 요청도 반영
+    --max-inflight 를 넘으면 보내지 않고 skipped 로 셈 (클라이언트가 먼저 막히는 것 방지)
+  - 방 선택: --room-skew 0 이면 균등, 클수록 앞쪽 방에 몰림 (인기 발표 흉내)
+  - --write-rps: 부하 중 질문 유입 (리포트 캐시 지문이 바뀌어 재계산/증분 경로가 섞임)
+  - 대역: --fake(fakeredis), StubDB(--db-latency-ms, --db-url 을 주면 실제 MySQL),
+          OpenAI 스텁 서버(별도 스레드, --llm-latency-ms/--llm-error-rate, --llm off 면 요약 생략),
+          스텁 임베더(--embedder stub, --embed-ms 로 문장당 모델 시간 흉내)
+  - 결과: 엔드포인트별 p50/p95/p99 지연, 처리량, 상태 코드, 이벤트 루프 지연(해당 엔드포인트 요청이
+          처리 중일 때 잰 값) → JSON. in-process 모드의 루프 지연은 앱 자신의 지연이고,
+          --base-url 모드는 부하 발생기 쪽 값이라 참고용
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ENDPOINTS = {
+    "top3": "/report/questions/rooms/{room}/top3",
+    "top-slide": "/report/{room}/top-slide",
+}
+LAG_INTERVAL_SEC = 0.01  # 이벤트 루프 지연 측정 주기
+
+
+class EndpointStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.lags: List[float] = []
+        self.inflight = 0
+        self.skipped = 0
+
+    def summary(self, measured_sec: float) -> Dict[str, Any]:
+        ok = sum(c for s, c in self.statuses.items() if isinstance(s, int) and s < 400)
+        return {
+            "requests": len(self.latencies),
+            "ok": ok,
+            "skipped": self.skipped,
+            "statuses": {str(s): c for s, c in sorted(self.statuses.items(), key=lambda kv: str(kv[0]))},
+            "throughput": ok / measured_sec if measured_sec else 0.0,
+            "latencyMs": _percentiles(self.latencies),
+            "loopLagMs": _percentiles(self.lags),
+        }
+
+
+def _percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    a = np.asarray(values) * 1000
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2),
+            "max": round(float(a.max()), 2), "mean": round(float(a.mean()), 2)}
+
+
+def _parse_rps(spec: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise SystemExit(f"알 수 없는 엔드포인트: {name} (가능: {', '.join(ENDPOINTS)})")
+        out[name.strip()] = float(value)
+    return out
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    # config.settings 는 임포트 시점에 환경변수를 읽으므로 앱 모듈 임포트 전에 설정
+    env = {
+        "REDIS_URL": args.redis_url,
+        "DB_URL": args.db_url or os.environ.get("DB_URL") or "mysql://localhost:3306/loadtest",
+        "REPORT_CACHE_ENABLED": "false" if args.no_cache else "true",
+        "JOB_WORKERS": "0",
+        "EVENTS_ENABLED": "false",
+    }
+    if args.embedder == "stub":
+        env["EMB_WARMUP"] = "false"
+        env["READY_REQUIRES_MODEL"] = "false"  # True 면 EMB_WARMUP 과 무관하게 기동 시 실제 모델을 로드
+        env["CPU_EXECUTOR"] = "thread"  # 스텁 임베더 패치가 워커 프로세스에는 적용되지 않음
+    if args.llm == "off":
+        env["OPENAI_API_KEY"] = ""
+    os.environ.update(env)
+
+
+def _stub_embedder(ms_per_text: float):
+    from benchmarks.bench_text_sim import stub_embed
+
+    def embed(texts: List[str]) -> np.ndarray:
+        if ms_per_text:
+            time.sleep(len(texts) * ms_per_text / 1000)  # 모델 계산 시간 흉내 (CPU 실행기 스레드를 점유)
+        return stub_embed(texts)
+
+    return embed
+
+
+async def _lag_monitor(stats: Dict[str, EndpointStats], lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL_SEC)
+        lag = max(0.0, time.perf_counter() - t0 - LAG_INTERVAL_SEC)
+        lags.append(lag)
+        for s in stats.values():
+            if s.inflight:
+                s.lags.append(lag)
+
+
+async def _drive(client, stats: EndpointStats, path_fmt: str, rps: float, rooms: List[str], weights: List[float],
+                 start: float, record_after: float, stop_at: float, args: argparse.Namespace,
+                 rng: random.Random, tasks: set) -> None:
+    async def one(room: str, scheduled: float) -> None:
+        stats.inflight += 1
+        try:
+            resp = await client.get(path_fmt.format(room=room))
+            status: Any = resp.status_code
+        except Exception as e:
+            status = f"error:{type(e).__name__}"
+        finally:
+            stats.inflight -= 1
+        if scheduled >= record_after:
+            stats.latencies.append(time.perf_counter() - scheduled)
+            stats.statuses[status] += 1
+
+    next_t = start
+    while next_t < stop_at:
+        delay = next_t - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if stats.inflight >= args.max_inflight:
+            if next_t >= record_after:
+                stats.skipped += 1
+        else:
+            room = rng.choices(rooms, weights)[0]
+            t = asyncio.create_task(one(room, next_t))
+            tasks.add(t)
+            t.add_done_callback(tasks.discard)
+        next_t += rng.expovariate(rps) if args.poisson else 1.0 / rps
+
+
+async def _write_questions(r, rooms: List[str], weights: List[float], rps: float, stop_at: float,
+                           rng: random.Random) -> int:
+    from loadtest.seed import add_question
+
+    n = 0
+    next_t = time.perf_counter()
+    while next_t < stop_at:
+        delay = next_t - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await add_question(r, rng.choices(rooms, weights)[0], n, rng)
+        n += 1
+        next_t += 1.0 / rps
+    return n
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    _configure_env(args)
+    rps = _parse_rps(args.rps)
+
+    import httpx
+    import core.redis as core_redis
+    from loadtest.seed import cleanup_rooms, seed_rooms
+    from loadtest.stubs import OpenAIStubServer, StubDB
+
+    in_process = not args.base_url
+    db: Optional[StubDB] = None
+    llm: Optional[OpenAIStubServer] = None
+
+    async with AsyncExitStack() as stack:
+        if args.fake:
+            import fakeredis  # type: ignore
+
+            server = fakeredis.FakeServer()
+            core_redis._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            core_redis._redis_raw = fakeredis.FakeAsyncRedis(server=server)
+        r = await core_redis.get_redis()
+
+        if in_process:
+            if args.llm == "stub":
+                llm = OpenAIStubServer(args.llm_port, args.llm_latency_ms, args.llm_error_rate)
+                llm.start()
+                stack.callback(llm.stop)
+                from config.settings import settings
+
+                settings.OPENAI_API_KEY = "loadtest-stub"
+                settings.OPENAI_BASE_URL = llm.base_url
+            if not args.db_url:
+                db = StubDB(args.db_latency_ms)
+                db.install()
+            if args.embedder == "stub":
+                import services.top3_service as top3_service
+
+                top3_service._embed_batch = _stub_embedder(args.embed_ms)
+
+            import logging
+            import main as app_main
+
+            logging.getLogger().setLevel(args.log_level)
+            await stack.enter_async_context(app_main.app.router.lifespan_context(app_main.app))
+            transport = httpx.ASGITransport(app=app_main.app)
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout))
+        else:
+            client = await stack.enter_async_context(httpx.AsyncClient(
+                base_url=args.base_url, timeout=args.timeout,
+                limits=httpx.Limits(max_connections=args.max_inflight * len(rps) or 100)))
+
+        t0 = time.perf_counter()
+        rooms = await seed_rooms(r, args.rooms, args.room_size, seed=args.seed, index=not args.no_index)
+        seed_sec = time.perf_counter() - t0
+        print(f"[loadtest] 방 {len(rooms)}개 적재 ({seed_sec:.1f}s), 부하 시작 {rps}", file=sys.stderr)
+        if args.cleanup and not args.fake:
+            stack.push_async_callback(cleanup_rooms, r)
+
+        weights = [1.0 / (i + 1) ** args.room_skew for i in range(len(rooms))]
+        rng = random.Random(args.seed)
+        stats = {name: EndpointStats(name) for name in rps}
+        lags: List[float] = []
+        stop = asyncio.Event()
+        tasks: set = set()
+
+        start = time.perf_counter()
+        record_after = start + args.warmup
+        stop_at = record_after + args.duration
+        monitor = asyncio.create_task(_lag_monitor(stats, lags, stop))
+        writer = asyncio.create_task(_write_questions(r, rooms, weights, args.write_rps, stop_at, rng)) \
+            if args.write_rps > 0 else None
+        await asyncio.gather(*(
+            _drive(client, stats[name], ENDPOINTS[name], rate, rooms, weights, start, record_after, stop_at,
+                   args, random.Random(f"{args.seed}:{name}"), tasks)
+            for name, rate in rps.items()
+        ))
+        if tasks:
+            # 마감 후 남은 요청은 --drain-sec 까지 기다리고, 그 뒤에는 취소 (지연 통계에서 빠짐)
+            _, pending = await asyncio.wait(set(tasks), timeout=args.drain_sec)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        stop.set()
+        await monitor
+        written = await writer if writer is not None else 0
+        measured = time.perf_counter() - record_after
+
+        result = {
+            "bench": "loadtest",
+            "mode": "in-process" if in_process else "remote",
+            "backend": "fakeredis" if args.fake else args.redis_url,
+            "config": {
+                "rps": rps, "rooms": args.rooms, "roomSize": args.room_size, "roomSkew": args.room_skew,
+                "duration": args.duration, "warmup": args.warmup, "poisson": args.poisson,
+                "writeRps": args.write_rps, "cache": not args.no_cache, "embedder": args.embedder,
+                "embedMs": args.embed_ms, "llm": args.llm, "llmLatencyMs": args.llm_latency_ms,
+                "dbLatencyMs": None if args.db_url else args.db_latency_ms,
+            },
+            "seedSec": round(seed_sec, 2),
+            "measuredSec": round(measured, 2),
+            "endpoints": {name: s.summary(measured) for name, s in stats.items()},
+            "loopLagMs": _percentiles(lags),
+            "questionsWritten": written,
+        }
+        if db is not None:
+            result["db"] = db.stats()
+        if llm is not None:
+            result["llmCalls"] = llm.calls
+        return result
+
+
+def _print_table(result: Dict[str, Any]) -> None:
+    print(f"{'endpoint':<10} {'req':>6} {'ok':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'lag p99':>8}",
+          file=sys.stderr)
+    for name, s in result["endpoints"].items():
+        lat = s["latencyMs"] or {}
+        lag = s["loopLagMs"] or {}
+        print(f"{name:<10} {s['requests']:>6} {s['ok']:>6} {s['throughput']:>7.1f} "
+              f"{lat.get('p50', 0):>8.1f} {lat.get('p95', 0):>8.1f} {lat.get('p99', 0):>8.1f} "
+              f"{lag.get('p99', 0):>8.1f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rps", default="top3=2,top-slide=10", help="엔드포인트별 초당 요청 수 (top3=..,top-slide=..)")
+    p.add_argument("--duration", type=float, default=30, help="측정 시간(초)")
+    p.add_argument("--warmup", type=float, default=5, help="측정에서 뺄 초기 구간(초)")
+    p.add_argument("--drain-sec", type=float, default=30, help="마감 후 남은 요청을 기다릴 최대 시간")
+    p.add_argument("--poisson", action="store_true", help="요청 간격을 지수 분포로 (기본은 고정 간격)")
+    p.add_argument("--max-inflight", type=int, default=256, help="엔드포인트별 동시 요청 상한")
+    p.add_argument("--timeout", type=float, default=60)
+    p.add_argument("--rooms", type=int, default=20)
+    p.add_argument("--room-size", type=int, default=1000, help="방당 평균 질문 수 (±50%)")
+    p.add_argument("--room-skew", type=float, default=1.0, help="방 인기 편중 (0=균등)")
+    p.add_argument("--no-index", action="store_true", help="슬라이드 인덱스 없이 적재 (첫 조회 rebuild)")
+    p.add_argument("--write-rps", type=float, default=0, help="부하 중 초당 질문 유입 수")
+    p.add_argument("--no-cache", action="store_true", help="리포트 결과 캐시 끄기 (매번 계산)")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--redis-url", default="redis://localhost:6379/15")
+    p.add_argument("--fake", action="store_true", help="fakeredis 사용 (in-process 전용, 수치는 참고만)")
+    p.add_argument("--cleanup", action="store_true", help="끝나면 lt-* 방 키 삭제")
+    p.add_argument("--base-url", help="이미 떠 있는 서버 주소 (예: http://localhost:8000/ai). 없으면 in-process")
+    p.add_argument("--db-url", help="실제 MySQL 사용 (없으면 StubDB)")
+    p.add_argument("--db-latency-ms", type=float, default=2.0, help="StubDB 문장/commit 당 지연")
+    p.add_argument("--llm", choices=("stub", "off"), default="stub")
+    p.add_argument("--llm-port", type=int, default=8099)
+    p.add_argument("--llm-latency-ms", type=float, default=800)
+    p.add_argument("--llm-error-rate", type=float, default=0.0)
+    p.add_argument("--embedder", choices=("stub", "model"), default="stub")
+    p.add_argument("--embed-ms", type=float, default=0.0, help="스텁 임베더 문장당 지연 (모델 시간 흉내)")
+    p.add_argument("--log-level", default="WARNING")
+    p.add_argument("--out", help="결과 JSON 저장 경로 (없으면 stdout)")
+    args = p.parse_args()
+    if args.fake and args.base_url:
+        p.error("--fake 는 in-process 모드에서만 쓸 수 있습니다")
+
+    result = asyncio.run(main(args))
+    _print_table(result)
+    body = json.dumps(result, ensure_ascii=False, indent=1)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(body)
+    else:
+        print(body)
@@ -0,0 +1,121 @@
+"""
+부하 테스트용 방 데이터 적재 (실제 키 구조 그대로)
+
+    python -m loadtest.seed --rooms 20 --room-size 2000 --redis-url redis://localhost:6379/15
+    python -m loadtest.seed --rooms 20 --cleanup --redis-url redis://localhost:6379/15
+
+  - room:{id}:questions              ZSET  member=질문 ID, score=ts
+  - room:{id}:page:{n}:questions     ZSET  슬라이드별 질문
+  - room:{id}:question:{qid}         HASH  id/roomId/slide/audienceId/content/ts
+  - room:{id}:slide_counts(:total/:wm) 슬라이드 인덱스 (--no-index 면 생략 → 첫 조회 때 rebuild)
+  질문 내용은 benchmarks.synth_questions (근사 중복/paraphrase/잡음 포함)
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import List
+
+from redis.asyncio import Redis
+
+from benchmarks.synth_questions import generate_questions
+from config.settings import settings
+from models.question_report import QuestionRecord
+from services.question_fetch import question_key
+from services.question_reader import ROOM_QUESTIONS_KEY_FMT
+from services.slide_index import (
+    SLIDE_COUNTS_KEY_FMT, SLIDE_COUNTS_TOTAL_KEY_FMT, SLIDE_COUNTS_WM_KEY_FMT, SLIDE_ZSET_FMT, index_question,
+)
+
+ROOM_PREFIX = "lt-"  # 부하 테스트 방 ID 접두사 (정리 시 이 방들만 지움)
+
+
+def room_ids(rooms: int) -> List[str]:
+    return [f"{ROOM_PREFIX}{i:04d}" for i in range(rooms)]
+
+
+async def seed_room(r: Redis, room_id: str, questions: List[QuestionRecord], index: bool = True,
+                    chunk: int = 1000) -> None:
+    pipe = r.pipeline(transaction=False)
+    for q in questions:
+        pipe.zadd(ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id), {q.id: q.ts})
+        pipe.zadd(SLIDE_ZSET_FMT.format(roomId=room_id, slide=q.slide), {q.id: q.ts})
+        pipe.hset(question_key(room_id, q.id), mapping={
+            "id": q.id, "roomId": room_id, "slide": q.slide,
+            "audienceId": q.audienceId or "", "content": q.content, "ts": q.ts,
+        })
+        if len(pipe) >= chunk * 3:
+            await pipe.execute()
+    if index:
+        counts = Counter(q.slide for q in questions)
+        pipe.delete(SLIDE_COUNTS_KEY_FMT.format(roomId=room_id))
+        if counts:
+            pipe.zadd(SLIDE_COUNTS_KEY_FMT.format(roomId=room_id), {str(s): c for s, c in counts.items()})
+        ttl = settings.SLIDE_INDEX_TTL_SEC
+        if counts:
+            pipe.expire(SLIDE_COUNTS_KEY_FMT.format(roomId=room_id), ttl)
+        pipe.set(SLIDE_COUNTS_TOTAL_KEY_FMT.format(roomId=room_id), len(questions), ex=ttl)
+        pipe.set(SLIDE_COUNTS_WM_KEY_FMT.format(roomId=room_id), max((q.ts for q in questions), default="-inf"), ex=ttl)
+    await pipe.execute()
+
+
+async def seed_rooms(r: Redis, rooms: int, room_size: int, seed: int = 7, index: bool = True,
+                     size_jitter: float = 0.5) -> List[str]:
+    # 방 크기는 room_size 기준 ±size_jitter 범위에서 흩뿌림 (모든 방이 같은 크기면 캐시/부하가 비현실적으로 균일)
+    rng = random.Random(seed)
+    ids = room_ids(rooms)
+    for i, room_id in enumerate(ids):
+        n = max(1, int(room_size * (1 + rng.uniform(-size_jitter, size_jitter))))
+        await seed_room(r, room_id, generate_questions(n, room_id=room_id, seed=seed + i), index=index)
+    return ids
+
+
+async def add_question(r: Redis, room_id: str, seq: int, rng: random.Random) -> None:
+    # 발표 중 질문 유입 흉내: 질문 저장 + 슬라이드 인덱스 갱신 (리포트 캐시 지문이 바뀜)
+    q = generate_questions(1, room_id=room_id, seed=rng.randrange(1 << 30))[0]
+    qid = f"w{seq:08d}"
+    ts = int(time.time() * 1000)
+    pipe = r.pipeline(transaction=False)
+    pipe.zadd(ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id), {qid: ts})
+    pipe.zadd(SLIDE_ZSET_FMT.format(roomId=room_id, slide=q.slide), {qid: ts})
+    pipe.hset(question_key(room_id, qid), mapping={
+        "id": qid, "roomId": room_id, "slide": q.slide,
+        "audienceId": q.audienceId or "", "content": q.content, "ts": ts,
+    })
+    await pipe.execute()
+    await index_question(r, room_id, q.slide)
+
+
+async def cleanup_rooms(r: Redis) -> int:
+    # lt-* 방의 모든 키 삭제 (질문/슬라이드/인덱스/TOP3 상태)
+    n = 0
+    async for key in r.scan_iter(match=f"room:{ROOM_PREFIX}*", count=1000):
+        await r.unlink(key)
+        n += 1
+    return n
+
+
+async def main(args: argparse.Namespace) -> None:
+    from redis import asyncio as aioredis
+
+    r = aioredis.from_url(args.redis_url, decode_responses=True)
+    try:
+        if args.cleanup:
+            print(f"[seed] {await cleanup_rooms(r)}개 키 삭제")
+            return
+        ids = await seed_rooms(r, args.rooms, args.room_size, seed=args.seed, index=not args.no_index)
+        print(f"[seed] 방 {len(ids)}개 적재 ({ids[0]} ~ {ids[-1]}, 방당 약 {args.room_size}개 질문)")
+    finally:
+        await r.aclose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rooms", type=int, default=20)
+    p.add_argument("--room-size", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--no-index", action="store_true", help="슬라이드 인덱스를 만들지 않음 (rebuild 경로 측정)")
+    p.add_argument("--cleanup", action="store_true", help="lt-* 방 키 삭제")
+    p.add_argument("--redis-url", default="redis://localhost:6379/15")
+    asyncio.run(main(p.parse_args()))
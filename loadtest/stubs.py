@@ -0,0 +1,134 @@
+"""
+부하 테스트용 외부 의존성 대역
+  - StubDB      : core.db 세션 팩토리 대역. SQL 은 실행하지 않고 문장/commit 수만 세며, 지정한 지연만큼 await
+                  (리포트 저장 경로가 커넥션 풀 대기 없이 돌 때의 상한을 보는 용도. 실제 MySQL 은 --db-url 로)
+  - OpenAI 스텁 : /v1/chat/completions 만 구현한 로컬 서버 (지연/오류율 지정). OPENAI_BASE_URL 로 연결
+
+    python -m loadtest.stubs --port 8099 --latency-ms 800      # 스텁 LLM 서버만 따로 띄울 때
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class _StubSession:
+    def __init__(self, db: "StubDB"):
+        self.db = db
+
+    async def execute(self, statement: Any, params: Optional[Dict[str, Any]] = None) -> None:
+        self.db.statements += 1
+        self.db.rows += len(params or {})
+        if self.db.latency_sec:
+            await asyncio.sleep(self.db.latency_sec)
+
+    async def commit(self) -> None:
+        self.db.commits += 1
+        if self.db.latency_sec:
+            await asyncio.sleep(self.db.latency_sec)
+
+    async def rollback(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "_StubSession":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+
+class StubDB:
+    def __init__(self, latency_ms: float = 2.0):
+        self.latency_sec = latency_ms / 1000
+        self.statements = 0
+        self.commits = 0
+        self.rows = 0  # 바인드 파라미터 수 (행 수 x (컬럼 수 + 1))
+
+    def __call__(self) -> _StubSession:
+        return _StubSession(self)
+
+    def install(self) -> None:
+        # report_writer 가 임포트 시점에 가져간 이름까지 바꿔야 한다
+        import core.db
+        import services.report_writer
+
+        core.db.async_session_factory = self
+        services.report_writer.async_session_factory = self
+
+    def stats(self) -> Dict[str, int]:
+        return {"statements": self.statements, "commits": self.commits, "params": self.rows}
+
+
+def openai_stub_app(latency_ms: float, error_rate: float = 0.0):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(req: Request):
+        body = await req.json()
+        app.state.calls += 1
+        # 실제 LLM 처럼 지연에 편차를 줌 (±30%)
+        await asyncio.sleep(latency_ms / 1000 * random.uniform(0.7, 1.3))
+        if error_rate and random.random() < error_rate:
+            return JSONResponse(status_code=503, content={"error": {"message": "stub overloaded"}})
+        lines = "\n".join(f"요약 {i + 1}번째 줄입니다." for i in range(3))
+        return {
+            "id": f"stub-{app.state.calls}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": lines}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+class OpenAIStubServer:
+    """별도 스레드(자체 이벤트 루프)에서 도는 스텁 서버 → 측정 대상 이벤트 루프 지연에 섞이지 않음"""
+
+    def __init__(self, port: int, latency_ms: float, error_rate: float = 0.0):
+        import uvicorn
+
+        self.app = openai_stub_app(latency_ms, error_rate)
+        self.port = port
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="openai-stub", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    @property
+    def calls(self) -> int:
+        return self.app.state.calls
+
+    def start(self, timeout: float = 10.0) -> None:
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"OpenAI 스텁 서버 기동 실패 (port={self.port})")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--port", type=int, default=8099)
+    p.add_argument("--latency-ms", type=float, default=800)
+    p.add_argument("--error-rate", type=float, default=0.0)
+    args = p.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(openai_stub_app(args.latency_ms, args.error_rate), host="127.0.0.1", port=args.port)
@@ -1,35 +1,99 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from exception.errors import AppException, ErrorResponse, ReportErrorCode
 from redis.exceptions import RedisError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
 from config.settings import settings
-from core.redis import get_redis, close_redis
+from core.redis import get_redis, close_redis, redis_parser_name
+from core.executor import shutdown_cpu_executor
+from core.metrics import ServerTimingMiddleware, register_resource_collector
+from core.llm import init_llm_client, close_llm_client
+from core.profiler import ProfilerMiddleware
 from routers.max_slide_report import router as report_router
 from routers.top_question_report import router as topq_router
+from routers.batch_report import router as batch_router
+from routers.report_jobs import router as jobs_router
+from routers.profiles import router as profiles_router
+from services.report_jobs import ReportJobWorkers
+from services.report_events import ReportEventConsumer
+from services.report_writer import get_report_writer
+from services.top3_service import warmup_model, model_ready
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
 )
 
+async def _warmup():
+    delay = 5.0
+    while True:
+        try:
+            await warmup_model()
+            print("[startup] 임베딩 모델 워밍업 완료")
+            return
+        except Exception as e:
+            # 실패해도 첫 요청 시 다시 로드를 시도하므로 기동은 계속
+            logging.exception("[startup] 임베딩 모델 워밍업 실패", exc_info=e)
+            if not settings.READY_REQUIRES_MODEL:
+                return
+            # /ready 가 모델을 기다리면 요청이 오지 않으므로 여기서 계속 재시도
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 300.0)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     redis = await get_redis()
     try:
         await redis.ping()
-        print("[startup] Redis 연결 성공")
+        print(f"[startup] Redis 연결 성공 (parser={redis_parser_name()}, RESP{settings.REDIS_PROTOCOL})")
     except Exception as e:
         print(f"[startup] Redis 연결 실패: {e}")
         raise
 
+    # Prometheus 커넥션 풀/캐시/실행기 상태 Collector (중복 등록은 무시)
+    register_resource_collector()
+
+    # LLM 클라이언트(커넥션 풀) 1회 생성
+    init_llm_client()
+
+    # 임베딩 모델은 기동을 막지 않도록 백그라운드에서 로드 (/ready 로 완료 여부 확인)
+    #   /ready 가 모델을 기다리면 EMB_WARMUP=False 여도 로드 (503 인 동안은 요청이 오지 않아 첫 요청 로드가 불가능)
+    warmup = settings.EMB_WARMUP or settings.READY_REQUIRES_MODEL
+    warmup_task = asyncio.create_task(_warmup()) if warmup else None
+
+    # report 테이블 write-behind 저장 (주기/크기 기준 bulk upsert)
+    if settings.REPORT_WRITER_ENABLED:
+        get_report_writer().start()
+
+    # 리포트 작업 큐 워커 (JOB_WORKERS=0 이면 별도 워커 프로세스에서 처리)
+    job_workers = ReportJobWorkers(redis, settings.JOB_WORKERS) if settings.JOB_WORKERS > 0 else None
+    if job_workers is not None:
+        job_workers.start()
+
+    # 세션 종료/질문 추가 이벤트로 리포트 미리 계산
+    event_consumer = ReportEventConsumer(redis) if settings.EVENTS_ENABLED else None
+    if event_consumer is not None:
+        await event_consumer.start()
+
     yield  # 여기까지 실행되면 앱이 '정상 구동 중'
 
     # Shutdown
+    if event_consumer is not None:
+        await event_consumer.stop()
+    if job_workers is not None:
+        await job_workers.stop()
+    # 버퍼에 남은 리포트는 종료 전에 저장 (실패해도 예외를 올리지 않으므로 아래 정리는 계속됨)
+    await get_report_writer().stop()
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    shutdown_cpu_executor()
+    await close_llm_client()
     await close_redis()
     print("[shutdown] 🧹 Redis connection closed")
 
@@ -48,9 +112,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 리포트 엔드포인트 응답에 단계별 소요 시간(Server-Timing) 헤더 추가 (순수 ASGI → 스트리밍 응답도 버퍼링 없이 통과)
+app.add_middleware(ServerTimingMiddleware, prefix=settings.API_PREFIX)
+
+# /top3, /top-slide 요청 opt-in 프로파일링 (토큰 헤더 또는 샘플링, 꺼져 있으면 설정값 비교만 하고 통과)
+app.add_middleware(ProfilerMiddleware)
+
 # 라우터 등록
 app.include_router(report_router)
 app.include_router(topq_router)
+app.include_router(batch_router)
+app.include_router(jobs_router)
+app.include_router(profiles_router)
 
 # errors.py에 정의된 타입을 사용
 @app.exception_handler(AppException)
@@ -87,7 +160,24 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
     )
     return JSONResponse(status_code=err.http_status, content=body.model_dump())
 
-# 헬스체크
+# 헬스체크 (liveness)
 @app.get("/healthz")
 async def healthz():
     return {"ok": True, "service": settings.APP_NAME}
+
+# 준비 상태 (readiness): Redis 연결 + 임베딩 모델 로드 여부
+@app.get("/ready")
+async def ready():
+    try:
+        redis_ok = bool(await (await get_redis()).ping())
+    except Exception:
+        redis_ok = False
+    model_ok = model_ready()
+    ok = redis_ok and (model_ok or not settings.READY_REQUIRES_MODEL)
+    body = {"ready": ok, "redis": redis_ok, "model": model_ok}
+    return JSONResponse(status_code=200 if ok else 503, content=body)
+
+# Prometheus 지표 (단계별 히스토그램 + 커넥션 풀/캐시/실행기 상태, Collector 는 lifespan 에서 등록)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
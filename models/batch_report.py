@@ -0,0 +1,21 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from exception.errors import ErrorResponse
+from models.max_slide_report import TopSlideReport
+from models.question_report import TopQuestionReportResponse
+
+class BatchReportRequest(BaseModel):
+    roomIds: List[str] = Field(..., min_length=1)     # 리포트를 만들 방 ID 목록 (중복은 1번만 처리)
+    latestFirst: bool = False                         # top-slide 질문 목록 최신순 정렬
+
+class BatchRoomReport(BaseModel):
+    roomId: str
+    top3: Optional[TopQuestionReportResponse] = None
+    topSlide: Optional[TopSlideReport] = None
+    error: Optional[ErrorResponse] = None             # 실패한 방은 error 만 채워지고 DB 에도 저장되지 않음
+    saved: bool = False                               # report 테이블 저장 여부 (리포트는 만들었지만 저장에 실패하면 False)
+
+class BatchReportResponse(BaseModel):
+    saved: int                                        # report 테이블에 저장된 방 수
+    results: List[BatchRoomReport]
+    saveError: Optional[ErrorResponse] = None         # 저장 트랜잭션이 실패했을 때 원인 (리포트 자체는 results 에 그대로 반환)
@@ -20,6 +20,7 @@ class TopSlideReport(BaseModel):
     totalQuestions: int
     questions: List[Question]
     summary: Optional[str] = None
+    nextCursor: Optional[str] = None   # limit 조회 시 다음 페이지 커서 (마지막 페이지면 None)
 
 class AiTopSlideReport(Base):
     __tablename__ = "report"
@@ -0,0 +1,22 @@
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel
+from exception.errors import ErrorResponse
+
+JobKind = Literal["top3", "top-slide"]
+JobState = Literal["queued", "running", "done", "failed"]
+
+class ReportJobRequest(BaseModel):
+    kind: JobKind                     # 생성할 리포트 종류
+    roomId: str
+    latestFirst: bool = False         # top-slide 질문 목록 최신순 정렬
+
+class ReportJobStatus(BaseModel):
+    jobId: str
+    kind: JobKind
+    roomId: str
+    status: JobState
+    attempts: int = 0                 # 지금까지 실행한 횟수
+    createdAt: int                    # epoch ms
+    updatedAt: int                    # epoch ms
+    result: Optional[Dict[str, Any]] = None   # done: TopQuestionReportResponse 또는 TopSlideReport
+    error: Optional[ErrorResponse] = None     # failed(또는 재시도 대기 중): 마지막 오류
@@ -0,0 +1,49 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from core.metrics import stage
+
+# report 테이블에서 리포트 결과를 저장하는 JSON 컬럼
+REPORT_COLUMNS = ("top3question", "popular_question")
+
+# 문장 하나에 넣을 최대 행 수 (바인드 파라미터 수 = 행 수 x (컬럼 수 + 1))
+_ROWS_PER_STATEMENT = 500
+
+ReportRow = Tuple[Any, ...]  # (room_id, 컬럼값...), 값이 None 이면 NULL
+
+
+def _dumps(v: Optional[Any]) -> Optional[str]:
+    return None if v is None else json.dumps(v, ensure_ascii=False)
+
+
+async def upsert_report_rows(db: AsyncSession, columns: Sequence[str], rows: List[ReportRow]) -> None:
+    """
+    같은 컬럼 조합의 여러 방 행을 multi-row INSERT ... ON DUPLICATE KEY UPDATE 로 저장
+    (지정한 컬럼만 갱신, commit 은 호출 측에서)
+    """
+    for name in columns:
+        if name not in REPORT_COLUMNS:
+            raise ValueError(f"unknown report column: {name}")
+    for start in range(0, len(rows), _ROWS_PER_STATEMENT):
+        chunk = rows[start:start + _ROWS_PER_STATEMENT]
+        values: List[str] = []
+        params: Dict[str, Optional[str]] = {}
+        for i, (room_id, *cols) in enumerate(chunk):
+            placeholders = [f":room_id_{i}"]
+            params[f"room_id_{i}"] = room_id
+            for j, v in enumerate(cols):
+                placeholders.append(f"CAST(:c{j}_{i} AS JSON)")
+                params[f"c{j}_{i}"] = _dumps(v)
+            values.append(f"({', '.join(placeholders)})")
+        sql = text(f"""
+            INSERT INTO report (
+                room_id,
+                {", ".join(columns)}
+            )
+            VALUES {", ".join(values)}
+            ON DUPLICATE KEY UPDATE
+                {", ".join(f"{c} = VALUES({c})" for c in columns)}
+        """)
+        with stage("db_upsert"):
+            await db.execute(sql, params)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
+from core.redis import get_redis
+from models.batch_report import BatchReportRequest, BatchReportResponse
+from models.common import BaseResponse, success
+from services.batch_report import build_batch_reports
+
+router = APIRouter(prefix="/report", tags=["report"])
+
+@router.post("/batch", response_model=BaseResponse[BatchReportResponse],
+    summary="여러 방 리포트 일괄 생성",
+    description="여러 roomId의 **TOP3 질문 클러스터**와 **최다 질문 슬라이드** 리포트를 한 번에 생성하고 "
+                "report 테이블에 한 트랜잭션으로 저장합니다. 실패한 방은 `error` 로 반환됩니다.")
+async def batch_report(
+    body: BatchReportRequest,
+    r: Redis = Depends(get_redis),
+):
+    result = await build_batch_reports(r, body.roomIds, latest_first=body.latestFirst)
+    return success(result)
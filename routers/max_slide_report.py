@@ -1,22 +1,42 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from core.db import get_db
+from fastapi.responses import StreamingResponse
 from redis.asyncio import Redis
 from core.redis import get_redis
+from config.settings import settings
 from models.max_slide_report import TopSlideReport
-from services.max_slide_report import get_top_slide_report
+from services.max_slide_report import get_top_slide_page, open_top_slide_stream
+from services.report_service import cached_top_slide_report
 from models.common import BaseResponse, success
 router = APIRouter(prefix="/report", tags=["report"])
 
 @router.get("/{room_id}/top-slide", response_model=BaseResponse[TopSlideReport],
     summary="질문이 가장 많았던 슬라이드 조회",
-    description="roomId에 해당하는 발표에서 **가장 질문이 많았던 슬라이드**와 그 슬라이드의 질문들을 반환합니다.")
+    description="roomId에 해당하는 발표에서 **가장 질문이 많았던 슬라이드**와 그 슬라이드의 질문들을 반환합니다.\n\n"
+                "- `limit`/`cursor`: 질문을 페이지 단위로 조회 (요약 없이 `nextCursor` 로 다음 페이지)\n"
+                "- `stream=true`: NDJSON 스트리밍 (1번째 줄 슬라이드 정보, 이후 한 줄에 질문 1개)")
 
 async def top_slide(
     room_id: str,
     latest_first: bool = Query(False, description="질문 목록을 최신순으로 정렬"),
-    r: Redis = Depends(get_redis), db: AsyncSession = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="페이지 크기 (지정 시 요약 없이 페이지 조회)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 nextCursor"),
+    stream: bool = Query(False, description="NDJSON 스트리밍으로 전체 질문 반환"),
+    r: Redis = Depends(get_redis),
 ):
-    report = await get_top_slide_report(r, room_id, db, latest_first=latest_first)
+    # NDJSON 스트리밍: Redis 에서 받는 대로 한 줄씩 전송
+    if stream:
+        lines = await open_top_slide_stream(r, room_id, latest_first=latest_first)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
 
-    return success(report)
\ No newline at end of file
+    # 페이지 조회: 캐시/요약/DB 저장 없이 해당 구간만 조회
+    if limit is not None or cursor is not None:
+        page = await get_top_slide_page(
+            r, room_id, limit or settings.READER_CHUNK_SIZE, cursor=cursor, latest_first=latest_first
+        )
+        return success(page)
+
+    # 질문이 그대로면 캐시된 리포트, 아니면 single-flight 로 한 번만 계산
+    report = await cached_top_slide_report(r, room_id, latest_first=latest_first)
+
+    return success(report)
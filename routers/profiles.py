@@ -0,0 +1,35 @@
+from typing import List
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+from redis.asyncio import Redis
+from core.redis import get_redis
+from core.profiler import PROFILE_PARTS, check_profile_token, list_profiles, load_profile_part
+from exception.errors import AppException, ReportErrorCode
+from models.common import BaseResponse, success
+
+router = APIRouter(prefix="/report/profiles", tags=["profile"])
+
+def _require_token(x_profile_token: str = Header(None)) -> None:
+    if not check_profile_token(x_profile_token):
+        raise AppException(ReportErrorCode.PROFILE_FORBIDDEN)
+
+@router.get("", response_model=BaseResponse[List[dict]], dependencies=[Depends(_require_token)],
+    summary="저장된 프로파일 목록",
+    description="최근 캡처한 요청 프로파일의 메타데이터(경로, 소요 시간, 방 ID, 질문 수 등)를 최신순으로 반환합니다. "
+                "`X-Profile-Token` 헤더가 필요합니다.")
+async def read_profiles(r: Redis = Depends(get_redis)):
+    return success(await list_profiles(r))
+
+@router.get("/{profile_id}/{part}", response_class=PlainTextResponse, dependencies=[Depends(_require_token)],
+    summary="프로파일 다운로드",
+    description="`meta`(JSON) / `folded`(CPU 샘플, flamegraph.pl·speedscope 입력) / `alloc`(tracemalloc 상위 할당) 중 하나를 내려받습니다. "
+                "CPU 샘플은 프로세스 전체 스레드 기준이라 캡처 중 동시에 처리된 다른 요청의 스택도 포함됩니다.")
+async def download_profile(profile_id: str, part: str, r: Redis = Depends(get_redis)):
+    if part not in PROFILE_PARTS:
+        raise AppException(ReportErrorCode.PROFILE_NOT_FOUND, detail={"profileId": profile_id, "part": part})
+    body = await load_profile_part(r, profile_id, part)
+    if body is None:
+        raise AppException(ReportErrorCode.PROFILE_NOT_FOUND, detail={"profileId": profile_id, "part": part})
+    media_type = "application/json" if part == "meta" else "text/plain; charset=utf-8"
+    return PlainTextResponse(body, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{profile_id}.{part}"'})
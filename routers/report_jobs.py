@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse
+from redis.asyncio import Redis
+from core.redis import get_redis
+from config.settings import settings
+from exception.errors import AppException, ReportErrorCode
+from models.report_job import ReportJobRequest, ReportJobStatus
+from models.common import BaseResponse, success
+from services.report_jobs import get_job, submit_job, wait_job
+
+router = APIRouter(prefix="/report", tags=["report"])
+
+@router.post("/jobs", response_model=BaseResponse[ReportJobStatus], status_code=202,
+    summary="리포트 생성 작업 등록",
+    description="리포트(`top3` / `top-slide`) 생성을 작업 큐에 등록하고 바로 jobId를 반환합니다. "
+                "같은 리포트 작업이 이미 진행 중이면 그 작업을 반환합니다.")
+async def create_job(body: ReportJobRequest, r: Redis = Depends(get_redis)):
+    job = await submit_job(r, body.kind, body.roomId, latest_first=body.latestFirst)
+    return JSONResponse(status_code=202, content=success(job).model_dump())
+
+@router.get("/jobs/{job_id}", response_model=BaseResponse[ReportJobStatus],
+    summary="리포트 생성 작업 상태 조회",
+    description="작업 상태(queued/running/done/failed)와 결과를 반환합니다. "
+                "`wait`(초)를 주면 작업이 끝나거나 시간이 다 될 때까지 기다렸다가 응답합니다(long-poll).")
+async def read_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=settings.JOB_MAX_WAIT_SEC, description="완료까지 최대 대기 시간(초)"),
+    r: Redis = Depends(get_redis),
+):
+    job = await (wait_job(r, job_id, wait) if wait > 0 else get_job(r, job_id))
+    if job is None:
+        raise AppException(ReportErrorCode.JOB_NOT_FOUND, detail={"jobId": job_id})
+    return success(job)
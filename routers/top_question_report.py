@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from services.question_reader import list_room_questions
-from core.db import get_db
-from services.top3_service import build_top3
+from redis.asyncio import Redis
+from core.redis import get_redis
+from services.report_service import cached_top3_report
 from models.question_report import TopQuestionReportResponse
 from models.common import BaseResponse, success
 
@@ -12,7 +11,7 @@ router = APIRouter(prefix="/report", tags=["Report"])
             summary="TOP3",
             description="지정된 room_id의 질문들을 불러와 의미 유사도를 기반으로 묶은 **TOP3 질문 클러스터**를 반환합니다."
 )
-async def top3_report(room_id: str, db: AsyncSession = Depends(get_db),):
-    questions = await list_room_questions(room_id)
-    report = await build_top3(room_id,questions, db)
-    return success(report)
\ No newline at end of file
+async def top3_report(room_id: str, r: Redis = Depends(get_redis)):
+    # 질문이 그대로면 캐시된 리포트, 아니면 single-flight 로 한 번만 계산
+    report = await cached_top3_report(r, room_id)
+    return success(report)
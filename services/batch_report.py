@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config.settings import settings
+from exception.errors import AppException, ErrorResponse, ReportErrorCode
+from models.batch_report import BatchReportResponse, BatchRoomReport
+from models.max_slide_report import TopSlideReport
+from models.question_report import QuestionRecord, TopQuestionReportResponse
+from repositories.top_question_repo import top3_payload
+from repositories.top_slide_repo import popular_question_payload
+from services.max_slide_report import build_top_slide_report
+from services.question_reader import list_room_questions
+from services.report_writer import get_report_writer
+from services.top3_service import build_top3_many
+
+logger = logging.getLogger(__name__)
+
+
+def _to_error(e: BaseException) -> ErrorResponse:
+    if isinstance(e, AppException):
+        return ErrorResponse(code=e.error.code, message=e.error.message, detail=e.detail)
+    err = ReportErrorCode.REDIS_ERROR if isinstance(e, RedisError) else ReportErrorCode.UNKNOWN
+    return ErrorResponse(code=err.code, message=err.message, detail=str(e))
+
+
+##   여러 방의 TOP3 + 최다 질문 슬라이드 리포트를 한 번에 생성 (하루 마감 배치용)
+##     1️. 방별 질문 조회를 BATCH_CONCURRENCY 개씩 동시에 실행
+##     2️. TOP3: 모든 방의 질문을 묶어 임베딩 1번(묶음당) → 방별 클러스터링
+##     3️. top-slide: 방별 Lua 조회 + 요약을 동시에 실행
+##     4️. 성공한 방의 report 행을 write-behind 버퍼를 거치지 않고 직접 저장 (multi-row upsert, 트랜잭션 1번)
+##        같은 방의 버퍼 값은 함께 저장하고 버퍼에서 빼므로 나중 flush 가 배치 결과를 덮어쓰지 않는다
+##   한 방이 실패해도 나머지 방은 계속 처리하고, 실패한 방은 error 로 반환
+##   저장이 실패해도 만든 리포트는 그대로 반환하고 방별 saved=False + saveError 로 알린다
+async def build_batch_reports(
+    r: Redis, room_ids: List[str], latest_first: bool = False
+) -> BatchReportResponse:
+    room_ids = list(dict.fromkeys(room_ids))
+    if len(room_ids) > settings.BATCH_MAX_ROOMS:
+        raise AppException(
+            ReportErrorCode.BATCH_TOO_LARGE, detail={"rooms": len(room_ids), "max": settings.BATCH_MAX_ROOMS}
+        )
+    logger.info(f"[배치] 방 {len(room_ids)}개 리포트 생성 시작")
+
+    sem = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def _read(room_id: str) -> List[QuestionRecord]:
+        async with sem:
+            return await list_room_questions(room_id)
+
+    async def _top_slide(room_id: str) -> TopSlideReport:
+        async with sem:
+            return await build_top_slide_report(r, room_id, latest_first=latest_first)
+
+    # 1) 질문 조회
+    reads = await asyncio.gather(*[_read(rid) for rid in room_ids], return_exceptions=True)
+    errors: Dict[str, BaseException] = {}
+    rooms: Dict[str, List[QuestionRecord]] = {}
+    for room_id, res in zip(room_ids, reads):
+        if isinstance(res, BaseException):
+            errors[room_id] = res
+        else:
+            rooms[room_id] = res
+
+    # 2) + 3) TOP3 (임베딩 공유) 와 top-slide 를 함께 진행
+    top3_task = asyncio.ensure_future(build_top3_many(rooms))
+    slides = await asyncio.gather(*[_top_slide(rid) for rid in rooms], return_exceptions=True)
+    top3s: Dict[str, Union[TopQuestionReportResponse, Exception]] = await top3_task
+
+    results: List[BatchRoomReport] = []
+    rows: Dict[str, Dict[str, Any]] = {}
+    slide_by_room = dict(zip(rooms, slides))
+    for room_id in room_ids:
+        if room_id not in errors:
+            top3, slide = top3s[room_id], slide_by_room[room_id]
+            if isinstance(top3, BaseException):
+                errors[room_id] = top3
+            elif isinstance(slide, BaseException):
+                errors[room_id] = slide
+            else:
+                results.append(BatchRoomReport(roomId=room_id, top3=top3, topSlide=slide))
+                rows[room_id] = {
+                    "top3question": top3_payload(top3.top3) if top3.totalQuestions else None,
+                    "popular_question": popular_question_payload(slide) if slide.totalQuestions else None,
+                }
+                continue
+        logger.warning(f"[배치] room={room_id} 실패: {errors[room_id]}")
+        results.append(BatchRoomReport(roomId=room_id, error=_to_error(errors[room_id])))
+
+    # 4) 저장 (트랜잭션 1번, 이 요청의 행만)
+    #    write-behind 버퍼에 넣으면 백그라운드 flush 가 먼저 가져가 실패해도 여기서는 알 수 없으므로 직접 저장
+    save_error: Optional[ErrorResponse] = None
+    if rows:
+        try:
+            await get_report_writer().save_now(rows)
+        except Exception as e:
+            logger.error(f"[배치] 방 {len(rows)}개 저장 실패: {e}")
+            save_error = _to_error(e)
+    saved = 0 if save_error else len(rows)
+    if saved:
+        for res in results:
+            res.saved = res.roomId in rows
+    logger.info(f"[배치] 방 {len(room_ids)}개 중 {saved}개 저장 완료 (실패 {len(errors)}개)")
+    return BatchReportResponse(saved=saved, results=results, saveError=save_error)
@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+EMB_CACHE_KEY_FMT = "emb:{digest}"
+
+
+def cache_digest(model_name: str, norm: str) -> str:
+    # (모델명, 정규화된 문장) 조합의 해시 → 모델이 바뀌면 자연스럽게 다른 키가 된다
+    return hashlib.sha1(f"{model_name}\x00{norm}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    임베딩 2단 캐시
+      1차: 프로세스 내 LRU (크기 제한)
+      2차: Redis (float32 바이트, TTL)
+    키는 TS.normalize(content) 결과와 모델명의 해시.
+    Redis 장애 시에는 캐시 미스로 취급하고 리포트 생성은 계속 진행한다.
+    """
+
+    def __init__(self, model_name: str, max_items: int, ttl_sec: int):
+        self.model_name = model_name
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    # ----- 1차 캐시 (LRU) -----
+    def _get_local(self, digest: str) -> Optional[np.ndarray]:
+        with self._lock:
+            v = self._lru.get(digest)
+            if v is not None:
+                self._lru.move_to_end(digest)
+            return v
+
+    def _put_local(self, digest: str, emb: np.ndarray) -> None:
+        with self._lock:
+            self._lru[digest] = emb
+            self._lru.move_to_end(digest)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    # ----- 조회 / 저장 -----
+    async def get_many(self, r: Optional[Redis], norms: Iterable[str]) -> Dict[str, np.ndarray]:
+        """정규화 문장 → 임베딩. 캐시에 있는 것만 반환한다."""
+        found: Dict[str, np.ndarray] = {}
+        pending: List[tuple] = []  # (norm, digest)
+        for norm in norms:
+            digest = cache_digest(self.model_name, norm)
+            v = self._get_local(digest)
+            if v is not None:
+                found[norm] = v
+                self.local_hits += 1
+            else:
+                pending.append((norm, digest))
+
+        if pending and r is not None:
+            try:
+                raws = await r.mget([EMB_CACHE_KEY_FMT.format(digest=d) for _, d in pending])
+            except RedisError as e:
+                logger.warning(f"[임베딩캐시] Redis 조회 실패, 캐시 미스로 처리: {e}")
+                raws = [None] * len(pending)
+            rest: List[tuple] = []
+            for (norm, digest), raw in zip(pending, raws):
+                if raw:
+                    v = np.frombuffer(raw, dtype=np.float32)
+                    self._put_local(digest, v)
+                    found[norm] = v
+                    self.redis_hits += 1
+                else:
+                    rest.append((norm, digest))
+            pending = rest
+
+        self.misses += len(pending)
+        return found
+
+    async def put_many(self, r: Optional[Redis], items: Dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        pipe = r.pipeline(transaction=False) if r is not None else None
+        for norm, emb in items.items():
+            digest = cache_digest(self.model_name, norm)
+            v = np.ascontiguousarray(emb, dtype=np.float32)
+            self._put_local(digest, v)
+            if pipe is not None:
+                pipe.set(EMB_CACHE_KEY_FMT.format(digest=digest), v.tobytes(), ex=self.ttl_sec)
+        if pipe is None:
+            return
+        try:
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"[임베딩캐시] Redis 저장 실패: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._lru),
+            "localHits": self.local_hits,
+            "redisHits": self.redis_hits,
+            "misses": self.misses,
+        }
@@ -1,117 +1,68 @@
-import re
+import base64
 import logging
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
-from sqlalchemy.ext.asyncio import AsyncSession
 from models.max_slide_report import Question, TopSlideReport
 from exception.errors import AppException, ReportErrorCode
 from services.summary_service import summarize_kor
 from config.settings import settings
-from core.db import async_session_factory
-from repositories.top_slide_repo import update_report_popular_question, upsert_top_slide_report_null
+from core.metrics import ROOM_QUESTIONS
+from core.profiler import tag_profile
+from repositories.top_slide_repo import popular_question_payload
+from services.report_writer import write_report
+from services.question_fetch import decode_top_slide_question
+from services.top_slide_script import Row, fetch_top_slide, iter_top_slide
 
 logger = logging.getLogger(__name__)  # 모듈 로거 등록
 
-SLIDE_ZSET_PATTERN = "room:{roomId}:page:*:questions"
-QUESTION_HASH_FMT = "room:{roomId}:question:{qid}"
-
-##  Redis에서 특정 패턴(room:{roomId}:page:*:questions)에 맞는 모든 키를 스캔하는 함수
-##     - Redis의 SCAN 명령을 사용해서 슬라이드별 질문 목록 키(ZSET)들을 찾음
-##     - 한 번에 너무 많은 키를 읽지 않기 위해 count 단위로 반복 스캔
-##     - 결과: ["room:...:page:1:questions", "room:...:page:2:questions", ...]
-async def _scan_keys(r: Redis, pattern: str, count: int = 200) -> List[str]:
-    cursor = 0  # int
-    keys: List[str] = []
-    try:
-        logger.debug(f"[SCAN] Redis 키 스캔 시작: pattern={pattern}")
-        while True:
-            cursor, chunk = await r.scan(cursor=cursor, match=pattern, count=count)
-            keys.extend(chunk)
-            logger.debug(f"[SCAN] {len(chunk)}개의 키 조회됨 (cursor={cursor})")
-            if cursor == 0:  # int 비교
-                break
-        logger.info(f"[SCAN] 총 {len(keys)}개의 슬라이드 키 발견")
-        return keys
-    except RedisError as e:
-        logger.error(f"[SCAN] Redis 스캔 중 오류 발생: {e}")
-        raise AppException(ReportErrorCode.REDIS_ERROR, detail=str(e))  # [수정]
-
-##   Redis 키 문자열에서 슬라이드 번호(page:X)를 추출하는 함수
-##     - 예: "room:abc:page:3:questions" → 3
-##     - 없으면 기본값 0 반환
-def _parse_slide_no(zset_key: str) -> int:
-    m = re.search(r"page:(\d+):questions$", zset_key)
-    slide_no = int(m.group(1)) if m else 0
-    logger.debug(f"[PARSE] 키에서 슬라이드 번호 추출: {slide_no} ({zset_key})")
-    return slide_no
+def _to_questions(fetched: List[Row], slide_no: int) -> List[Question]:
+    questions: List[Question] = []
+    for qid, values in fetched:
+        try:
+            q = decode_top_slide_question(qid, values, slide_no)
+        except Exception as e:
+            logger.error(f"[리포트] 질문(qid={qid}) 파싱 중 오류 발생: {e}")
+            raise AppException(ReportErrorCode.STREAM_ERROR, detail={"qid": str(qid), "error": str(e)})  # [수정]
+        if q is None:  # TTL로 사라진 경우
+            logger.debug(f"[리포트] 만료된 질문(qid={qid}) 건너뜀")
+            continue
+        questions.append(q)
+    return questions
 
 ##   실제 "최다 질문 슬라이드 리포트"를 생성하는 핵심 함수
-##     1️. 해당 room_id의 모든 슬라이드 키를 스캔
-##     2️. 각 슬라이드별 질문 개수를 ZCARD로 계산
-##     3️. 질문이 가장 많은 슬라이드(top slide)를 선택
-##     4️. 해당 슬라이드의 질문 ID 목록(ZRANGE or ZREVRANGE) 조회
-##     5️. 각 질문의 상세 정보(HGETALL) 벌크 조회
-##     6️. Question 모델 리스트로 변환 후 TopSlideReport로 반환
-async def get_top_slide_report(
-    r: Redis, room_id: str, db: AsyncSession, latest_first: bool = False
-) -> TopSlideReport:
+##     1️~5️. Lua 스크립트(EVALSHA)로 Redis 안에서 처리 (질문은 청크 단위로 나눠 호출)
+##          - 슬라이드 질문 수 인덱스(ZSET)에서 최다 슬라이드(top slide) 선택
+##          - 해당 슬라이드의 질문 ID 목록(ZRANGE or ZREVRANGE) + 질문 상세(HMGET, 필요한 필드만)
+##          (인덱스가 낡았으면 새 질문만 반영하거나, 안 되면 슬라이드 키를 스캔해 재구성 후 재시도)
+##     6️. Question 모델 리스트로 변환 + 요약 후 TopSlideReport로 반환 (DB 저장은 호출 측)
+##     슬라이드가 하나도 없으면 totalQuestions=0 인 빈 리포트 반환
+async def build_top_slide_report(r: Redis, room_id: str, latest_first: bool = False) -> TopSlideReport:
     logger.info(f"[리포트] room={room_id}의 최다 질문 슬라이드 리포트 생성 시작")
 
     try:  # [수정] 함수 본문을 try로 감싸 예외를 아래 except에서 처리
-        # 1) 슬라이드 키 조회
-        pattern = SLIDE_ZSET_PATTERN.format(roomId=room_id)
-        slide_keys = await _scan_keys(r, pattern)
-        if not slide_keys:
-            rpt = TopSlideReport(roomId=room_id, slide=0, totalQuestions=0, questions=[], summary=None)
-            await upsert_top_slide_report_null(db, room_id)
-            return rpt
-
-        # 2) 슬라이드별 질문 수
-        pipe = r.pipeline()
-        for k in slide_keys:
-            pipe.zcard(k)
-        counts = await pipe.execute()
-        if not counts:
-            raise AppException(ReportErrorCode.REDIS_ERROR, detail="슬라이드별 질문 개수 조회 실패")  # [수정]
-
-        # 3) 최다 슬라이드 선택
-        max_idx = max(range(len(slide_keys)), key=lambda i: counts[i])
-        top_key = slide_keys[max_idx]
-        top_count = counts[max_idx]
-        slide_no = _parse_slide_no(top_key)
-        logger.info(f"[리포트] 최다 질문 슬라이드: {slide_no} (질문 {top_count}개)")
-
-        # 4) 질문 ID 목록
-        qids = await (r.zrevrange(top_key, 0, -1) if latest_first else r.zrange(top_key, 0, -1))
-        if not qids:
-            raise AppException(ReportErrorCode.NO_QUESTIONS, detail={"slide": slide_no})  # [수정]
-
-        # 5) 질문 상세 벌크 조회
-        pipe = r.pipeline()
-        for qid in qids:
-            pipe.hgetall(QUESTION_HASH_FMT.format(roomId=room_id, qid=qid))
-        rows = await pipe.execute()
-
-        # 6) 모델링
+        # 1~5) 최다 슬라이드 + 질문 ID 목록 + 질문 상세를 Lua 스크립트로 조회
+        #      (질문은 READER_CHUNK_SIZE 개씩 나눠 받아 바로 모델로 변환)
+        found = False
+        slide_no, top_count = 0, 0
+        n_qids = 0  # 슬라이드 ZSET 에서 받은 질문 ID 수 (Hash 가 만료된 질문 포함)
         questions: List[Question] = []
-        for qid, row in zip(qids, rows):
-            if not row:  # TTL로 사라진 경우
-                logger.debug(f"[리포트] 만료된 질문(qid={qid}) 건너뜀")
-                continue
-            try:
-                questions.append(
-                    Question(
-                        id=qid,
-                        slide=int(row.get("slide", slide_no)),
-                        content=row.get("content", ""),
-                        ts=int(row.get("ts", "0")),
-                        audienceId=row.get("audienceId"),
-                    )
-                )
-            except Exception as e:
-                logger.error(f"[리포트] 질문(qid={qid}) 파싱 중 오류 발생: {e}")
-                raise AppException(ReportErrorCode.STREAM_ERROR, detail={"qid": qid, "error": str(e)})  # [수정]
+        async for slide_no, top_count, fetched in iter_top_slide(
+            r, room_id, latest_first=latest_first, chunk_size=settings.READER_CHUNK_SIZE
+        ):
+            if not found:
+                found = True
+                logger.info(f"[리포트] 최다 질문 슬라이드: {slide_no} (질문 {top_count}개)")
+            # 6) 모델링
+            n_qids += len(fetched)
+            questions.extend(_to_questions(fetched, slide_no))
+
+        if not found:
+            return TopSlideReport(roomId=room_id, slide=0, totalQuestions=0, questions=[], summary=None)
+        if not n_qids:
+            raise AppException(ReportErrorCode.NO_QUESTIONS, detail={"slide": slide_no})  # [수정]
+        ROOM_QUESTIONS.labels("top-slide").observe(top_count)
+        tag_profile(roomId=room_id, report="top-slide", slide=slide_no, questions=top_count)
 
         logger.info(f"[리포트] room={room_id} 리포트 생성 완료 (총 {len(questions)}개의 질문 포함)")
 
@@ -119,14 +70,10 @@ async def get_top_slide_report(
         contents = [q.content for q in questions if q.content]
         summary_txt = await summarize_kor(contents, max_lines=settings.SUMMARY_MAX_LINES)
 
-        rpt = TopSlideReport(
+        return TopSlideReport(
             roomId=room_id, slide=slide_no, totalQuestions=top_count, questions=questions, summary=summary_txt,
         )
 
-        async with async_session_factory() as db:
-            await update_report_popular_question(db, rpt)
-        return rpt
-
     except RedisError as e:
         logger.error(f"[리포트] Redis 오류: {e}")
         raise AppException(ReportErrorCode.REDIS_ERROR, detail=str(e))
@@ -137,3 +84,107 @@ async def get_top_slide_report(
     except Exception as e:
         logger.exception(f"[리포트] 알 수 없는 오류 발생: {e}")
         raise AppException(ReportErrorCode.UNKNOWN, detail=str(e))
+
+
+##   최다 질문 슬라이드 리포트 생성 + report.popular_question 저장 (write-behind)
+async def get_top_slide_report(r: Redis, room_id: str, latest_first: bool = False) -> TopSlideReport:
+    rpt = await build_top_slide_report(r, room_id, latest_first=latest_first)
+    try:
+        await write_report(room_id, popular_question=popular_question_payload(rpt) if rpt.totalQuestions else None)
+    except Exception as e:
+        logger.exception(f"[리포트] 알 수 없는 오류 발생: {e}")
+        raise AppException(ReportErrorCode.UNKNOWN, detail=str(e))
+    return rpt
+
+
+##   페이지 커서: "슬라이드:offset:정렬" 을 base64url 로 감싼 불투명 문자열
+##     - 첫 페이지에서 정한 슬라이드로 고정 (중간에 최다 슬라이드가 바뀌어도 같은 슬라이드를 이어서 조회)
+##     - offset 기반이므로 latest_first 조회 중 새 질문이 들어오면 경계의 질문이 한 번 더 나올 수 있음
+def _encode_cursor(slide_no: int, offset: int, latest_first: bool) -> str:
+    raw = f"{slide_no}:{offset}:{int(latest_first)}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, latest_first: bool) -> Tuple[int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        slide_s, offset_s, lf_s = raw.split(":")
+        slide_no, offset = int(slide_s), int(offset_s)
+    except Exception:
+        raise AppException(ReportErrorCode.INVALID_CURSOR, detail={"cursor": cursor})
+    if offset < 0 or lf_s != str(int(latest_first)):
+        raise AppException(ReportErrorCode.INVALID_CURSOR, detail={"cursor": cursor})
+    return slide_no, offset
+
+
+##   최다 질문 슬라이드의 질문을 limit 개씩 페이지로 조회
+##     - cursor 가 없으면 인덱스에서 최다 슬라이드를 고르고 첫 페이지, 있으면 커서 위치부터
+##     - 요약/DB 저장 없이 Redis 조회만 수행 (요약이 필요하면 limit 없이 전체 리포트 조회)
+async def get_top_slide_page(
+    r: Redis, room_id: str, limit: int, cursor: Optional[str] = None, latest_first: bool = False
+) -> TopSlideReport:
+    slide_no: Optional[int] = None
+    offset = 0
+    if cursor:
+        slide_no, offset = _decode_cursor(cursor, latest_first)
+
+    try:
+        fetched = await fetch_top_slide(
+            r, room_id, latest_first=latest_first, slide=slide_no, offset=offset, limit=limit
+        )
+    except RedisError as e:
+        logger.error(f"[리포트] Redis 오류: {e}")
+        raise AppException(ReportErrorCode.REDIS_ERROR, detail=str(e))
+
+    if fetched is None:
+        return TopSlideReport(roomId=room_id, slide=0, totalQuestions=0, questions=[], summary=None)
+
+    slide_no, top_count, rows = fetched
+    end = offset + len(rows)
+    next_cursor = _encode_cursor(slide_no, end, latest_first) if len(rows) == limit and end < top_count else None
+    logger.info(f"[리포트] room={room_id} 슬라이드 {slide_no} 페이지 조회 (offset={offset}, {len(rows)}개)")
+    return TopSlideReport(
+        roomId=room_id, slide=slide_no, totalQuestions=top_count,
+        questions=_to_questions(rows, slide_no), summary=None, nextCursor=next_cursor,
+    )
+
+
+##   최다 질문 슬라이드의 질문을 NDJSON 으로 흘려보내는 스트림
+##     - 1번째 줄: {"roomId", "slide", "totalQuestions"} 헤더, 이후 한 줄에 질문 1개
+##     - Redis 에서 READER_CHUNK_SIZE 개씩 받는 대로 바로 내보내므로 전체 응답을 메모리에 올리지 않음
+##     - 첫 청크는 응답 시작 전에 미리 조회 → Redis 오류 등은 일반 에러 응답으로 반환된다
+async def open_top_slide_stream(r: Redis, room_id: str, latest_first: bool = False) -> AsyncIterator[bytes]:
+    chunks = iter_top_slide(r, room_id, latest_first=latest_first, chunk_size=settings.READER_CHUNK_SIZE)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except RedisError as e:
+        logger.error(f"[리포트] Redis 오류: {e}")
+        raise AppException(ReportErrorCode.REDIS_ERROR, detail=str(e))
+
+    async def _lines() -> AsyncIterator[bytes]:
+        if first is None:
+            yield TopSlideReport(roomId=room_id, slide=0, totalQuestions=0, questions=[]).model_dump_json(
+                include={"roomId", "slide", "totalQuestions"}
+            ).encode() + b"\n"
+            return
+        slide_no, top_count, rows = first
+        yield TopSlideReport(roomId=room_id, slide=slide_no, totalQuestions=top_count, questions=[]).model_dump_json(
+            include={"roomId", "slide", "totalQuestions"}
+        ).encode() + b"\n"
+        n = 0
+        try:
+            while True:
+                if rows:
+                    yield b"".join(q.model_dump_json().encode() + b"\n" for q in _to_questions(rows, slide_no))
+                    n += len(rows)
+                try:
+                    _, _, rows = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+        finally:
+            await chunks.aclose()
+        logger.info(f"[리포트] room={room_id} 슬라이드 {slide_no} 스트리밍 완료 ({n}개)")
+
+    return _lines()
@@ -0,0 +1,73 @@
+import logging
+from typing import List, Optional, Sequence, Union
+
+from redis.asyncio import Redis
+
+from models.max_slide_report import Question
+from models.question_report import QuestionRecord
+
+logger = logging.getLogger(__name__)
+
+##  질문 Hash(room:{roomId}:question:{qid}) 조회 계층
+##     - HGETALL 대신 필요한 필드만 HMGET 으로 가져온다 (필드 순서 = 아래 튜플 순서)
+##     - decode_responses=False 클라이언트로 받아서 필요한 필드만 직접 디코딩
+##       (숫자 필드는 bytes 그대로 int() 변환, 문자열 필드만 UTF-8 디코딩)
+##     - hiredis 가 설치되어 있으면 redis-py 가 컴파일된 파서를 자동으로 사용
+
+# top-slide 응답에 필요한 필드
+TOP_SLIDE_FIELDS = ("slide", "content", "ts", "audienceId")
+# QuestionRecord(TOP3) 에 필요한 필드
+RECORD_FIELDS = ("id", "roomId", "slide", "audienceId", "content", "ts")
+
+Raw = Optional[Union[bytes, str]]
+
+
+def question_key(room_id: str, qid: Union[bytes, str]) -> bytes:
+    if isinstance(qid, str):
+        qid = qid.encode("utf-8")
+    return b"room:" + room_id.encode("utf-8") + b":question:" + qid
+
+
+def _s(v: Raw) -> Optional[str]:
+    if v is None:
+        return None
+    return v.decode("utf-8") if isinstance(v, bytes) else v
+
+
+async def hmget_questions(
+    r: Redis, room_id: str, qids: Sequence[Union[bytes, str]], fields: Sequence[str]
+) -> List[List[Raw]]:
+    # qids 순서대로 [필드값, ...] 리스트 반환 (없는 질문은 모든 값이 None)
+    pipe = r.pipeline(transaction=False)
+    for qid in qids:
+        pipe.hmget(question_key(room_id, qid), fields)
+    return await pipe.execute()
+
+
+def decode_top_slide_question(qid: Raw, values: Sequence[Raw], slide_no: int) -> Optional[Question]:
+    # values: TOP_SLIDE_FIELDS 순서. 전부 None 이면 TTL 로 사라진 질문
+    slide, content, ts, audience = values
+    if slide is None and content is None and ts is None and audience is None:
+        return None
+    return Question(
+        id=_s(qid),
+        slide=int(slide) if slide is not None else slide_no,
+        content=_s(content) or "",
+        ts=int(ts) if ts is not None else 0,
+        audienceId=_s(audience),
+    )
+
+
+def decode_record(values: Sequence[Raw]) -> Optional[QuestionRecord]:
+    # values: RECORD_FIELDS 순서. 필수 필드가 없으면 None (기존 KeyError 건너뛰기와 동일)
+    qid, room_id, slide, audience, content, ts = values
+    if qid is None or room_id is None or slide is None or content is None or ts is None:
+        return None
+    return QuestionRecord(
+        id=_s(qid),
+        roomId=_s(room_id),
+        slide=int(slide),
+        audienceId=_s(audience),
+        content=_s(content),
+        ts=int(ts),
+    )
@@ -1,41 +1,62 @@
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional
 from models.question_report import QuestionRecord
-from core.redis import get_redis
+from core.redis import get_redis_raw
+from config.settings import settings
+from core.metrics import stage
+from services.question_fetch import RECORD_FIELDS, decode_record, hmget_questions
+
+ROOM_QUESTIONS_KEY_FMT = "room:{roomId}:questions"
+
+##  방 질문을 score(ts) 순서로 조금씩 읽어 오는 비동기 이터레이터
+##     - ZRANGEBYSCORE ... LIMIT 로 page_size 개씩 키셋 페이지네이션
+##       (다음 페이지는 마지막 score 부터, 같은 score 로 이미 읽은 개수만큼 offset)
+##     - 질문 Hash 는 필요한 필드만 HMGET 으로 chunk_size 개씩 파이프라인 조회해 청크(list) 단위로 yield
+##     → 방 크기와 무관하게 한 번에 메모리에 올라가는 양은 page_size/chunk_size 로 제한
+async def iter_room_questions(
+    room_id: str,
+    from_ts: Optional[int] = None,
+    page_size: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[List[QuestionRecord]]:
+    redis = await get_redis_raw()
+    zkey = ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id)
+    page_size = page_size or settings.READER_PAGE_SIZE
+    chunk_size = chunk_size or settings.READER_CHUNK_SIZE
 
-async def list_room_questions(room_id: str, from_ts: Optional[int] = None) -> List[QuestionRecord]:
-    redis = await get_redis()
-    zkey = f"room:{room_id}:questions"
     min_score = f"({from_ts}" if from_ts is not None else "-inf"   # (x: exclusive
     max_score = "+inf"
+    offset = 0
+    boundary: Optional[float] = None
 
-    tuples = await redis.zrangebyscore(zkey, min_score, max_score, withscores=True)
-    if not tuples:
-        return []
+    while True:
+        with stage("question_page"):
+            tuples = await redis.zrangebyscore(zkey, min_score, max_score, start=offset, num=page_size, withscores=True)
+        if not tuples:
+            return
 
-    ids = [qid for qid, _ in tuples]
+        for i in range(0, len(tuples), chunk_size):
+            ids = [qid for qid, _ in tuples[i:i + chunk_size]]
+            with stage("question_fetch"):
+                rows = await hmget_questions(redis, room_id, ids, RECORD_FIELDS)
+            chunk = [rec for rec in map(decode_record, rows) if rec is not None]
+            if chunk:
+                yield chunk
 
-    pipe = redis.pipeline()
-    for qid in ids:
-        pipe.hgetall(f"room:{room_id}:question:{qid}")
-    hashes: List[Dict[str, str]] = await pipe.execute()
+        if len(tuples) < page_size:
+            return
 
-    out: List[QuestionRecord] = []
-    for h in hashes:
-        if not h:
-            continue
-        try:
-            out.append(
-                QuestionRecord(
-                    id=h["id"],
-                    roomId=h["roomId"],
-                    slide=int(h["slide"]),
-                    audienceId=h.get("audienceId"),
-                    content=h["content"],
-                    ts=int(h["ts"]),
-                )
-            )
-        except KeyError:
-            continue
+        last = tuples[-1][1]
+        if last == boundary:
+            # 페이지 전체가 같은 score → offset 만 늘려서 계속
+            offset += len(tuples)
+        else:
+            boundary = last
+            min_score = last
+            offset = sum(1 for _, sc in tuples if sc == last)
 
+async def list_room_questions(room_id: str, from_ts: Optional[int] = None) -> List[QuestionRecord]:
+    out: List[QuestionRecord] = []
+    async for chunk in iter_room_questions(room_id, from_ts=from_ts):
+        out.extend(chunk)
     out.sort(key=lambda r: r.ts)
     return out
@@ -0,0 +1,71 @@
+import logging
+from typing import Awaitable, Callable, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config.settings import settings
+from services.question_reader import ROOM_QUESTIONS_KEY_FMT
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+REPORT_CACHE_KEY_FMT = "report:cache:{endpoint}:{roomId}:{params}"
+
+##  리포트 결과 캐시 (버전 = 방 질문 ZSET 지문)
+##     - 지문: room:{roomId}:questions 의 ZCARD + 최대 score(ts)
+##       → 질문이 추가되면 개수나 최대 ts 가 바뀌므로 캐시가 자동으로 무효화됨
+##     - 지문 계산과 캐시 조회를 한 파이프라인으로 처리 (폴링 1회 = Redis 왕복 1회)
+##     - 캐시 값은 Hash {v: 지문, data: 리포트 JSON}
+##     - 지문을 계산 "전"에 읽어 두므로, 계산 중 들어온 질문은 다음 요청에서 재계산된다
+
+
+def _fingerprint(card: int, top) -> str:
+    max_score = top[0][1] if top else 0
+    return f"{card}:{max_score}"
+
+
+async def get_or_compute_report(
+    r: Redis,
+    endpoint: str,
+    room_id: str,
+    params: str,
+    model_cls: Type[M],
+    compute: Callable[[], Awaitable[M]],
+) -> M:
+    if not settings.REPORT_CACHE_ENABLED:
+        return await compute()
+
+    key = REPORT_CACHE_KEY_FMT.format(endpoint=endpoint, roomId=room_id, params=params)
+    zkey = ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id)
+    fp: Optional[str] = None
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.zcard(zkey)
+        pipe.zrevrange(zkey, 0, 0, withscores=True)
+        pipe.hmget(key, "v", "data")
+        card, top, (cached_v, cached_data) = await pipe.execute()
+        fp = _fingerprint(card, top)
+        if cached_data is not None and cached_v == fp:
+            logger.info(f"[리포트캐시] {endpoint} room={room_id} 캐시 적중 (v={fp})")
+            return model_cls.model_validate_json(cached_data)
+    except RedisError as e:
+        logger.warning(f"[리포트캐시] 조회 실패, 직접 계산: {e}")
+
+    result = await compute()
+
+    if fp is not None:
+        try:
+            pipe = r.pipeline(transaction=False)
+            pipe.hset(key, mapping={"v": fp, "data": result.model_dump_json()})
+            pipe.expire(key, settings.REPORT_CACHE_TTL_SEC)
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"[리포트캐시] 저장 실패: {e}")
+    return result
+
+
+async def invalidate_report(r: Redis, endpoint: str, room_id: str, params: str) -> None:
+    await r.delete(REPORT_CACHE_KEY_FMT.format(endpoint=endpoint, roomId=room_id, params=params))
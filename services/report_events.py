@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from config.settings import settings
+from services.report_cache import invalidate_report
+from services.report_service import cached_top3_report, cached_top_slide_report
+from services.top3_state import delete_top3_state
+
+logger = logging.getLogger(__name__)
+
+EVENT_SESSION_ENDED = "session_ended"
+EVENT_QUESTION_ADDED = "question_added"
+
+##  이벤트 기반 리포트 미리 계산 (Redis Stream 소비자)
+##     - 발행 측: XADD {EVENTS_STREAM} * type session_ended|question_added roomId {roomId}
+##       (스트림 길이는 발행 측에서 MAXLEN ~ 으로 관리)
+##     - 소비자 그룹(EVENTS_GROUP)으로 읽으므로 uvicorn 워커가 여러 개여도 이벤트는 한 워커만 처리
+##     - question_added: 방별로 EVENTS_DEBOUNCE_SEC 동안 모아서 한 번 계산 (최대 EVENTS_MAX_DELAY_SEC 지연)
+##       session_ended: 대기 중인 debounce 를 무시하고 바로 계산
+##         (증분 TOP3 상태와 TOP3 리포트 캐시를 지우고 전체 계산 → 최종 리포트는 처리 순서에 따른 증분 오차 없이 만든다)
+##     - 계산은 GET 엔드포인트와 같은 경로(report_service) → report 테이블 + 리포트 캐시가 채워져
+##       발표 직후 첫 조회도 캐시 적중으로 끝난다 (top-slide 는 기본 정렬 latest_first=false 만)
+##     - 이벤트는 계산이 끝난 뒤 XACK. 재시작 시 내 미처리 목록을 먼저 다시 읽고,
+##       EVENTS_RECLAIM_SEC 마다 EVENTS_CLAIM_IDLE_MS 이상 ACK 되지 않은 이벤트(계산 실패/죽은 소비자)를
+##       XPENDING 으로 찾아 XCLAIM 으로 가져와 다시 계산 (이 소비자가 아직 처리 중인 이벤트는 제외)
+##     - EVENTS_MAX_DELIVERIES 번 전달돼도 ACK 되지 않은 이벤트는 dead-letter 스트림(EVENTS_DEAD_STREAM)에
+##       옮기고 ACK (같은 방이 계속 실패해도 미처리 목록이 쌓이지 않도록)
+
+
+class ReportEventConsumer:
+    """lifespan 에서 start/stop 하는 이벤트 소비 루프 + 방별 debounce 타이머"""
+
+    def __init__(self, r: Redis):
+        self.r = r
+        self.stream = settings.EVENTS_STREAM
+        self.group = settings.EVENTS_GROUP
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._sem = asyncio.Semaphore(settings.EVENTS_CONCURRENCY)
+        self._loop_task: Optional[asyncio.Task] = None
+        self._timers: Dict[str, asyncio.Task] = {}       # 방별 예약된 계산
+        self._first_seen: Dict[str, float] = {}          # 방별 debounce 시작 시각 (monotonic)
+        self._msg_ids: Dict[str, List[str]] = {}         # 방별 아직 XACK 하지 않은 이벤트 ID
+        self._ended: Set[str] = set()                    # session_ended 를 받은 방 (다음 계산이 최종 리포트)
+        self._inflight: Set[str] = set()                 # 이 소비자가 예약/계산 중인 이벤트 ID (재회수 제외)
+
+    async def start(self) -> None:
+        try:
+            # 처음 만들 때는 이후 이벤트만 ($) 소비 (과거 이벤트 재처리 방지)
+            await self.r.xgroup_create(self.stream, self.group, id="$", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._loop_task = asyncio.create_task(self._run(), name="report-event-consumer")
+        logger.info(f"[이벤트] {self.stream} 소비 시작 (group={self.group}, consumer={self.consumer})")
+
+    async def stop(self) -> None:
+        tasks = list(self._timers.values())
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timers.clear()
+        self._loop_task = None
+        logger.info("[이벤트] 소비 종료")
+
+    async def _run(self) -> None:
+        await self._recover()
+        last_reclaim = time.monotonic()
+        while True:
+            try:
+                if time.monotonic() - last_reclaim >= settings.EVENTS_RECLAIM_SEC:
+                    last_reclaim = time.monotonic()
+                    await self._reclaim()
+                resp = await self.r.xreadgroup(
+                    self.group, self.consumer, {self.stream: ">"}, count=100, block=1000
+                )
+                if not resp:
+                    # BLOCK 을 지원하지 않는 서버(fakeredis 등)가 바로 빈 응답을 줘도 루프가 헛돌지 않도록
+                    await asyncio.sleep(0.1)
+                    continue
+                for _, entries in resp:
+                    self._on_entries(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"[이벤트] 스트림 읽기 오류: {e}")
+                await asyncio.sleep(1)
+
+    async def _recover(self) -> None:
+        # 1) 이전에 이 소비자가 받고 ACK 하지 못한 이벤트  2) 오래 방치된 이벤트
+        try:
+            resp = await self.r.xreadgroup(self.group, self.consumer, {self.stream: "0"}, count=1000)
+            for _, entries in resp or []:
+                self._on_entries(entries)
+            await self._reclaim()
+        except RedisError as e:
+            logger.warning(f"[이벤트] 미처리 이벤트 복구 실패: {e}")
+
+    async def _reclaim(self) -> None:
+        # EVENTS_CLAIM_IDLE_MS 이상 ACK 되지 않은 이벤트를 가져와 다시 계산 (전달 횟수 초과분은 dead-letter)
+        idle = settings.EVENTS_CLAIM_IDLE_MS
+        start = "-"
+        while True:
+            pending = await self.r.xpending_range(
+                self.stream, self.group, min=start, max="+", count=100, idle=idle
+            )
+            if not pending:
+                return
+            retry: List[str] = []
+            dead: Dict[str, int] = {}
+            for p in pending:
+                msg_id = p["message_id"]
+                if msg_id in self._inflight:
+                    continue
+                if p["times_delivered"] >= settings.EVENTS_MAX_DELIVERIES:
+                    dead[msg_id] = p["times_delivered"]
+                else:
+                    retry.append(msg_id)
+            if retry:
+                # XCLAIM 도 min-idle 을 다시 확인하므로 다른 소비자가 먼저 가져간 이벤트는 빠진다
+                entries = await self.r.xclaim(self.stream, self.group, self.consumer, idle, retry)
+                if entries:
+                    logger.info(f"[이벤트] ACK 되지 않은 이벤트 {len(entries)}개 다시 처리")
+                self._on_entries(entries)
+            if dead:
+                await self._dead_letter(
+                    await self.r.xclaim(self.stream, self.group, self.consumer, idle, list(dead)), dead
+                )
+            if len(pending) < 100:
+                return
+            start = "(" + pending[-1]["message_id"]
+
+    async def _dead_letter(self, entries: List[Tuple[str, Dict[str, str]]], deliveries: Dict[str, int]) -> None:
+        for msg_id, fields in entries:
+            if fields:
+                await self.r.xadd(
+                    settings.EVENTS_DEAD_STREAM,
+                    {**fields, "eventId": msg_id, "deliveries": deliveries.get(msg_id, 0)},
+                    maxlen=settings.EVENTS_DEAD_MAXLEN, approximate=True,
+                )
+            logger.error(
+                f"[이벤트] id={msg_id} {fields} {deliveries.get(msg_id, 0)}번 처리 실패, "
+                f"{settings.EVENTS_DEAD_STREAM} 로 이동"
+            )
+        await self._ack([msg_id for msg_id, _ in entries])
+
+    def _on_entries(self, entries: List[Tuple[str, Dict[str, str]]]) -> None:
+        for msg_id, fields in entries:
+            if not fields:  # XCLAIM 한 ID 가 이미 XTRIM 으로 지워진 경우 내용 없는 항목이 돌아온다
+                continue
+            room_id = fields.get("roomId")
+            kind = fields.get("type")
+            if not room_id or kind not in (EVENT_SESSION_ENDED, EVENT_QUESTION_ADDED):
+                logger.warning(f"[이벤트] 알 수 없는 이벤트 무시: id={msg_id} {fields}")
+                asyncio.ensure_future(self._ack([msg_id]))
+                continue
+            if msg_id in self._inflight:  # 이미 예약/계산 중
+                continue
+            self._inflight.add(msg_id)
+            self._msg_ids.setdefault(room_id, []).append(msg_id)
+            if kind == EVENT_SESSION_ENDED:
+                self._ended.add(room_id)
+            self._schedule(room_id, immediate=(kind == EVENT_SESSION_ENDED))
+
+    def _schedule(self, room_id: str, immediate: bool) -> None:
+        now = time.monotonic()
+        first = self._first_seen.setdefault(room_id, now)
+        delay = 0.0 if immediate else max(
+            0.0, min(settings.EVENTS_DEBOUNCE_SEC, first + settings.EVENTS_MAX_DELAY_SEC - now)
+        )
+        prev = self._timers.get(room_id)
+        if prev is not None and not prev.done():
+            prev.cancel()
+        self._timers[room_id] = asyncio.create_task(self._precompute_later(room_id, delay))
+
+    async def _precompute_later(self, room_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # 여기부터는 debounce 취소 대상이 아니므로 타이머 목록에서 뺀다 (계산 중 온 이벤트는 새 타이머)
+        if self._timers.get(room_id) is asyncio.current_task():
+            del self._timers[room_id]
+        self._first_seen.pop(room_id, None)
+        msg_ids = self._msg_ids.pop(room_id, [])
+        final = room_id in self._ended
+        self._ended.discard(room_id)
+        async with self._sem:
+            try:
+                t0 = time.perf_counter()
+                await self._precompute(room_id, final=final)
+                logger.info(
+                    f"[이벤트] room={room_id} 리포트 미리 계산 완료 "
+                    f"(이벤트 {len(msg_ids)}개, {time.perf_counter() - t0:.2f}s)"
+                )
+            except Exception as e:
+                # ACK 하지 않으면 EVENTS_CLAIM_IDLE_MS 뒤 _reclaim 에서 다시 처리된다
+                logger.exception(f"[이벤트] room={room_id} 미리 계산 실패: {e}")
+                return
+            finally:
+                self._inflight.difference_update(msg_ids)
+        await self._ack(msg_ids)
+
+    async def _precompute(self, room_id: str, final: bool = False) -> None:
+        if final:
+            # 발표 종료: 증분 상태를 버려서 최종 TOP3 를 전체 계산으로 만든다
+            #   질문 지문이 그대로면 캐시가 증분 결과를 돌려주므로 캐시도 같이 지운다
+            await delete_top3_state(self.r, room_id)
+            await invalidate_report(self.r, "top3", room_id, "-")
+        await cached_top3_report(self.r, room_id)
+        await cached_top_slide_report(self.r, room_id, latest_first=False)
+
+    async def _ack(self, msg_ids: List[str]) -> None:
+        if not msg_ids:
+            return
+        try:
+            await self.r.xack(self.stream, self.group, *msg_ids)
+        except RedisError as e:
+            logger.warning(f"[이벤트] XACK 실패: {e}")
@@ -0,0 +1,377 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config.settings import settings
+from exception.errors import AppException, ErrorResponse, ReportErrorCode
+from models.report_job import ReportJobStatus
+from services.report_service import cached_top3_report, cached_top_slide_report
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_KEY = "report:jobs:queue"                          # LIST: LPUSH 로 넣고 BLMOVE 로 꺼냄 (FIFO)
+JOB_PROCESSING_KEY_FMT = "report:jobs:processing:{worker}"   # LIST: 워커 프로세스가 꺼내 실행 중인 작업 ID
+JOB_DELAYED_KEY = "report:jobs:delayed"                      # ZSET: 재시도 대기 작업 (score = 다시 큐에 넣을 시각 ms)
+JOB_WORKERS_KEY = "report:jobs:workers"                      # SET : 처리 목록을 가진 워커 프로세스 ID
+JOB_HEARTBEAT_KEY_FMT = "report:jobs:heartbeat:{worker}"     # 워커 생존 신호 (TTL JOB_LEASE_SEC)
+JOB_KEY_FMT = "report:job:{jobId}"                           # HASH: 작업 상태/결과
+JOB_ACTIVE_KEY_FMT = "report:job:active:{kind}:{roomId}:{params}"  # 같은 리포트의 대기/실행 중 작업 ID
+
+_FINISHED = ("done", "failed")
+_MAINTAIN_INTERVAL_SEC = 1.0  # 재시도 대기 작업 승격 + 생존 신호 갱신 + 죽은 워커 작업 회수 주기
+
+##  Redis 기반 리포트 작업 큐
+##     - submit_job(): 작업 Hash 생성 + 큐에 LPUSH → 바로 jobId 반환 (HTTP 요청은 계산을 기다리지 않음)
+##       같은 방/종류/옵션의 작업이 이미 대기·실행 중이면 그 작업을 그대로 반환 (확인 + 등록은 Lua 로 원자적으로)
+##     - 워커(코루틴 JOB_WORKERS 개, 또는 python -m services.report_jobs 로 별도 프로세스)가
+##       BLMOVE 로 큐에서 자기 처리 목록(processing)으로 옮겨 꺼내고,
+##       기존 조회 경로(리포트 캐시 + single-flight + DB 저장)로 계산한 뒤 결과를 Hash 에 저장
+##     - 5xx/429 같은 일시적 오류는 지연 ZSET 에 넣어 지수 백오프 후 다시 큐로 (최대 JOB_MAX_ATTEMPTS 회)
+##       워커는 기다리지 않고 바로 다음 작업을 처리한다
+##     - 워커 프로세스는 JOB_LEASE_SEC TTL 의 생존 신호를 주기적으로 갱신하고,
+##       신호가 끊긴 워커(강제 종료/크래시)의 처리 목록은 다른 워커가 큐 앞쪽으로 되돌린다
+##     - 워커가 정상 종료(cancel)되면 실행 중이던 작업을 큐 앞쪽에 바로 되돌려 놓는다
+##     - 끝난 작업은 JOB_RESULT_TTL_SEC 동안 보관 후 만료
+
+# KEYS: 큐, 지연 ZSET, 워커 SET   ARGV: 현재 시각(ms), 작업 Hash 접두사, 처리 목록 접두사, 생존 신호 접두사
+JOB_MAINTAIN_LUA = """
+local now = tonumber(ARGV[1])
+
+-- 1) 재시도 시각이 된 작업을 큐에 넣음
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now, 'LIMIT', 0, 100)
+for _, id in ipairs(due) do
+  redis.call('ZREM', KEYS[2], id)
+  redis.call('LPUSH', KEYS[1], id)
+end
+
+-- 2) 생존 신호가 끊긴 워커가 가져간 작업을 큐 앞쪽(꺼내는 쪽)으로 되돌림
+local reclaimed = 0
+for _, worker in ipairs(redis.call('SMEMBERS', KEYS[3])) do
+  if redis.call('EXISTS', ARGV[4] .. worker) == 0 then
+    local plist = ARGV[3] .. worker
+    while true do
+      local id = redis.call('RPOP', plist)
+      if not id then break end
+      local key = ARGV[2] .. id
+      if redis.call('EXISTS', key) == 1 then
+        redis.call('HSET', key, 'status', 'queued', 'updatedAt', now)
+        redis.call('RPUSH', KEYS[1], id)
+        reclaimed = reclaimed + 1
+      end
+    end
+    redis.call('SREM', KEYS[3], worker)
+  end
+end
+return {#due, reclaimed}
+"""
+
+# 같은 리포트 작업 합류 또는 새 작업 등록 (확인 + 등록을 원자적으로: 동시 요청이 작업을 중복 등록하지 않도록)
+# KEYS: 활성 작업 키, 큐   ARGV: 새 작업 ID, 작업 Hash 접두사, 보관 TTL(초), 현재 시각(ms), kind, roomId, params
+#   반환: 합류한 기존 작업 ID 또는 새 작업 ID
+JOB_SUBMIT_LUA = """
+local existing = redis.call('GET', KEYS[1])
+if existing then
+  local status = redis.call('HGET', ARGV[2] .. existing, 'status')
+  if status and status ~= 'done' and status ~= 'failed' then
+    return existing
+  end
+end
+local key = ARGV[2] .. ARGV[1]
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('HSET', key, 'id', ARGV[1], 'kind', ARGV[5], 'roomId', ARGV[6], 'params', ARGV[7],
+  'status', 'queued', 'attempts', 0, 'createdAt', ARGV[4], 'updatedAt', ARGV[4])
+redis.call('EXPIRE', key, ARGV[3])
+redis.call('LPUSH', KEYS[2], ARGV[1])
+return ARGV[1]
+"""
+
+# 작업 종료 기록 + 처리 목록에서 제거 + 활성 작업 키가 이 작업일 때만 삭제 (compare-and-delete)
+# KEYS: 작업 Hash, 처리 목록, 활성 작업 키   ARGV: 작업 ID, 보관 TTL(초), 필드1, 값1, 필드2, 값2, ...
+JOB_FINISH_LUA = """
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('LREM', KEYS[2], 1, ARGV[1])
+if redis.call('GET', KEYS[3]) == ARGV[1] then
+  redis.call('DEL', KEYS[3])
+end
+return 1
+"""
+
+_maintain_script = None
+_submit_script = None
+_finish_script = None
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _params(kind: str, latest_first: bool) -> str:
+    return f"latest_first={int(latest_first)}" if kind == "top-slide" else "-"
+
+
+def _to_status(h: Dict[str, str]) -> ReportJobStatus:
+    return ReportJobStatus(
+        jobId=h["id"],
+        kind=h["kind"],
+        roomId=h["roomId"],
+        status=h["status"],
+        attempts=int(h.get("attempts", 0)),
+        createdAt=int(h["createdAt"]),
+        updatedAt=int(h["updatedAt"]),
+        result=json.loads(h["result"]) if h.get("result") else None,
+        error=ErrorResponse.model_validate_json(h["error"]) if h.get("error") else None,
+    )
+
+
+def _to_error(e: BaseException) -> ErrorResponse:
+    if isinstance(e, AppException):
+        return ErrorResponse(code=e.error.code, message=e.error.message, detail=e.detail)
+    err = ReportErrorCode.REDIS_ERROR if isinstance(e, RedisError) else ReportErrorCode.UNKNOWN
+    return ErrorResponse(code=err.code, message=err.message, detail=str(e))
+
+
+def _is_retryable(e: BaseException) -> bool:
+    # 잘못된 요청/질문 없음(4xx)은 다시 해도 같으므로 실패 처리, 429(CPU 대기열 초과)와 5xx 는 재시도
+    if isinstance(e, AppException):
+        status = e.error.http_status
+        return status >= 500 or status == ReportErrorCode.TOO_MANY_REQUESTS.http_status
+    return True
+
+
+async def submit_job(r: Redis, kind: str, room_id: str, latest_first: bool = False) -> ReportJobStatus:
+    global _submit_script
+    if _submit_script is None:
+        _submit_script = r.register_script(JOB_SUBMIT_LUA)
+    params = _params(kind, latest_first)
+    active_key = JOB_ACTIVE_KEY_FMT.format(kind=kind, roomId=room_id, params=params)
+    job_id = uuid.uuid4().hex
+    now = _now_ms()
+
+    # 같은 리포트 작업이 이미 대기/실행 중이면 합치고, 아니면 등록 (Lua 한 번으로 원자적으로)
+    got = await _submit_script(
+        keys=[active_key, JOB_QUEUE_KEY],
+        args=[job_id, JOB_KEY_FMT.format(jobId=""), settings.JOB_RESULT_TTL_SEC, now, kind, room_id, params],
+        client=r,
+    )
+    if isinstance(got, bytes):
+        got = got.decode("utf-8")
+    if got != job_id:
+        h = await r.hgetall(JOB_KEY_FMT.format(jobId=got))
+        if h:
+            logger.info(f"[작업큐] {kind} room={room_id} 진행 중인 작업({got})에 합류")
+            return _to_status(h)
+        # 확인 직후 끝나고 만료된 경우 (보관 TTL 이 지나야 하므로 사실상 없음) → 다시 등록
+        return await submit_job(r, kind, room_id, latest_first)
+
+    logger.info(f"[작업큐] {kind} room={room_id} 작업 등록 (jobId={job_id})")
+    job = {
+        "id": job_id, "kind": kind, "roomId": room_id, "params": params,
+        "status": "queued", "attempts": 0, "createdAt": now, "updatedAt": now,
+    }
+    return _to_status({k: str(v) for k, v in job.items()})
+
+
+async def get_job(r: Redis, job_id: str) -> Optional[ReportJobStatus]:
+    h = await r.hgetall(JOB_KEY_FMT.format(jobId=job_id))
+    return _to_status(h) if h else None
+
+
+async def wait_job(r: Redis, job_id: str, timeout_sec: float) -> Optional[ReportJobStatus]:
+    # long-poll: 끝나거나 timeout 까지 JOB_POLL_MS 주기로 상태 확인
+    deadline = time.monotonic() + timeout_sec
+    while True:
+        job = await get_job(r, job_id)
+        if job is None or job.status in _FINISHED or time.monotonic() >= deadline:
+            return job
+        await asyncio.sleep(min(settings.JOB_POLL_MS / 1000, max(0.0, deadline - time.monotonic())))
+
+
+async def _run(r: Redis, h: Dict[str, str]) -> Dict[str, Any]:
+    if h["kind"] == "top3":
+        report = await cached_top3_report(r, h["roomId"])
+    else:
+        latest_first = h["params"] == "latest_first=1"
+        report = await cached_top_slide_report(r, h["roomId"], latest_first=latest_first)
+    return report.model_dump()
+
+
+async def _finish(r: Redis, h: Dict[str, str], fields: Dict[str, Any], processing_key: str) -> None:
+    # 활성 작업 키는 이 작업을 가리킬 때만 지운다 (그 사이 등록된 새 작업의 키를 지우지 않도록, Lua 로 원자적으로)
+    global _finish_script
+    if _finish_script is None:
+        _finish_script = r.register_script(JOB_FINISH_LUA)
+    active_key = JOB_ACTIVE_KEY_FMT.format(kind=h["kind"], roomId=h["roomId"], params=h["params"])
+    pairs = [x for kv in {**fields, "updatedAt": _now_ms()}.items() for x in kv]
+    await _finish_script(
+        keys=[JOB_KEY_FMT.format(jobId=h["id"]), processing_key, active_key],
+        args=[h["id"], settings.JOB_RESULT_TTL_SEC, *pairs],
+        client=r,
+    )
+
+
+async def _handle(r: Redis, job_id: str, processing_key: str) -> None:
+    key = JOB_KEY_FMT.format(jobId=job_id)
+    h = await r.hgetall(key)
+    if not h:
+        logger.warning(f"[작업큐] jobId={job_id} 상태가 없어 건너뜀 (만료)")
+        await r.lrem(processing_key, 1, job_id)
+        return
+    attempts = int(h.get("attempts", 0)) + 1
+    if attempts > settings.JOB_MAX_ATTEMPTS:
+        # 실행 도중 워커가 계속 죽는 작업 (회수될 때마다 다시 시작하지 않도록)
+        logger.error(f"[작업큐] jobId={job_id} 최대 시도 횟수 초과, 실패 처리")
+        err = ErrorResponse(
+            code=ReportErrorCode.UNKNOWN.code, message=ReportErrorCode.UNKNOWN.message,
+            detail="작업 실행 중 워커가 종료되었습니다.",
+        )
+        await _finish(r, h, {"status": "failed", "error": err.model_dump_json()}, processing_key)
+        return
+    await r.hset(key, mapping={"status": "running", "attempts": attempts, "updatedAt": _now_ms()})
+    logger.info(f"[작업큐] {h['kind']} room={h['roomId']} 실행 (jobId={job_id}, {attempts}회차)")
+
+    try:
+        result = await _run(r, h)
+    except asyncio.CancelledError:
+        # 워커 종료: 다음 워커가 바로 이어받도록 큐 앞쪽(꺼내는 쪽)에 되돌림
+        pipe = r.pipeline()
+        pipe.hset(key, mapping={"status": "queued", "attempts": attempts - 1, "updatedAt": _now_ms()})
+        pipe.lrem(processing_key, 1, job_id)
+        pipe.rpush(JOB_QUEUE_KEY, job_id)
+        await pipe.execute()
+        raise
+    except Exception as e:
+        err = _to_error(e).model_dump_json()
+        if attempts < settings.JOB_MAX_ATTEMPTS and _is_retryable(e):
+            delay = settings.JOB_RETRY_BACKOFF_SEC * (2 ** (attempts - 1))
+            logger.warning(f"[작업큐] jobId={job_id} 실패, {delay:.1f}s 후 재시도 ({attempts}/{settings.JOB_MAX_ATTEMPTS}): {e}")
+            # 워커가 기다리지 않도록 지연 ZSET 에 넣고 바로 다음 작업으로 (시각이 되면 정리 루프가 큐로 옮김)
+            now = _now_ms()
+            pipe = r.pipeline()
+            pipe.hset(key, mapping={"status": "queued", "error": err, "updatedAt": now})
+            pipe.zadd(JOB_DELAYED_KEY, {job_id: now + int(delay * 1000)})
+            pipe.lrem(processing_key, 1, job_id)
+            await pipe.execute()
+        else:
+            logger.error(f"[작업큐] jobId={job_id} 최종 실패 ({attempts}회): {e}")
+            await _finish(r, h, {"status": "failed", "error": err}, processing_key)
+        return
+
+    await _finish(
+        r, h, {"status": "done", "result": json.dumps(result, ensure_ascii=False), "error": ""}, processing_key
+    )
+    logger.info(f"[작업큐] {h['kind']} room={h['roomId']} 완료 (jobId={job_id})")
+
+
+async def maintain_queue(r: Redis) -> Tuple[int, int]:
+    # 재시도 시각이 된 작업 수, 죽은 워커에게서 회수한 작업 수
+    global _maintain_script
+    if _maintain_script is None:
+        _maintain_script = r.register_script(JOB_MAINTAIN_LUA)
+    promoted, reclaimed = await _maintain_script(
+        keys=[JOB_QUEUE_KEY, JOB_DELAYED_KEY, JOB_WORKERS_KEY],
+        args=[
+            _now_ms(),
+            JOB_KEY_FMT.format(jobId=""),
+            JOB_PROCESSING_KEY_FMT.format(worker=""),
+            JOB_HEARTBEAT_KEY_FMT.format(worker=""),
+        ],
+        client=r,
+    )
+    if reclaimed:
+        logger.warning(f"[작업큐] 응답 없는 워커의 작업 {reclaimed}개를 큐로 되돌림")
+    return int(promoted), int(reclaimed)
+
+
+class ReportJobWorkers:
+    """큐를 BLMOVE 로 소비하는 워커 코루틴 묶음 + 정리 루프 (lifespan 에서 start/stop)"""
+
+    def __init__(self, r: Redis, concurrency: int):
+        self.r = r
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.processing_key = JOB_PROCESSING_KEY_FMT.format(worker=self.worker_id)
+        self._registered = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._maintain(), name="report-job-maintain"))
+        for i in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._loop(i), name=f"report-job-worker-{i}"))
+        logger.info(f"[작업큐] 워커 {self.concurrency}개 시작 (id={self.worker_id})")
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        try:
+            # 실행 중이던 작업은 cancel 시 큐로 되돌렸으므로 처리 목록과 생존 신호를 정리
+            pipe = self.r.pipeline()
+            pipe.srem(JOB_WORKERS_KEY, self.worker_id)
+            pipe.delete(self.processing_key, JOB_HEARTBEAT_KEY_FMT.format(worker=self.worker_id))
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"[작업큐] 워커 등록 해제 실패 (생존 신호 만료 후 회수됨): {e}")
+        logger.info("[작업큐] 워커 종료")
+
+    async def _maintain(self) -> None:
+        # 생존 신호를 먼저 등록한 뒤에 워커가 작업을 꺼내기 시작한다 (등록 전 크래시로 작업이 고아가 되지 않도록)
+        while True:
+            try:
+                pipe = self.r.pipeline()
+                pipe.set(JOB_HEARTBEAT_KEY_FMT.format(worker=self.worker_id), _now_ms(), ex=settings.JOB_LEASE_SEC)
+                pipe.sadd(JOB_WORKERS_KEY, self.worker_id)
+                await pipe.execute()
+                self._registered.set()
+                await maintain_queue(self.r)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"[작업큐] 정리 루프 오류: {e}")
+            await asyncio.sleep(_MAINTAIN_INTERVAL_SEC)
+
+    async def _loop(self, i: int) -> None:
+        await self._registered.wait()
+        while True:
+            try:
+                job_id = await self.r.blmove(JOB_QUEUE_KEY, self.processing_key, 1, "RIGHT", "LEFT")
+                if job_id is None:
+                    # BLOCK 을 지원하지 않는 서버(fakeredis 등)가 바로 빈 응답을 줘도 루프가 헛돌지 않도록
+                    await asyncio.sleep(0.1)
+                    continue
+                await _handle(self.r, job_id, self.processing_key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"[작업큐] 워커 {i} 오류: {e}")
+                await asyncio.sleep(1)
+
+
+if __name__ == "__main__":
+    # python -m services.report_jobs  → API 와 분리된 워커 프로세스 (앱은 JOB_WORKERS=0 으로 실행)
+    from core.redis import get_redis, close_redis
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    async def _main():
+        workers = ReportJobWorkers(await get_redis(), max(1, settings.JOB_WORKERS))
+        workers.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await workers.stop()
+            await close_redis()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
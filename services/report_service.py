@@ -0,0 +1,56 @@
+import logging
+
+from redis.asyncio import Redis
+
+from config.settings import settings
+from core.singleflight import SingleFlight
+from models.max_slide_report import TopSlideReport
+from models.question_report import TopQuestionReportResponse
+from services.max_slide_report import get_top_slide_report
+from services.question_reader import iter_room_questions
+from services.report_cache import get_or_compute_report
+from services.top3_service import build_top3, build_top3_incremental
+
+logger = logging.getLogger(__name__)
+
+##  리포트 조회 공통 경로 (HTTP 라우터 / 작업 큐 워커가 같이 사용)
+##     - 질문이 그대로면 캐시된 리포트, 아니면 single-flight 로 한 번만 계산
+##     - 계산 결과는 report 테이블 저장(write-behind) + 리포트 캐시 저장까지 포함
+
+# 같은 방/옵션으로 동시에 들어온 요청은 계산 1번으로 합친다
+_top3_flight = SingleFlight("top3")
+_top_slide_flight = SingleFlight("top-slide")
+
+
+async def _compute_top3(room_id: str) -> TopQuestionReportResponse:
+    if settings.TOP3_INCREMENTAL:
+        # 직전 요청 이후 새로 들어온 질문만 기존 클러스터에 합류
+        return await build_top3_incremental(room_id)
+    return await build_top3(room_id, iter_room_questions(room_id))
+
+
+async def cached_top3_report(r: Redis, room_id: str) -> TopQuestionReportResponse:
+    return await get_or_compute_report(
+        r, "top3", room_id, "-", TopQuestionReportResponse,
+        lambda: _top3_flight.do(
+            room_id,
+            lambda: _compute_top3(room_id),
+            redis=r if settings.SINGLEFLIGHT_REDIS else None,
+            dumps=TopQuestionReportResponse.model_dump_json,
+            loads=TopQuestionReportResponse.model_validate_json,
+        ),
+    )
+
+
+async def cached_top_slide_report(r: Redis, room_id: str, latest_first: bool = False) -> TopSlideReport:
+    params = f"latest_first={int(latest_first)}"
+    return await get_or_compute_report(
+        r, "top-slide", room_id, params, TopSlideReport,
+        lambda: _top_slide_flight.do(
+            f"{room_id}:{params}",
+            lambda: get_top_slide_report(r, room_id, latest_first=latest_first),
+            redis=r if settings.SINGLEFLIGHT_REDIS else None,
+            dumps=TopSlideReport.model_dump_json,
+            loads=TopSlideReport.model_validate_json,
+        ),
+    )
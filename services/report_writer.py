@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from core.db import async_session_factory
+from core.metrics import stage
+from repositories.report_repo import ReportRow, upsert_report_rows
+
+logger = logging.getLogger(__name__)
+
+##  report 테이블 write-behind 저장기
+##     - write(room_id, top3question=..., popular_question=...) 는 방별 버퍼에 컬럼 값만 합쳐 두고 바로 반환
+##       (같은 방의 TOP3/top-slide 결과가 한 행으로 합쳐짐, 같은 컬럼은 마지막 값이 이김)
+##     - REPORT_WRITER_FLUSH_MS 마다, 또는 버퍼가 REPORT_WRITER_MAX_ROWS 개 방을 넘으면 flush
+##     - flush: 컬럼 조합별로 multi-row INSERT ... ON DUPLICATE KEY UPDATE → 트랜잭션(commit) 1번
+##     - 실패한 행은 버퍼에 되돌려 다음 주기에 재시도 (그 사이 들어온 새 값이 우선)
+##     - lifespan 종료 시 stop() 에서 남은 버퍼를 flush (실패하면 유실된 방을 로그로 남기고 종료는 계속)
+##   백그라운드 루프가 없으면(스크립트/REPORT_WRITER_ENABLED=False) write() 가 바로 flush 하는 write-through
+##   결과를 바로 알아야 하는 저장(배치 리포트)은 save_now(): 같은 방의 버퍼 값을 밑에 깔고 즉시 저장
+##     (버퍼에 남은 예전 리포트가 나중에 flush 되어 방금 저장한 행을 덮어쓰지 않도록)
+
+
+async def save_report_rows(batch: Dict[str, Dict[str, Any]]) -> int:
+    # {room_id: {컬럼: 값}} 을 트랜잭션 1번으로 저장, 실행한 문장 그룹 수 반환 (실패 시 롤백 후 예외)
+    #   컬럼 조합별로 묶음: 한 컬럼만 쓴 방이 다른 컬럼을 덮어쓰지 않도록
+    shapes: Dict[Tuple[str, ...], List[ReportRow]] = {}
+    for room_id, cols in batch.items():
+        shape = tuple(sorted(cols))
+        shapes.setdefault(shape, []).append((room_id, *(cols[c] for c in shape)))
+
+    async with async_session_factory() as db:
+        try:
+            for shape, rows in shapes.items():
+                await upsert_report_rows(db, shape, rows)
+            with stage("db_commit"):
+                await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return len(shapes)
+
+
+class ReportWriter:
+    def __init__(self, max_rows: int, flush_ms: int):
+        self.max_rows = max_rows
+        self.flush_ms = flush_ms
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._loop(), name="report-writer")
+            logger.info(f"[리포트저장] write-behind 시작 (flush {self.flush_ms}ms / {self.max_rows}행)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # DB 가 내려간 채 종료: 나머지 종료 처리(워커/이벤트 소비자/Redis 정리)는 계속 진행
+            dropped = sorted(self._pending)
+            self._pending = {}
+            logger.error(f"[리포트저장] 종료 중 저장 실패, 방 {len(dropped)}개 리포트 유실 {dropped}: {e}")
+            return
+        logger.info("[리포트저장] write-behind 종료 (남은 버퍼 flush 완료)")
+
+    async def write(self, room_id: str, **columns: Any) -> None:
+        self._pending.setdefault(room_id, {}).update(columns)
+        if not self.running:
+            try:
+                await self.flush()
+            except Exception:
+                pass  # 리포트 응답은 그대로 반환 (로그는 flush 에서, 버퍼에 남아 다음 저장 때 재시도)
+        elif len(self._pending) >= self.max_rows:
+            self._wake.set()
+
+    async def save_now(self, batch: Dict[str, Dict[str, Any]]) -> int:
+        # batch 를 버퍼를 거치지 않고 바로 저장, 실패하면 예외 (저장한 문장 그룹 수 반환)
+        #   같은 방의 버퍼 값은 batch 밑에 합쳐 함께 저장하고 버퍼에서 뺀다 (flush 와 같은 락 → 순서 보장)
+        async with self._lock:
+            taken = {room_id: self._pending.pop(room_id) for room_id in batch if room_id in self._pending}
+            try:
+                return await save_report_rows({
+                    room_id: {**taken.get(room_id, {}), **cols} for room_id, cols in batch.items()
+                })
+            except Exception:
+                for room_id, cols in taken.items():
+                    self._pending[room_id] = {**cols, **self._pending.get(room_id, {})}
+                raise
+
+    async def flush(self) -> int:
+        # 저장한 방 수 반환
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            try:
+                n_shapes = await save_report_rows(batch)
+            except Exception as e:
+                for room_id, cols in batch.items():
+                    self._pending[room_id] = {**cols, **self._pending.get(room_id, {})}
+                logger.error(f"[리포트저장] {len(batch)}개 방 저장 실패, 다음 주기에 재시도: {e}")
+                raise
+            logger.info(f"[리포트저장] {len(batch)}개 방 저장 (문장 그룹 {n_shapes}개, commit 1회)")
+            return len(batch)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(self.flush_ms / 1000)  # 실패 시 한 주기 쉬고 재시도 (로그는 flush 에서)
+
+
+_writer: Optional[ReportWriter] = None
+
+
+def get_report_writer() -> ReportWriter:
+    global _writer
+    if _writer is None:
+        _writer = ReportWriter(max_rows=settings.REPORT_WRITER_MAX_ROWS, flush_ms=settings.REPORT_WRITER_FLUSH_MS)
+    return _writer
+
+
+async def write_report(room_id: str, **columns: Any) -> None:
+    # columns: top3question=..., popular_question=... (None 이면 NULL)
+    await get_report_writer().write(room_id, **columns)
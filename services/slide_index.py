@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import re
+from typing import Dict, List
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config.settings import settings
+from core.metrics import stage
+from exception.errors import AppException, ReportErrorCode
+from services.question_reader import ROOM_QUESTIONS_KEY_FMT
+
+logger = logging.getLogger(__name__)
+
+SLIDE_ZSET_PATTERN = "room:{roomId}:page:*:questions"
+SLIDE_ZSET_FMT = "room:{roomId}:page:{slide}:questions"
+SLIDE_COUNTS_KEY_FMT = "room:{roomId}:slide_counts"              # ZSET member=슬라이드 번호, score=질문 수
+SLIDE_COUNTS_TOTAL_KEY_FMT = "room:{roomId}:slide_counts:total"  # 인덱스가 반영한 방 전체 질문 수
+SLIDE_COUNTS_WM_KEY_FMT = "room:{roomId}:slide_counts:wm"        # 인덱스가 반영한 마지막 질문 score(ts)
+
+_ROOM_ID_RE = re.compile(r"^room:(.+):page:\d+:questions$")
+
+##  방별 슬라이드 질문 수 인덱스
+##     - room:{roomId}:slide_counts (ZSET) 에서 ZREVRANGE 0 0 한 번으로 최다 슬라이드를 찾는다
+##     - 질문은 외부 서비스가 쓰고 이 인덱스는 건드리지 않는다 (index_question() 호출은 선택)
+##     - 읽을 때 room:{roomId}:questions 의 ZCARD 와 :total 이 다르면 sync_slide_index() 로 맞춘다
+##         1) 증분: 워터마크(:wm, 마지막으로 반영한 score) 이후 질문만 Lua 로 ZINCRBY (발표 중 평소 경로)
+##         2) 재구성: 증분으로 개수가 맞지 않으면 (삭제, 워터마크 이전 ts 로 들어온 질문, 만료된 Hash 등)
+##            rebuild_slide_index() 로 기존 슬라이드 키(SCAN)에서 다시 만든다 (backfill/repair)
+##     - 인덱스 키 3개는 반영할 때마다 SLIDE_INDEX_TTL_SEC 로 만료를 갱신 (질문이 만료된 방의 인덱스가 남지 않도록)
+
+
+##  Redis에서 특정 패턴(room:{roomId}:page:*:questions)에 맞는 모든 키를 스캔하는 함수
+##     - Redis의 SCAN 명령을 사용해서 슬라이드별 질문 목록 키(ZSET)들을 찾음
+##     - 한 번에 너무 많은 키를 읽지 않기 위해 count 단위로 반복 스캔
+##     - 결과: ["room:...:page:1:questions", "room:...:page:2:questions", ...]
+async def _scan_keys(r: Redis, pattern: str, count: int = 200) -> List[str]:
+    cursor = 0  # int
+    keys: List[str] = []
+    try:
+        logger.debug(f"[SCAN] Redis 키 스캔 시작: pattern={pattern}")
+        while True:
+            cursor, chunk = await r.scan(cursor=cursor, match=pattern, count=count)
+            keys.extend(chunk)
+            logger.debug(f"[SCAN] {len(chunk)}개의 키 조회됨 (cursor={cursor})")
+            if cursor == 0:  # int 비교
+                break
+        logger.info(f"[SCAN] 총 {len(keys)}개의 슬라이드 키 발견")
+        return keys
+    except RedisError as e:
+        logger.error(f"[SCAN] Redis 스캔 중 오류 발생: {e}")
+        raise AppException(ReportErrorCode.REDIS_ERROR, detail=str(e))  # [수정]
+
+##   Redis 키 문자열에서 슬라이드 번호(page:X)를 추출하는 함수
+##     - 예: "room:abc:page:3:questions" → 3
+##     - 없으면 기본값 0 반환
+def _parse_slide_no(zset_key: str) -> int:
+    m = re.search(r"page:(\d+):questions$", zset_key)
+    slide_no = int(m.group(1)) if m else 0
+    logger.debug(f"[PARSE] 키에서 슬라이드 번호 추출: {slide_no} ({zset_key})")
+    return slide_no
+
+
+##  워터마크 이후 추가된 질문만 인덱스에 반영하는 Lua 스크립트 (읽기 + 반영을 원자적으로 처리)
+##     KEYS[1] room:{roomId}:questions, KEYS[2] :total, KEYS[3] slide_counts, KEYS[4] :wm
+##     ARGV[1] roomId, ARGV[2] 한 번에 반영할 최대 질문 수, ARGV[3] 인덱스 키 TTL(초)
+##   반환: 반영한 질문 수 (0 이면 이미 최신), -1 이면 증분으로 맞출 수 없음 → 전체 재구성
+##   워터마크와 같은 score 로 나중에 들어온 질문은 (wm 이후 범위에서 빠지므로) 개수 확인에서 걸러져 재구성된다
+SLIDE_INDEX_SYNC_LUA = """
+local indexed = redis.call('GET', KEYS[2])
+local wm = redis.call('GET', KEYS[4])
+if (not indexed) or (not wm) then
+    return -1
+end
+local missing = redis.call('ZCARD', KEYS[1]) - tonumber(indexed)
+if missing == 0 then
+    return 0
+end
+if missing < 0 or missing > tonumber(ARGV[2]) then
+    return -1
+end
+local fresh = redis.call('ZRANGEBYSCORE', KEYS[1], '(' .. wm, '+inf', 'WITHSCORES', 'LIMIT', 0, missing + 1)
+if #fresh ~= missing * 2 then
+    return -1
+end
+local slides = {}
+for i = 1, #fresh, 2 do
+    local slide = redis.call('HGET', 'room:' .. ARGV[1] .. ':question:' .. fresh[i], 'slide')
+    if not slide then
+        return -1
+    end
+    slides[#slides + 1] = slide
+end
+for _, slide in ipairs(slides) do
+    redis.call('ZINCRBY', KEYS[3], 1, slide)
+end
+redis.call('INCRBY', KEYS[2], missing)
+redis.call('SET', KEYS[4], fresh[#fresh])
+for i = 2, 4 do
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return missing
+"""
+
+_sync_script = None
+
+
+async def sync_slide_index(r: Redis, room_id: str) -> None:
+    # 인덱스가 낡았을 때 호출: 새 질문만 증분 반영하고, 안 되면 전체 재구성
+    global _sync_script
+    if _sync_script is None:
+        _sync_script = r.register_script(SLIDE_INDEX_SYNC_LUA)
+    keys = [
+        ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id),
+        SLIDE_COUNTS_TOTAL_KEY_FMT.format(roomId=room_id),
+        SLIDE_COUNTS_KEY_FMT.format(roomId=room_id),
+        SLIDE_COUNTS_WM_KEY_FMT.format(roomId=room_id),
+    ]
+    with stage("slide_index_sync"):
+        added = int(await _sync_script(keys=keys, args=[room_id, settings.SLIDE_INDEX_SYNC_MAX, settings.SLIDE_INDEX_TTL_SEC],
+                                       client=r))
+    if added >= 0:
+        logger.debug(f"[슬라이드인덱스] room={room_id} 증분 반영 {added}개")
+        return
+    logger.info(f"[슬라이드인덱스] room={room_id} 증분 반영 불가(인덱스 없음/삭제/순서 어긋남) → 재구성")
+    await rebuild_slide_index(r, room_id)
+
+
+async def index_question(r: Redis, room_id: str, slide_no: int, delta: int = 1) -> None:
+    # 질문 저장/삭제 시 함께 호출 (삭제는 delta=-1)
+    # 선택 사항: 호출하지 않아도 다음 조회 때 sync_slide_index() 가 맞춘다
+    counts_key = SLIDE_COUNTS_KEY_FMT.format(roomId=room_id)
+    total_key = SLIDE_COUNTS_TOTAL_KEY_FMT.format(roomId=room_id)
+    pipe = r.pipeline()
+    pipe.zincrby(counts_key, delta, str(slide_no))
+    pipe.incrby(total_key, delta)
+    pipe.expire(counts_key, settings.SLIDE_INDEX_TTL_SEC)
+    pipe.expire(total_key, settings.SLIDE_INDEX_TTL_SEC)
+    await pipe.execute()
+
+
+async def rebuild_slide_index(r: Redis, room_id: str) -> Dict[int, int]:
+    # 기존 슬라이드 키에서 인덱스를 다시 만든다 (SCAN + ZCARD 파이프라인)
+    with stage("slide_index_rebuild"):
+        slide_keys = await _scan_keys(r, SLIDE_ZSET_PATTERN.format(roomId=room_id))
+        return await _rebuild_from_keys(r, room_id, slide_keys)
+
+
+async def _rebuild_from_keys(r: Redis, room_id: str, slide_keys: List[str]) -> Dict[int, int]:
+    room_key = ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id)
+    pipe = r.pipeline()  # 슬라이드별 개수와 방 전체 개수/워터마크를 같은 시점으로 읽음
+    for k in slide_keys:
+        pipe.zcard(k)
+    pipe.zcard(room_key)
+    pipe.zrevrange(room_key, 0, 0, withscores=True)
+    *counts, room_total, last = await pipe.execute()
+
+    slide_counts = {_parse_slide_no(k): int(c) for k, c in zip(slide_keys, counts) if c}
+    idx_key = SLIDE_COUNTS_KEY_FMT.format(roomId=room_id)
+    pipe = r.pipeline()  # MULTI/EXEC: 읽는 쪽이 반쯤 만들어진 인덱스를 보지 않도록
+    pipe.delete(idx_key)
+    if slide_counts:
+        pipe.zadd(idx_key, {str(s): c for s, c in slide_counts.items()})
+    ttl = settings.SLIDE_INDEX_TTL_SEC
+    pipe.set(SLIDE_COUNTS_TOTAL_KEY_FMT.format(roomId=room_id), int(room_total), ex=ttl)
+    pipe.set(SLIDE_COUNTS_WM_KEY_FMT.format(roomId=room_id), repr(float(last[0][1])) if last else "-inf", ex=ttl)
+    if slide_counts:
+        pipe.expire(idx_key, ttl)
+    await pipe.execute()
+    logger.info(f"[슬라이드인덱스] room={room_id} 재구성 완료 (슬라이드 {len(slide_counts)}개, 질문 {room_total}개)")
+    return slide_counts
+
+
+async def backfill_all_slide_indexes(r: Redis) -> int:
+    # 운영 중 최초 도입/복구용: 모든 방의 인덱스를 재구성하고 처리한 방 수를 반환
+    # 키스페이스 SCAN 은 한 번만 하고 방별로 묶어서 재구성
+    by_room: Dict[str, List[str]] = {}
+    for k in await _scan_keys(r, "room:*:page:*:questions", count=1000):
+        m = _ROOM_ID_RE.match(k)
+        if m:
+            by_room.setdefault(m.group(1), []).append(k)
+    for room_id in sorted(by_room):
+        await _rebuild_from_keys(r, room_id, by_room[room_id])
+    return len(by_room)
+
+
+if __name__ == "__main__":
+    # python -m services.slide_index  → 전체 방 인덱스 backfill
+    from core.redis import get_redis, close_redis
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def _main():
+        r = await get_redis()
+        try:
+            n = await backfill_all_slide_indexes(r)
+            logger.info(f"[슬라이드인덱스] {n}개 방 backfill 완료")
+        finally:
+            await close_redis()
+
+    asyncio.run(_main())
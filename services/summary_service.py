@@ -1,10 +1,25 @@
+import hashlib
+import json
 import logging
 from typing import List, Optional
 
+from redis.exceptions import RedisError
+
 from config.settings import settings
+from core.llm import chat_completion
+from core.metrics import stage
+from core.redis import get_redis
+from core.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# 프롬프트(시스템 메시지 포함)를 바꾸면 반드시 올릴 것 → 이전 요약 캐시가 자동으로 무효화됨
+PROMPT_VERSION = "v1"
+SUMMARY_CACHE_KEY_FMT = "summary:{digest}"
+
+# 같은 입력의 요약은 LLM 호출 1번으로 합친다
+_flight = SingleFlight("summary")
+
 def _build_prompt(lines: List[str], max_lines: int = 3) -> str:
     joined = "\n".join(f"- {s}" for s in lines if s)
     return (
@@ -16,32 +31,71 @@ def _build_prompt(lines: List[str], max_lines: int = 3) -> str:
         f"{joined}"
     )
 
-async def summarize_kor(questions: List[str], max_lines: int = 3) -> Optional[str]:
-    if not questions:
-        return None
-    if not settings.OPENAI_API_KEY:
-        logger.warning("[요약] OPENAI_API_KEY가 없어 요약을 생략합니다.")
-        return None
+def _summary_digest(questions: List[str], max_lines: int) -> str:
+    # 요약 결과를 결정하는 입력 전체(질문 순서 포함 + 모델 + 줄 수 + 프롬프트 버전)의 해시
+    h = hashlib.sha256(f"{settings.OPENAI_MODEL}\x00{max_lines}\x00{PROMPT_VERSION}".encode("utf-8"))
+    for q in questions:
+        h.update(b"\x00")
+        h.update(q.encode("utf-8"))
+    return h.hexdigest()
 
+async def _summarize_llm(questions: List[str], max_lines: int) -> Optional[str]:
     try:
-        # OpenAI SDK v1.x
-        from openai import OpenAI  # type: ignore
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
         prompt = _build_prompt(questions, max_lines=max_lines)
-        resp = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "넌 발표 보조 요약가야. 한국어로 명확하고 간결하게 적어."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-            max_tokens=240,
-        )
-        text = resp.choices[0].message.content.strip()
+        with stage("llm_summary"):
+            text = await chat_completion(
+                model=settings.OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": "넌 발표 보조 요약가야. 한국어로 명확하고 간결하게 적어."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+                max_tokens=240,
+            )
+        if not text:
+            return None
+        text = text.strip()
         # 안전 가드: 3줄 초과 시 상위 3줄만
         lines = [l.strip() for l in text.splitlines() if l.strip()]
         return "\n".join(lines[:max_lines]) if lines else None
     except Exception as e:
         logger.error(f"[요약] OpenAI 호출 중 오류: {e}")
         return None
+
+async def _summarize_and_store(key: str, questions: List[str], max_lines: int) -> Optional[str]:
+    summary = await _summarize_llm(questions, max_lines)
+    if summary is None:
+        return None  # 실패/빈 응답은 캐시하지 않음 (다음 요청에서 재시도)
+    try:
+        r = await get_redis()
+        await r.set(key, summary, ex=settings.SUMMARY_CACHE_TTL_SEC)
+    except RedisError as e:
+        logger.warning(f"[요약] 캐시 저장 실패: {e}")
+    return summary
+
+async def summarize_kor(questions: List[str], max_lines: int = 3) -> Optional[str]:
+    if not questions:
+        return None
+    if not settings.OPENAI_API_KEY:
+        logger.warning("[요약] OPENAI_API_KEY가 없어 요약을 생략합니다.")
+        return None
+
+    digest = _summary_digest(questions, max_lines)
+    key = SUMMARY_CACHE_KEY_FMT.format(digest=digest)
+    r = None
+    try:
+        r = await get_redis()
+        cached = await r.get(key)
+        if cached is not None:
+            logger.info(f"[요약] 캐시 적중 ({digest[:12]})")
+            return cached
+    except RedisError as e:
+        logger.warning(f"[요약] 캐시 조회 실패, LLM 직접 호출: {e}")
+
+    return await _flight.do(
+        digest,
+        lambda: _summarize_and_store(key, questions, max_lines),
+        redis=r if settings.SINGLEFLIGHT_REDIS else None,
+        dumps=json.dumps,
+        loads=json.loads,
+    )
@@ -2,9 +2,11 @@ import re
 from collections import Counter
 
 import unicodedata
-from typing import Iterable, Set, Tuple, List, Dict
+from typing import Iterable, Sequence, Set, Tuple, List, Dict
 import math
 
+import numpy as np
+
 
 _SPACE_MULTI = re.compile(r"\s+")
 _PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
@@ -48,9 +50,72 @@ def simhash64(features: Iterable[str]) -> int:
             out |= (1 << i)
     return out
 
+# 배치(NumPy) 버전: murmur64 / simhash64 와 비트 단위로 같은 결과 (저장된 simhash 와 그대로 비교 가능)
+_M64 = np.uint64(0x5BD1E9955BD1E995)
+_SEED64 = np.uint64(0xC70F6907)
+_BITS64 = np.arange(64, dtype=np.uint64)
+_SIMHASH_CHUNK = 4096  # 한 번에 비트 합산할 문장 수 (피처 수 x 64 행렬 메모리 상한)
+
+def murmur64_batch(features: Sequence[str]) -> np.ndarray:
+    # UTF-8 바이트 길이가 같은 피처끼리 (F, L) 행렬로 묶어 바이트 열 단위로 한 번에 섞는다
+    # (uint64 곱셈은 2^64 에서 자연스럽게 잘리므로 & 0xFFFF... 와 같음)
+    out = np.empty(len(features), dtype=np.uint64)
+    by_len: Dict[int, List[int]] = {}
+    encoded = [f.encode("utf-8") for f in features]
+    for i, b in enumerate(encoded):
+        by_len.setdefault(len(b), []).append(i)
+    shift = np.uint64(47)
+    for L, idx in by_len.items():
+        h = np.full(len(idx), _SEED64, dtype=np.uint64)
+        if L:
+            data = np.frombuffer(b"".join(encoded[i] for i in idx), dtype=np.uint8).reshape(len(idx), L)
+            for j in range(L):
+                h ^= data[:, j].astype(np.uint64)
+                h *= _M64
+                h ^= h >> shift
+        out[idx] = h
+    return out
+
+def simhash64_many(feature_sets: Sequence[Iterable[str]]) -> np.ndarray:
+    # 문장별 피처 묶음 → simhash uint64 배열 (같은 피처는 한 번만 해싱, 비트 합산은 행렬 연산)
+    lists = [list(fs) for fs in feature_sets]
+    vocab: Dict[str, int] = {}
+    ids = [[vocab.setdefault(f, len(vocab)) for f in fl] for fl in lists]
+    out = np.zeros(len(lists), dtype=np.uint64)
+    if not vocab:
+        return out
+    hashes = murmur64_batch(list(vocab))
+    signs = np.where((hashes[:, None] >> _BITS64) & np.uint64(1), 1, -1).astype(np.int32)  # (U, 64)
+    weights = np.left_shift(np.uint64(1), _BITS64)
+    for start in range(0, len(ids), _SIMHASH_CHUNK):
+        chunk = ids[start:start + _SIMHASH_CHUNK]
+        lens = np.fromiter((len(x) for x in chunk), dtype=np.int64, count=len(chunk))
+        nonempty = np.flatnonzero(lens)
+        if not len(nonempty):
+            continue
+        flat = np.fromiter((f for x in chunk for f in x), dtype=np.int64, count=int(lens.sum()))
+        offsets = np.concatenate(([0], np.cumsum(lens)[:-1]))[nonempty]
+        v = np.add.reduceat(signs[flat], offsets, axis=0)  # (비어 있지 않은 문장 수, 64)
+        out[start + nonempty] = ((v > 0).astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+    return out
+
+def simhash64_batch(texts: Sequence[str], n: int = 2) -> np.ndarray:
+    # 정규화된 문장 목록 → [simhash64(char_ngrams(t, n)) ...] 와 같은 uint64 배열
+    return simhash64_many([char_ngrams(t, n) for t in texts])
+
 def hamming(a: int, b: int) -> int:
     return (a ^ b).bit_count()
 
+# 바이트별 popcount 테이블 (np.bitwise_count 가 없는 NumPy 1.x 용)
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def hamming_many(a: int, bs: np.ndarray) -> np.ndarray:
+    # simhash 하나(a)와 uint64 배열(bs) 각각의 해밍 거리를 한 번에 계산
+    x = np.bitwise_xor(bs, np.uint64(a))
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x).astype(np.int64)
+    return _POPCOUNT8[x.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.int64)
+
 def jaccard(a: Set[str], b: Set[str]) -> float:
     if not a and not b:
         return 1.0
@@ -1,16 +1,28 @@
-from typing import List, Set, Dict
+import asyncio
+import math
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 import numpy as np
 import logging
-from sentence_transformers import SentenceTransformer
+import threading
 from models.question_report import QuestionRecord, TopQuestionItem, TopQuestionReportResponse
 from . import text_sim as TS
 from exception.errors import AppException, ReportErrorCode  # [추가]
-from redis.exceptions import RedisError
-from sqlalchemy.ext.asyncio import AsyncSession  # ← DB 세션 타입힌트
-from repositories.top_question_repo import (     # ← 너가 방금 만든 레포지토리
-    upsert_top3_null,                            #     0개일 때 NULL 업서트
-    update_report_top3,                          #     TOP3를 JSON으로 저장
+from config.settings import settings
+from core.redis import get_redis_raw
+from core.executor import run_cpu
+from core.metrics import ROOM_QUESTIONS, TOP3_CLUSTERS, stage
+from core.profiler import tag_profile
+from services.embedding_cache import EmbeddingCache
+from services.question_fetch import hmget_questions
+from services.question_reader import iter_room_questions, ROOM_QUESTIONS_KEY_FMT
+from services.top3_state import (
+    MEMBER_SEQ_SPAN, decode_state, encode_state, load_top3_members, load_top3_state, save_top3_state,
 )
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from repositories.top_question_repo import top3_payload  # TOP3 → report.top3question 저장값
+from services.report_writer import write_report           # report 테이블 write-behind 저장
 
 logger = logging.getLogger(__name__)
 
@@ -23,149 +35,673 @@ HAMMING_THRESHOLD = 4
 JACCARD_FALLBACK = 0.60
 BUCKET_BITS = 14
 
-_model = SentenceTransformer(EMB_MODEL)
+# 벡터화 코사인과 쌍별 코사인의 반올림 오차 허용 범위 (float32 내적 기준)
+_COS_TIE_EPS = 1e-4
+
+_model = None               # 첫 사용(또는 워밍업) 시점에 로드
+_model_lock = threading.Lock()
+_model_warm = False         # 워밍업 encode 완료 여부 (process 모드에서는 워커 쪽에서 로드됨)
+_emb_cache = EmbeddingCache(EMB_MODEL, max_items=settings.EMB_CACHE_SIZE, ttl_sec=settings.EMB_CACHE_TTL_SEC)
+
+def _get_model():
+    # torch / sentence-transformers 임포트와 가중치 로드를 실제로 필요할 때까지 미룬다
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer  # type: ignore
+                    logger.info(f"[임베딩] 모델 로드 시작: {EMB_MODEL}")
+                    _model = SentenceTransformer(EMB_MODEL)
+                    logger.info("[임베딩] 모델 로드 완료")
+                except Exception as e:
+                    logger.error(f"[임베딩] 모델 로드 실패: {e}")
+                    raise AppException(ReportErrorCode.MODEL_LOAD_ERROR, detail=str(e))
+    return _model
+
+
+def _warmup_encode() -> None:
+    # 실제 요청과 같은 경로(_embed_batch)로 encode → 임베더를 바꿔 끼운 환경(부하 테스트 스텁)에서도 그대로 동작
+    _embed_batch(["워밍업 문장입니다"])
 
-def _embed(text: str) -> np.ndarray:
-    # 문장을 임베딩 (코사인 정규화 포함)
-    try:
-        return _model.encode(TS.normalize(text), normalize_embeddings=True)
-    except Exception as e:
-        logger.error(f"[임베딩] '{text[:20]}...' 처리 실패: {e}")
-        raise AppException(ReportErrorCode.EMBED_ERROR, detail=str(e))  # [추가]
 
+async def warmup_model() -> None:
+    # 모델 로드 + 더미 encode 1회 (CPU 실행기에서 수행해 이벤트 루프를 막지 않음)
+    global _model_warm
+    await run_cpu(_warmup_encode)
+    _model_warm = True
+    logger.info("[임베딩] 워밍업 완료")
 
-def _cos(a: np.ndarray, b: np.ndarray) -> float:
-    # 코사인 유사도 계산
+
+def model_ready() -> bool:
+    return _model_warm or _model is not None
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    # 정규화된 문장들을 한 번에 임베딩 (코사인 정규화 포함) → (N, D) float32 행렬
+    model = _get_model()
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
     try:
-        return float(a @ b)
+        embs = model.encode(
+            texts,
+            batch_size=settings.EMB_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(embs, dtype=np.float32)
     except Exception as e:
-        logger.error(f"[코사인] 계산 실패: {e}")
-        raise AppException(ReportErrorCode.CALC_ERROR, detail=str(e))  # [추가]
+        logger.error(f"[임베딩] {len(texts)}개 문장 배치 처리 실패: {e}")
+        raise AppException(ReportErrorCode.EMBED_ERROR, detail=str(e))
+
 
 # 내부 클래스
 class _Q:
     __slots__ = ("q", "norm", "sh", "simh", "emb")
 
-    def __init__(self, q: QuestionRecord):
-        try:
-            self.q = q
-            self.norm = TS.normalize(q.content)
-            self.sh: Set[str] = TS.char_ngrams(self.norm, NGRAM)
-            self.simh = TS.simhash64(self.sh)
-            self.emb = _embed(q.content)
-        except Exception as e:
-            logger.error(f"[질문전처리] id={getattr(q, 'id', '?')} 처리 중 오류: {e}")
-            raise AppException(ReportErrorCode.PREPROCESS_ERROR, detail=str(e))  # [추가]
+    def __init__(self, q: QuestionRecord, norm: str, emb: np.ndarray, sh: Set[str], simh: int):
+        self.q = q
+        self.norm = norm
+        self.sh = sh
+        self.simh = simh
+        self.emb = emb
+
+
+async def _embed_cached(norms: List[str]) -> np.ndarray:
+    # 캐시(LRU → Redis)에서 먼저 찾고, 미스난 문장만 모델로 배치 임베딩
+    if not norms:
+        return _embed_batch([])
+    r = await get_redis_raw() if settings.EMB_CACHE_REDIS else None
+    uniq = list(dict.fromkeys(norms))
+    with stage("embed_cache"):
+        found = await _emb_cache.get_many(r, uniq)
+    misses = [t for t in uniq if t not in found]
+    if misses:
+        with stage("embed_model"):
+            fresh = dict(zip(misses, await run_cpu(_embed_batch, misses)))
+        with stage("embed_cache"):
+            await _emb_cache.put_many(r, fresh)
+        found.update(fresh)
+    logger.info(f"[임베딩] {len(uniq)}개 문장 중 {len(misses)}개 모델 호출 (캐시 {_emb_cache.stats()})")
+    return np.stack([found[t] for t in norms])
+
+
+def embedding_cache_stats() -> Dict[str, int]:
+    return _emb_cache.stats()
+
+
+def _normalize_all(questions: List[QuestionRecord]) -> List[str]:
+    try:
+        return [TS.normalize(q.content) for q in questions]
+    except Exception as e:
+        logger.error(f"[질문전처리] 정규화 중 오류: {e}")
+        raise AppException(ReportErrorCode.PREPROCESS_ERROR, detail=str(e))
+
+
+def _prepare(questions: List[QuestionRecord], norms: List[str], embs: np.ndarray) -> List[_Q]:
+    # 전처리 단계: 정규화 문장 + 임베딩 행렬의 각 행으로 _Q 생성
+    # (simhash 는 방 전체를 NumPy 배치로 계산 → TS.simhash64 와 같은 값)
+    try:
+        shingles = [TS.char_ngrams(norm, NGRAM) for norm in norms]
+        simhs = TS.simhash64_many(shingles).tolist()
+    except Exception as e:
+        logger.error(f"[질문전처리] n-gram/simhash 계산 중 오류: {e}")
+        raise AppException(ReportErrorCode.PREPROCESS_ERROR, detail=str(e))
+    return [_Q(q, norm, embs[i], shingles[i], simhs[i]) for i, (q, norm) in enumerate(zip(questions, norms))]
 
 class _Cluster:
-    __slots__ = ("centroid", "members", "rep", "slides", "ids", "samples", "cent_emb")
+    # 멤버 _Q 전체 대신 정렬/응답에 필요한 집계값만 보관 (상태 저장/복원 가능)
+    __slots__ = ("centroid", "rep", "rep_sh", "slides", "ids", "samples", "n_samples", "cent_emb", "count", "max_ts")
     def __init__(self, first: _Q):
         self.centroid = first.simh
-        self.members: List[_Q] = [first]
         self.rep = first.q.content
+        self.rep_sh = first.sh          # 자카드 fallback 비교 대상 (첫 멤버 n-gram)
         self.slides = {first.q.slide}
         self.ids = {first.q.id}
         self.samples = [first.q.content]
+        self.n_samples = 1              # 상한 없이 셌을 때의 샘플 수 (자카드 합류의 샘플 3개 규칙 기준)
         self.cent_emb = first.emb
+        self.count = 1
+        self.max_ts = first.q.ts
 
-# 메인 로직
-async def build_top3(room_id: str, questions: List[QuestionRecord], db: AsyncSession) -> TopQuestionReportResponse:
-    # 질문 리스트를 의미/문자 기반으로 클러스터링하여 상위 3개 그룹 추출
-    try:
-        if not questions:
-            logger.info("[Top3] 입력된 질문이 없습니다.")
-            await upsert_top3_null(db, room_id)
-            return TopQuestionReportResponse(roomId=room_id,totalQuestions=0, uniqueGroups=0, top3=[])
+    def join(self, cur: _Q, jaccard: bool = False, sample_cap: Optional[int] = None, id_cap: Optional[int] = None) -> bool:
+        # 반환: 응답 samples 에 들어가는 질문인지 (자카드 합류는 샘플 3개까지만)
+        # cap 을 넘는 ID/샘플은 보관하지 않는다 (count/n_samples 는 항상 정확)
+        self.slides.add(cur.q.slide)
+        if id_cap is None or len(self.ids) < id_cap:
+            self.ids.add(cur.q.id)
+        sampled = not jaccard or self.n_samples < 3
+        if sampled:
+            self.n_samples += 1
+            if sample_cap is None or len(self.samples) < sample_cap:
+                self.samples.append(cur.q.content)
+        self.count += 1
+        self.max_ts = max(self.max_ts, cur.q.ts)
+        return sampled
+
+    def to_meta(self) -> Dict[str, Any]:
+        return {
+            "centroid": self.centroid,
+            "rep": self.rep,
+            "sh": sorted(self.rep_sh),
+            "slides": sorted(self.slides),
+            "ids": list(self.ids),
+            "samples": self.samples,
+            "nSamples": self.n_samples,
+            "count": self.count,
+            "maxTs": self.max_ts,
+        }
+
+    @classmethod
+    def from_meta(cls, meta: Dict[str, Any], cent_emb: np.ndarray) -> "_Cluster":
+        c = cls.__new__(cls)
+        c.centroid = int(meta["centroid"])
+        c.rep = meta["rep"]
+        c.rep_sh = set(meta["sh"])
+        c.slides = set(meta["slides"])
+        c.ids = set(meta["ids"])
+        c.samples = list(meta["samples"])
+        c.n_samples = int(meta["nSamples"])
+        c.cent_emb = cent_emb
+        c.count = int(meta["count"])
+        c.max_ts = int(meta["maxTs"])
+        return c
+
+
+def _sh_prefix(sh: Set[str]) -> List[str]:
+    # prefix filtering 용 앞쪽 n-gram (crc32 순서 고정 → 프로세스/재시작과 무관하게 같은 색인)
+    #   자카드 >= t 이면 공통 n-gram 이 ceil(t|S|) 개 이상 → 앞쪽 |S| - ceil(t|S|) + 1 개 안에 하나는 겹친다
+    #   (부동소수 오차로 prefix 가 짧아지지 않도록 ceil 전에 조금 뺌 → 길어지는 쪽은 안전)
+    size = len(sh) - math.ceil(JACCARD_FALLBACK * len(sh) - 1e-9) + 1
+    return sorted(sh, key=lambda g: zlib.crc32(g.encode("utf-8")))[:size]
+
+
+class _ClusterIndex:
+    """
+    클러스터 중심을 연속된 NumPy 배열로 들고 있는 greedy 클러스터링 엔진.
+    - 임베딩 중심: (C, D) float32 행렬 → 행렬-벡터 곱 1번으로 전체 코사인 계산
+    - simhash 중심: (C,) uint64 배열 → 벡터화 popcount 로 전체 해밍 거리 계산
+    - 첫 멤버 n-gram: prefix filtering 역색인 + 자카드 상한(min/max)으로 후보를 걸러냄 (결과 동일)
+      n-gram 을 고정 순서(crc32)로 정렬했을 때 자카드 >= t 인 두 집합은 앞쪽 |S| - ceil(t|S|) + 1 개 안에
+      공통 n-gram 이 반드시 있으므로, 클러스터마다 그 앞쪽 n-gram 만 색인해 두고 질문도 앞쪽 n-gram 으로만 찾는다
+    합류 규칙은 기존 클러스터 루프와 동일하다.
+    max_ids/max_samples 를 주면 클러스터마다 그 개수까지만 ID/샘플을 보관한다 (증분 상태 크기 상한).
+    joins 를 리스트로 두면 합류 기록 (클러스터 번호, 질문 ID, 샘플 여부) 을 처리 순서대로 남긴다
+    (상태 밖에 쌓는 전체 멤버 목록용).
+    """
+
+    def __init__(self, dim: int, capacity: int = 64, max_ids: Optional[int] = None, max_samples: Optional[int] = None):
+        self.clusters: List[_Cluster] = []
+        self.max_ids = max_ids
+        self.max_samples = max_samples
+        self._emb = np.empty((capacity, dim), dtype=np.float32)
+        self._simh = np.empty(capacity, dtype=np.uint64)
+        self._shlen = np.empty(capacity, dtype=np.int64)
+        self._sh_index: Dict[str, List[int]] = {}  # 앞쪽 n-gram → 클러스터 번호 (오름차순)
+        self._sh_empty: List[int] = []              # n-gram 이 없는 클러스터 (빈 집합끼리만 자카드 1.0)
+        self.joins: Optional[List[Tuple[int, str, bool]]] = None
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    @property
+    def dim(self) -> int:
+        return self._emb.shape[1]
+
+    def _grow(self) -> None:
+        cap = self._emb.shape[0] * 2
+        emb = np.empty((cap, self.dim), dtype=np.float32)
+        emb[: len(self)] = self._emb[: len(self)]
+        simh = np.empty(cap, dtype=np.uint64)
+        simh[: len(self)] = self._simh[: len(self)]
+        shlen = np.empty(cap, dtype=np.int64)
+        shlen[: len(self)] = self._shlen[: len(self)]
+        self._emb, self._simh, self._shlen = emb, simh, shlen
+
+    def _append(self, c: _Cluster) -> None:
+        if len(self) == self._emb.shape[0]:
+            self._grow()
+        i = len(self)
+        self._emb[i] = c.cent_emb
+        self._simh[i] = c.centroid
+        self._shlen[i] = len(c.rep_sh)
+        self.clusters.append(c)
+        if c.rep_sh:
+            for g in _sh_prefix(c.rep_sh):
+                self._sh_index.setdefault(g, []).append(i)
+        else:
+            self._sh_empty.append(i)
+
+    def _jaccard_candidates(self, cur: _Q) -> np.ndarray:
+        # 자카드 >= JACCARD_FALLBACK 일 수 있는 클러스터 번호 (오름차순 → 기존 루프와 같은 클러스터에 합류)
+        if not cur.sh:
+            return np.asarray(self._sh_empty[:1], dtype=np.int64)
+        hits = [self._sh_index[g] for g in _sh_prefix(cur.sh) if g in self._sh_index]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        ids = np.unique(np.concatenate(hits)) if len(hits) > 1 else np.asarray(hits[0], dtype=np.int64)
+        # |A∩B|/|A∪B| <= min(|A|,|B|)/max(|A|,|B|) 이므로 상한이 임계값 미만이면 비교 불필요
+        a = len(cur.sh)
+        b = self._shlen[ids]
+        return ids[np.minimum(b, a) / np.maximum(b, a) >= JACCARD_FALLBACK]
 
-        items = [_Q(q) for q in questions]
+    def _new_cluster(self, cur: _Q) -> None:
+        self._append(_Cluster(cur))
+        if self.joins is not None:
+            self.joins.append((len(self) - 1, cur.q.id, True))
 
-        # LSH-ish 버킷 (성능)
+    def _join(self, ci: int, cur: _Q, jaccard: bool = False) -> None:
+        sampled = self.clusters[ci].join(cur, jaccard, self.max_samples, self.max_ids)
+        if self.joins is not None:
+            self.joins.append((ci, cur.q.id, sampled))
+
+    def add(self, cur: _Q) -> None:
+        n = len(self)
+        if n == 0:
+            self._new_cluster(cur)
+            return
+
+        try:
+            cos = self._emb[:n] @ cur.emb
+            # 행렬 곱과 쌍별 내적은 합산 순서가 달라 마지막 비트가 다를 수 있으므로,
+            # 최댓값 근처 후보만 쌍별 내적으로 다시 계산해 기존 루프와 같은 클러스터를 고른다
+            near = np.flatnonzero(cos >= cos.max() - _COS_TIE_EPS)
+            bi, best_cos = -1, -1.0
+            for ci in near:
+                v = float(cur.emb @ self.clusters[ci].cent_emb)
+                if v > best_cos:
+                    bi, best_cos = int(ci), v
+            best_d = int(TS.hamming_many(cur.simh, self._simh[:n]).min())
+        except Exception as e:
+            logger.error(f"[클러스터] 유사도 계산 실패: {e}")
+            raise AppException(ReportErrorCode.CALC_ERROR, detail=str(e))
+
+        if best_cos >= EMB_THRESHOLD:
+            # 의미 유사도 기준으로 합류 (중심 임베딩은 마지막 합류 질문으로 갱신)
+            self._join(bi, cur)
+            self.clusters[bi].cent_emb = cur.emb
+            self._emb[bi] = cur.emb
+            return
+
+        if best_d <= HAMMING_THRESHOLD:
+            # 해밍 거리 기준으로 합류
+            self._join(bi, cur)
+            return
+
+        # 자카드 fallback
+        for ci in self._jaccard_candidates(cur):
+            if TS.jaccard(cur.sh, self.clusters[ci].rep_sh) >= JACCARD_FALLBACK:
+                self._join(int(ci), cur, jaccard=True)
+                return
+
+        self._new_cluster(cur)
+
+    def fold(self, items: List[_Q]) -> None:
+        # simhash 상위 비트 버킷 순서로 질문을 합류시킨다 (기존 처리 순서 유지)
         buckets: Dict[int, List[_Q]] = {}
         for it in items:
             key = it.simh >> (64 - BUCKET_BITS)
             buckets.setdefault(key, []).append(it)
-
-        clusters: List[_Cluster] = []
-
         for bucket in buckets.values():
             for cur in bucket:
-                best = None
-                best_cos = -1.0
-                best_d = 1 << 30
-
-                for c in clusters:
-                    cos = _cos(cur.emb, c.cent_emb)
-                    if cos > best_cos:
-                        best_cos = cos
-                        best = c
-                    d = TS.hamming(cur.simh, c.centroid)
-                    if d < best_d:
-                        best_d = d
-
-                joined = False
-                if best and best_cos >= EMB_THRESHOLD:
-                    # 의미 유사도 기준으로 합류
-                    c = best
-                    c.members.append(cur)
-                    c.slides.add(cur.q.slide)
-                    c.ids.add(cur.q.id)
-                    c.samples.append(cur.q.content)
-                    c.cent_emb = cur.emb
-                    joined = True
-
-                elif best and best_d <= HAMMING_THRESHOLD:
-                    # 해밍 거리 기준으로 합류
-                    c = best
-                    c.members.append(cur)
-                    c.slides.add(cur.q.slide)
-                    c.ids.add(cur.q.id)
-                    c.samples.append(cur.q.content)
-                    joined = True
-
-                else:
-                    # 자카드 fallback
-                    for c in clusters:
-                        if not c.members:
-                            continue
-                        jac = TS.jaccard(cur.sh, c.members[0].sh)
-                        if jac >= JACCARD_FALLBACK:
-                            c.members.append(cur)
-                            c.slides.add(cur.q.slide)
-                            c.ids.add(cur.q.id)
-                            if len(c.samples) < 3:
-                                c.samples.append(cur.q.content)
-                            joined = True
-                            break
-
-                    if not joined:
-                        clusters.append(_Cluster(cur))
-
-        clusters.sort(
-            key=lambda c: (len(c.members), max(m.q.ts for m in c.members)),
-            reverse=True,
-        )
+                self.add(cur)
 
-        top3 = [
-            TopQuestionItem(
-                representative=c.rep,
-                count=len(c.members),
-                questionIds=list(c.ids),
-                slides=sorted(c.slides),
-                samples=c.samples,
-            )
-            for c in clusters[:3]
-        ]
+    def ranked(self) -> List[int]:
+        # 큰 그룹 → 최근 그룹 순서의 클러스터 번호
+        return sorted(range(len(self)), key=lambda i: (self.clusters[i].count, self.clusters[i].max_ts), reverse=True)
+
+    def to_state(self) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        return [c.to_meta() for c in self.clusters], self._emb[: len(self)]
 
-        logger.info(f"[Top3] 총 {len(clusters)}개의 그룹 중 상위 3개 반환")
+    @classmethod
+    def from_state(cls, metas: List[Dict[str, Any]], embs: np.ndarray, dim: int, **caps: Optional[int]) -> "_ClusterIndex":
+        index = cls(dim=dim, capacity=max(64, len(metas)), **caps)
+        embs = np.array(embs, dtype=np.float32)  # frombuffer 결과는 읽기 전용이므로 한 번에 복사
+        for i, m in enumerate(metas):
+            index._append(_Cluster.from_meta(m, embs[i]))
+        return index
 
-        await update_report_top3(db, room_id, top3)
 
-        return TopQuestionReportResponse(
-            roomId=room_id,
-            totalQuestions=len(questions),
-            uniqueGroups=len(clusters),
-            top3=top3,
+def _state_caps() -> Dict[str, int]:
+    return {"max_ids": settings.TOP3_STATE_MAX_IDS, "max_samples": settings.TOP3_STATE_MAX_SAMPLES}
+
+
+def _restore_state(meta_raw: bytes, emb_raw: bytes) -> Tuple[Dict[str, Any], Optional[_ClusterIndex]]:
+    # 저장된 상태 → (헤더, 클러스터 인덱스). JSON 파싱 + 복원이라 CPU 실행기에서 실행
+    meta, embs = decode_state(meta_raw, emb_raw)
+    clusters = meta.pop("clusters")
+    index = _ClusterIndex.from_state(clusters, embs, dim=meta["dim"], **_state_caps()) if clusters else None
+    return meta, index
+
+
+def _dump_state(
+    index: _ClusterIndex, header: Dict[str, Any], seq_start: int
+) -> Tuple[Dict[str, bytes], Dict[str, float], Dict[str, float]]:
+    # 클러스터 인덱스 → (저장할 Hash 필드, 이번 합류 기록의 멤버/샘플 score) (CPU 실행기에서 실행)
+    #   score = 클러스터 번호 * MEMBER_SEQ_SPAN + 방 전체 합류 순서 → 클러스터별 구간 안에서 합류 순서대로 정렬
+    metas, embs = index.to_state()
+    members: Dict[str, float] = {}
+    samples: Dict[str, float] = {}
+    for seq, (ci, qid, sampled) in enumerate(index.joins or [], start=seq_start):
+        score = float(ci * MEMBER_SEQ_SPAN + seq)
+        members[qid] = score
+        if sampled:
+            samples[qid] = score
+    return encode_state({**header, "clusters": metas}, embs), members, samples
+
+
+def _to_report(
+    room_id: str, total: int, index: _ClusterIndex,
+    members: Optional[Dict[int, Tuple[List[str], List[str]]]] = None,
+) -> TopQuestionReportResponse:
+    # members: 클러스터 번호 → (전체 질문 ID, 샘플 문장). 증분 상태처럼 ID/샘플 일부만 보관한 인덱스용
+    ranked = index.ranked()
+    members = members or {}
+    ROOM_QUESTIONS.labels("top3").observe(total)
+    TOP3_CLUSTERS.observe(len(ranked))
+    tag_profile(roomId=room_id, report="top3", questions=total, groups=len(ranked))
+    top3 = []
+    for ci in ranked[:3]:
+        c = index.clusters[ci]
+        ids, samples = members.get(ci) or (list(c.ids), c.samples)
+        top3.append(TopQuestionItem(
+            representative=c.rep,
+            count=c.count,
+            questionIds=ids,
+            slides=sorted(c.slides),
+            samples=samples,
+        ))
+    logger.info(f"[Top3] 총 {len(ranked)}개의 그룹 중 상위 3개 반환")
+    return TopQuestionReportResponse(
+        roomId=room_id,
+        totalQuestions=total,
+        uniqueGroups=len(ranked),
+        top3=top3,
+    )
+
+
+async def _state_report(r: Redis, room_id: str, total: int, index: _ClusterIndex) -> TopQuestionReportResponse:
+    # 증분 상태 인덱스의 리포트: TOP3 클러스터의 전체 ID/샘플은 멤버 ZSET + 질문 Hash 에서 읽는다
+    #   (상태가 보관하는 ID/샘플은 일부뿐이라 그대로 쓰면 build_top3 와 응답이 달라짐)
+    top = index.ranked()[:3]
+    with stage("top3_members"):
+        rows = await load_top3_members(r, room_id, top)
+        sample_ids = [qid for ci in top for qid in rows[ci][1]]
+        contents = await hmget_questions(r, room_id, sample_ids, ("content",))
+    by_id = {qid: content for qid, (content,) in zip(sample_ids, contents) if content is not None}
+    members: Dict[int, Tuple[List[str], List[str]]] = {}
+    for ci in top:
+        ids, sids = rows[ci]
+        if not ids:
+            continue  # 멤버 목록이 없으면(만료/이전 버전) 상태에 남은 일부로 응답
+        members[ci] = (
+            [qid.decode("utf-8") for qid in ids],
+            [by_id[qid].decode("utf-8") for qid in sids if qid in by_id],
         )
+    return _to_report(room_id, total, index, members)
+
+
+def _fold_questions(
+    index: Optional[_ClusterIndex], questions: List[QuestionRecord], norms: List[str], embs: np.ndarray,
+    capped: bool = False,
+) -> _ClusterIndex:
+    # 전처리(n-gram/simhash) + 클러스터 합류: CPU 실행기에서 돌리는 단위 (process 모드 대비 인덱스를 반환)
+    # capped: 증분 상태로 저장할 인덱스 → 클러스터별 ID/샘플 보관 개수 제한 + 합류 기록(전체 멤버 저장용)
+    items = _prepare(questions, norms, embs)
+    if index is None:
+        index = _ClusterIndex(dim=embs.shape[1], **(_state_caps() if capped else {}))
+    if capped and index.joins is None:
+        index.joins = []
+    index.fold(items)
+    return index
+
+
+async def _cluster(
+    index: Optional[_ClusterIndex], questions: List[QuestionRecord], capped: bool = False
+) -> _ClusterIndex:
+    norms = _normalize_all(questions)
+    embs = await _embed_cached(norms)
+    with stage("cluster"):
+        return await run_cpu(_fold_questions, index, questions, norms, embs, capped)
+
+
+def _fold_in_chunks(questions: List[QuestionRecord], norms: List[str], embs: np.ndarray) -> _ClusterIndex:
+    # 이미 임베딩한 방 전체를 READER_CHUNK_SIZE 단위로 합류 (스트림으로 합류한 결과와 같은 처리 순서)
+    index: Optional[_ClusterIndex] = None
+    size = settings.READER_CHUNK_SIZE
+    for i in range(0, len(questions), size):
+        index = _fold_questions(index, questions[i:i + size], norms[i:i + size], embs[i:i + size])
+    return index
+
+
+async def _iter_chunks(
+    questions: Union[List[QuestionRecord], AsyncIterator[List[QuestionRecord]]]
+) -> AsyncIterator[List[QuestionRecord]]:
+    # 정확히 READER_CHUNK_SIZE 개씩 (마지막만 짧게) 다시 묶음
+    #   스트림 청크는 페이지 경계/만료된 질문 때문에 짧을 수 있어 그대로 합류하면 리스트 입력과 순서가 달라짐
+    size = settings.READER_CHUNK_SIZE
+    if isinstance(questions, list):
+        for i in range(0, len(questions), size):
+            yield questions[i:i + size]
+        return
+    buf: List[QuestionRecord] = []
+    async for chunk in questions:
+        buf.extend(chunk)
+        while len(buf) >= size:
+            yield buf[:size]
+            buf = buf[size:]
+    if buf:
+        yield buf
+
+
+# 메인 로직
+async def build_top3(
+    room_id: str, questions: Union[List[QuestionRecord], AsyncIterator[List[QuestionRecord]]]
+) -> TopQuestionReportResponse:
+    # 질문들을 의미/문자 기반으로 클러스터링하여 상위 3개 그룹 추출
+    # questions: 질문 리스트 또는 iter_room_questions() 청크 스트림
+    #   청크마다 임베딩 → 같은 클러스터 인덱스에 합류 (방 전체 임베딩 행렬을 한 번에 들고 있지 않음)
+    #   리스트도 READER_CHUNK_SIZE 청크로 나눠 합류 → 어느 입력이든 같은 결과
+    try:
+        index: Optional[_ClusterIndex] = None
+        total = 0
+        async for chunk in _iter_chunks(questions):
+            if chunk:
+                index = await _cluster(index, chunk)
+                total += len(chunk)
+
+        if index is None:
+            logger.info("[Top3] 입력된 질문이 없습니다.")
+            await write_report(room_id, top3question=None)
+            return TopQuestionReportResponse(roomId=room_id,totalQuestions=0, uniqueGroups=0, top3=[])
+
+        report = _to_report(room_id, total, index)
+        await write_report(room_id, top3question=top3_payload(report.top3))
+        return report
+
+    except AppException:
+        raise
+
+    except RedisError as e:
+        logger.error(f"[Top3] Redis 오류: {e}")
+        raise AppException(ReportErrorCode.REDIS_ERROR, detail=str(e))
+
+    except Exception as e:
+        logger.exception(f"[Top3] 알 수 없는 오류: {e}")
+        raise AppException(ReportErrorCode.UNKNOWN, detail=str(e))
+
+
+##   여러 방 TOP3 를 한 번에 계산 (배치 리포트용, DB 저장은 호출 측)
+##     - 방들의 질문을 BATCH_EMBED_MAX 개 이하 묶음으로 모아 임베딩을 한 번에 호출 (모델 배치 공유)
+##     - 클러스터링은 방별로 CPU 실행기에서 수행 (CPU_WORKERS 개씩만 제출해 대기열 초과 방지)
+##       합류는 build_top3 와 같은 READER_CHUNK_SIZE 청크 순서 → 단건 조회와 같은 결과
+##     - 방별 실패는 결과 dict 에 예외로 담아 반환
+async def build_top3_many(
+    rooms: Dict[str, List[QuestionRecord]]
+) -> Dict[str, Union[TopQuestionReportResponse, Exception]]:
+    results: Dict[str, Union[TopQuestionReportResponse, Exception]] = {}
+    norms_by_room: Dict[str, List[str]] = {}
+    for room_id, questions in rooms.items():
+        if not questions:
+            results[room_id] = TopQuestionReportResponse(roomId=room_id, totalQuestions=0, uniqueGroups=0, top3=[])
+            continue
+        try:
+            norms_by_room[room_id] = _normalize_all(questions)
+        except Exception as e:
+            results[room_id] = e
+
+    # 방을 순서대로 묶음(group)으로 나눔: 묶음 안의 질문 합계 <= BATCH_EMBED_MAX (방 하나가 더 크면 단독)
+    groups: List[List[str]] = []
+    size = 0
+    for room_id, norms in norms_by_room.items():
+        if not groups or size + len(norms) > settings.BATCH_EMBED_MAX:
+            groups.append([])
+            size = 0
+        groups[-1].append(room_id)
+        size += len(norms)
+
+    sem = asyncio.Semaphore(settings.CPU_WORKERS)
+
+    async def _fold_room(room_id: str, embs: np.ndarray) -> None:
+        try:
+            async with sem:
+                index = await run_cpu(_fold_in_chunks, rooms[room_id], norms_by_room[room_id], embs)
+            results[room_id] = _to_report(room_id, len(rooms[room_id]), index)
+        except Exception as e:
+            results[room_id] = e
+
+    for group in groups:
+        flat = [t for room_id in group for t in norms_by_room[room_id]]
+        try:
+            embs = await _embed_cached(flat)
+        except Exception as e:
+            for room_id in group:
+                results[room_id] = e
+            continue
+        logger.info(f"[Top3] 배치: 방 {len(group)}개 / 질문 {len(flat)}개 임베딩 공유")
+        tasks = []
+        start = 0
+        for room_id in group:
+            end = start + len(norms_by_room[room_id])
+            tasks.append(_fold_room(room_id, embs[start:end]))
+            start = end
+        await asyncio.gather(*tasks)
+    return results
+
+
+##   워터마크 기반 증분 TOP3
+##     1️. Redis에 저장된 방별 클러스터 상태(중심/n-gram/ID·샘플 일부/개수/마지막 ts) 로드
+##     2️. 마지막 ts 이후 질문만 청크 스트림으로 조회 (같은 ts 경계 질문은 ID로 중복 제거)
+##     3️. 청크마다 새 질문만 임베딩해 기존 클러스터에 합류
+##     4️. 상태 저장 후 리포트 반환 (새 질문이 없으면 DB 갱신 생략)
+##   질문 수가 줄었거나(만료/초기화) 모델이 바뀐 경우에는 상태를 버리고 전체 재계산
+##   오차 범위: 합류 결과는 처리 순서에 따라 달라지므로 증분 결과는 전체 계산과 그룹 크기/개수가 조금 다를 수 있다
+##     - 마지막 전체 계산 이후 들어온 질문이 방 전체의 TOP3_REBUILD_NEW_SHARE 를 넘거나
+##       증분 반영이 TOP3_REBUILD_EVERY 번 쌓이면 상태를 버리고 전체 재계산
+##       → 순서 차이의 영향을 받는 질문은 항상 방 전체의 TOP3_REBUILD_NEW_SHARE 이하
+##       (합성 방 2,000개를 100개씩 늘려 가며 잰 값: TOP3 그룹 크기 차이 최대 약 30%, 그룹 수 차이 10% 이내.
+##        greedy 합류라 전체 계산끼리도 질문 100개가 늘 때 비슷한 폭으로 흔들림)
+##     - 전체 계산도 청크 스트림으로 합류 (build_top3 와 같은 청크 순서 → 같은 결과, 메모리는 청크 크기로 제한)
+##     - 방 크기가 일정 비율만큼 커질 때마다 다시 계산하므로 질문 1개당 전체 계산 비용은 상수로 유지
+##     - 발표 종료(session_ended) 시에는 상태를 지우고 최종 리포트를 전체 계산으로 만든다
+##   상태 복원/저장(JSON 파싱, 클러스터 복원/직렬화)은 합류와 마찬가지로 CPU 실행기에서 실행
+##   상태에는 클러스터별 ID 는 TOP3_STATE_MAX_IDS 개, 샘플은 TOP3_STATE_MAX_SAMPLES 개까지만 남긴다
+##     → 상태 크기는 질문 수가 아니라 클러스터 수에 비례
+##     응답의 questionIds/samples 는 멤버 ZSET(새 질문만 ZADD)에서 TOP3 클러스터만 읽어 build_top3 와 같게 채운다
+async def build_top3_incremental(room_id: str) -> TopQuestionReportResponse:
+    try:
+        r = await get_redis_raw()
+        index: Optional[_ClusterIndex] = None
+        total = 0
+        watermark: Optional[int] = None
+        boundary: Set[str] = set()
+        full_total = 0      # 마지막 전체 계산 때의 질문 수
+        increments = 0      # 마지막 전체 계산 이후 증분 반영 횟수
+
+        header: Optional[Dict[str, Any]] = None
+        with stage("top3_state"):
+            loaded = await load_top3_state(r, room_id)
+            if loaded is not None:
+                room_total = await r.zcard(ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id))
+                try:
+                    header, index = await run_cpu(_restore_state, *loaded)
+                except AppException:
+                    raise
+                except Exception as e:
+                    logger.warning(f"[Top3] room={room_id} 상태 파싱 실패, 폐기: {e}")
+        if header is not None:
+            full_total = header.get("fullTotal", header["total"])
+            increments = header.get("increments", 0)
+            reason: Optional[str] = None
+            if header.get("model") != EMB_MODEL or room_total < header["total"]:
+                reason = "질문 수 감소 또는 모델 변경"
+            elif room_total and (room_total - full_total) / room_total > settings.TOP3_REBUILD_NEW_SHARE:
+                reason = f"전체 계산 이후 새 질문 {room_total - full_total}/{room_total}개"
+            elif increments >= settings.TOP3_REBUILD_EVERY:
+                reason = f"증분 {increments}회 누적"
+            if reason is None:
+                total = header["total"]
+                watermark = header["watermark"]
+                boundary = set(header["boundaryIds"])
+            else:
+                index = None
+                logger.info(f"[Top3] room={room_id} 상태 폐기 ({reason}) → 전체 재계산")
+
+        # from_ts 는 exclusive 이므로 워터마크와 같은 ts 의 늦게 들어온 질문까지 포함해 조회
+        # 전체/증분 모두 청크 단위 스트림으로 받아 청크마다 임베딩 → 클러스터 합류 (메모리 상한 유지)
+        from_ts = watermark - 1 if watermark is not None else None
+        added = 0
+        last_ts = watermark
+        new_boundary = set(boundary)
+        async for chunk in _iter_chunks(iter_room_questions(room_id, from_ts=from_ts)):
+            chunk = [q for q in chunk if q.id not in boundary]
+            if not chunk:
+                continue
+            index = await _cluster(index, chunk, capped=True)
+            added += len(chunk)
+            for q in chunk:
+                if last_ts is None or q.ts > last_ts:
+                    last_ts, new_boundary = q.ts, {q.id}
+                elif q.ts == last_ts:
+                    new_boundary.add(q.id)
+
+        if not added:
+            if index is None:
+                logger.info("[Top3] 입력된 질문이 없습니다.")
+                await write_report(room_id, top3question=None)
+                return TopQuestionReportResponse(roomId=room_id, totalQuestions=0, uniqueGroups=0, top3=[])
+            logger.info(f"[Top3] room={room_id} 새 질문 없음 (watermark={watermark})")
+            return await _state_report(r, room_id, total, index)
+
+        seq_start = total
+        total += added
+        boundary = new_boundary
+        if watermark is None:
+            full_total, increments = total, 0   # 이번이 전체 계산
+        else:
+            increments += 1
+
+        header = {
+            "model": EMB_MODEL,
+            "dim": index.dim,
+            "total": total,
+            "watermark": last_ts,
+            "boundaryIds": sorted(boundary),
+            "fullTotal": full_total,
+            "increments": increments,
+        }
+        with stage("top3_state"):
+            fields, members, samples = await run_cpu(_dump_state, index, header, seq_start)
+            await save_top3_state(
+                r, room_id, fields, ttl_sec=settings.EMB_CACHE_TTL_SEC,
+                members=members, samples=samples, reset=watermark is None,
+            )
+        logger.info(f"[Top3] room={room_id} 새 질문 {added}개 반영 (누적 {total}개)")
+
+        report = await _state_report(r, room_id, total, index)
+        await write_report(room_id, top3question=top3_payload(report.top3))
+        return report
 
     except AppException:
         raise
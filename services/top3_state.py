@@ -0,0 +1,106 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+TOP3_STATE_KEY_FMT = "room:{roomId}:top3:state"
+TOP3_MEMBERS_KEY_FMT = "room:{roomId}:top3:members"  # ZSET member=질문 ID, score=클러스터 번호 * 2^32 + 합류 순서
+TOP3_SAMPLES_KEY_FMT = "room:{roomId}:top3:samples"  # ZSET 같은 score, 응답 samples 에 들어가는 질문만
+TOP3_STATE_VERSION = 3  # meta 형식이 바뀌면 올림 (다른 버전 상태는 버리고 전체 재계산)
+
+MEMBER_SEQ_SPAN = 1 << 32  # 클러스터 번호 하나가 차지하는 score 구간 (합류 순서는 이보다 작아야 함)
+_ZADD_CHUNK = 1000
+
+##  방(room)별 TOP3 클러스터 상태 저장소 (Redis Hash)
+##     - meta: 워터마크(ts), 처리한 질문 수, 클러스터별 대표문구/n-gram/슬라이드/ID·샘플 일부 등 (JSON)
+##     - emb : 클러스터 중심 임베딩 행렬 (float32 바이트, 행 순서 = meta["clusters"] 순서)
+##     - Redis 입출력(load/save/delete)은 bytes 를 그대로 주고받고,
+##       JSON/NumPy 변환(encode_state/decode_state)은 호출 측이 CPU 실행기에서 실행한다
+##     - 바이너리 값을 다루므로 decode_responses=False 클라이언트를 사용해야 한다
+##   meta 에는 클러스터별 ID/샘플을 일부만 남기고(크기 상한), 응답용 전체 멤버는 ZSET 두 개에 따로 쌓는다
+##     - members: 모든 질문 ID, samples: 응답 samples 에 들어가는 질문 ID (내용은 질문 Hash 에서 읽음)
+##     - score 로 클러스터별 구간 + 합류 순서를 표현 → 증분 반영은 새 질문만 ZADD, 조회는 TOP3 클러스터만 ZRANGEBYSCORE
+
+
+async def load_top3_state(r: Redis, room_id: str) -> Optional[Tuple[bytes, bytes]]:
+    # (meta, emb) 원본 bytes. 없거나 조회 실패면 None (전체 재계산)
+    key = TOP3_STATE_KEY_FMT.format(roomId=room_id)
+    try:
+        meta, emb = await r.hmget(key, "meta", "emb")
+    except RedisError as e:
+        logger.warning(f"[Top3상태] room={room_id} 상태 조회 실패, 전체 재계산: {e}")
+        return None
+    if meta is None or emb is None:
+        return None
+    return meta, emb
+
+
+def decode_state(meta_raw: bytes, emb_raw: bytes) -> Tuple[Dict[str, Any], np.ndarray]:
+    # 형식이 맞지 않으면 ValueError
+    meta = json.loads(meta_raw)
+    if meta.get("version") != TOP3_STATE_VERSION:
+        raise ValueError(f"상태 버전 불일치: {meta.get('version')}")
+    embs = np.frombuffer(emb_raw, dtype=np.float32).reshape(-1, int(meta["dim"]))
+    if embs.shape[0] != len(meta["clusters"]):
+        raise ValueError("임베딩 행 수와 클러스터 수 불일치")
+    return meta, embs
+
+
+def encode_state(meta: Dict[str, Any], embs: np.ndarray) -> Dict[str, bytes]:
+    return {
+        "meta": json.dumps({**meta, "version": TOP3_STATE_VERSION}, ensure_ascii=False).encode("utf-8"),
+        "emb": np.ascontiguousarray(embs, dtype=np.float32).tobytes(),
+    }
+
+
+async def save_top3_state(
+    r: Redis, room_id: str, fields: Dict[str, bytes], ttl_sec: int,
+    members: Dict[str, float], samples: Dict[str, float], reset: bool = False,
+) -> None:
+    # members/samples: 이번에 반영한 질문의 {질문 ID: score}. reset 이면 기존 멤버를 지우고 새로 씀 (전체 계산)
+    key = TOP3_STATE_KEY_FMT.format(roomId=room_id)
+    members_key = TOP3_MEMBERS_KEY_FMT.format(roomId=room_id)
+    samples_key = TOP3_SAMPLES_KEY_FMT.format(roomId=room_id)
+    try:
+        pipe = r.pipeline()  # MULTI/EXEC: 상태와 멤버가 항상 같은 시점을 가리키도록
+        if reset:
+            pipe.delete(members_key, samples_key)
+        pipe.hset(key, mapping=fields)
+        for zkey, rows in ((members_key, members), (samples_key, samples)):
+            items = list(rows.items())
+            for i in range(0, len(items), _ZADD_CHUNK):
+                pipe.zadd(zkey, dict(items[i:i + _ZADD_CHUNK]))
+        for k in (key, members_key, samples_key):
+            pipe.expire(k, ttl_sec)
+        await pipe.execute()
+    except RedisError as e:
+        # 상태 저장 실패는 다음 요청에서 전체 재계산으로 복구되므로 리포트는 그대로 반환
+        logger.warning(f"[Top3상태] room={room_id} 상태 저장 실패: {e}")
+
+
+async def load_top3_members(
+    r: Redis, room_id: str, cluster_nos: Sequence[int]
+) -> Dict[int, Tuple[List[bytes], List[bytes]]]:
+    # 클러스터 번호별 (전체 질문 ID, 샘플 질문 ID) - 둘 다 합류 순서
+    members_key = TOP3_MEMBERS_KEY_FMT.format(roomId=room_id)
+    samples_key = TOP3_SAMPLES_KEY_FMT.format(roomId=room_id)
+    pipe = r.pipeline(transaction=False)
+    for no in cluster_nos:
+        lo, hi = no * MEMBER_SEQ_SPAN, (no + 1) * MEMBER_SEQ_SPAN - 1
+        pipe.zrangebyscore(members_key, lo, hi)
+        pipe.zrangebyscore(samples_key, lo, hi)
+    rows = await pipe.execute()
+    return {no: (rows[2 * i], rows[2 * i + 1]) for i, no in enumerate(cluster_nos)}
+
+
+async def delete_top3_state(r: Redis, room_id: str) -> None:
+    await r.delete(
+        TOP3_STATE_KEY_FMT.format(roomId=room_id),
+        TOP3_MEMBERS_KEY_FMT.format(roomId=room_id),
+        TOP3_SAMPLES_KEY_FMT.format(roomId=room_id),
+    )
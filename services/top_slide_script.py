@@ -0,0 +1,148 @@
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+from core.metrics import stage
+from core.redis import get_redis_raw
+from services.question_fetch import Raw
+from services.question_reader import ROOM_QUESTIONS_KEY_FMT
+from services.slide_index import SLIDE_COUNTS_KEY_FMT, SLIDE_COUNTS_TOTAL_KEY_FMT, sync_slide_index
+
+logger = logging.getLogger(__name__)
+
+##  top-slide 읽기 경로 전체를 Redis 안에서 한 번에 처리하는 Lua 스크립트
+##     KEYS[1] room:{roomId}:questions          (인덱스 신선도 확인용 ZCARD)
+##     KEYS[2] room:{roomId}:slide_counts:total
+##     KEYS[3] room:{roomId}:slide_counts        (최다 슬라이드 조회)
+##     ARGV[1] roomId, ARGV[2] latest_first(1/0)
+##     ARGV[3] 슬라이드 번호 ('' 이면 인덱스에서 최다 슬라이드 선택, 지정 시 인덱스 확인 생략)
+##     ARGV[4] offset, ARGV[5] limit (0 이하면 끝까지) → 질문을 청크 단위로 나눠 받을 때 사용
+##   반환
+##     {-1}                              인덱스 없음/낡음 → 호출 측에서 맞춘(sync_slide_index) 후 재시도
+##     {0}                               슬라이드 없음
+##     {1, slide, count, qid1, {slide, content, ts, audienceId}, qid2, {...}, ...}
+##   질문 Hash 는 응답에 쓰는 4개 필드만 HMGET (필드 순서 = question_fetch.TOP_SLIDE_FIELDS)
+##   슬라이드/질문 키는 스크립트 안에서 만들기 때문에 단일 노드(비클러스터) Redis 전용
+TOP_SLIDE_LUA = """
+local prefix = 'room:' .. ARGV[1]
+local slide = ARGV[3]
+local count
+if slide == '' then
+    local room_total = redis.call('ZCARD', KEYS[1])
+    local indexed = redis.call('GET', KEYS[2])
+    if (not indexed) or tonumber(indexed) ~= room_total then
+        return {-1}
+    end
+    local top = redis.call('ZREVRANGE', KEYS[3], 0, 0, 'WITHSCORES')
+    if #top == 0 or tonumber(top[2]) <= 0 then
+        return {0}
+    end
+    slide = top[1]
+    count = tonumber(top[2])
+end
+local zkey = prefix .. ':page:' .. slide .. ':questions'
+if not count then
+    count = redis.call('ZCARD', zkey)
+end
+local start = tonumber(ARGV[4])
+local stop = -1
+if tonumber(ARGV[5]) > 0 then
+    stop = start + tonumber(ARGV[5]) - 1
+end
+local qids
+if ARGV[2] == '1' then
+    qids = redis.call('ZREVRANGE', zkey, start, stop)
+else
+    qids = redis.call('ZRANGE', zkey, start, stop)
+end
+local out = {1, slide, count}
+for _, qid in ipairs(qids) do
+    out[#out + 1] = qid
+    out[#out + 1] = redis.call('HMGET', prefix .. ':question:' .. qid, 'slide', 'content', 'ts', 'audienceId')
+end
+return out
+"""
+
+_script = None  # redis-py AsyncScript: EVALSHA 로 호출하고 NOSCRIPT 면 자동으로 SCRIPT LOAD 후 재시도
+
+Row = Tuple[Raw, List[Raw]]  # (qid, TOP_SLIDE_FIELDS 순서의 값 리스트)
+
+
+def _get_script(r: Redis):
+    global _script
+    if _script is None:
+        _script = r.register_script(TOP_SLIDE_LUA)
+    return _script
+
+
+async def fetch_top_slide(
+    r: Redis,
+    room_id: str,
+    latest_first: bool = False,
+    slide: Optional[int] = None,
+    offset: int = 0,
+    limit: int = 0,
+) -> Optional[Tuple[int, int, List[Row]]]:
+    """
+    (슬라이드 번호, 질문 수, [(qid, [slide, content, ts, audienceId])]) 반환. 슬라이드가 없으면 None
+    slide 를 주면 그 슬라이드의 [offset, offset+limit) 구간만 조회한다.
+    스크립트 응답은 디코딩하지 않는 클라이언트로 받아 bytes 그대로 넘긴다 (디코딩은 question_fetch).
+    """
+    keys = [
+        ROOM_QUESTIONS_KEY_FMT.format(roomId=room_id),
+        SLIDE_COUNTS_TOTAL_KEY_FMT.format(roomId=room_id),
+        SLIDE_COUNTS_KEY_FMT.format(roomId=room_id),
+    ]
+    args = [room_id, 1 if latest_first else 0, "" if slide is None else slide, offset, limit]
+    script = _get_script(r)
+    raw = await get_redis_raw()
+
+    with stage("top_slide_script"):
+        res = await script(keys=keys, args=args, client=raw)
+    if res[0] == -1:
+        logger.info(f"[top-slide 스크립트] room={room_id} 슬라이드 인덱스 갱신 후 재시도")
+        await sync_slide_index(r, room_id)
+        with stage("top_slide_script"):
+            res = await script(keys=keys, args=args, client=raw)
+        if res[0] == -1:
+            # 갱신하는 사이에 질문이 또 들어와 다시 낡음 → 방금 맞춘 인덱스에서 최다 슬라이드를 골라 지정 조회
+            # (인덱스 확인을 건너뛰므로 더 이상 -1 이 나오지 않음. 빠진 질문은 다음 조회 때 반영)
+            top = await r.zrevrange(keys[2], 0, 0, withscores=True)
+            if top and top[0][1] > 0:
+                args[2] = top[0][0]
+                with stage("top_slide_script"):
+                    res = await script(keys=keys, args=args, client=raw)
+            else:
+                res = [0]
+    if res[0] != 1:
+        return None
+
+    slide_no, count = int(res[1]), int(res[2])
+    flat = res[3:]
+    rows: List[Row] = list(zip(flat[::2], flat[1::2]))
+    return slide_no, count, rows
+
+
+async def iter_top_slide(
+    r: Redis, room_id: str, latest_first: bool = False, chunk_size: int = 500
+) -> AsyncIterator[Tuple[int, int, List[Row]]]:
+    """
+    최다 슬라이드의 질문을 chunk_size 개씩 나눠 yield (스크립트 응답 크기 상한 유지).
+    첫 호출에서 정한 슬라이드로 고정하며, 슬라이드가 없으면 아무것도 yield 하지 않는다.
+    """
+    first = await fetch_top_slide(r, room_id, latest_first=latest_first, limit=chunk_size)
+    if first is None:
+        return
+    slide_no, count, rows = first
+    yield slide_no, count, rows
+    offset = len(rows)
+    while len(rows) == chunk_size:
+        page = await fetch_top_slide(r, room_id, latest_first=latest_first, slide=slide_no, offset=offset, limit=chunk_size)
+        if page is None:
+            return
+        _, _, rows = page
+        if not rows:
+            return
+        yield slide_no, count, rows
+        offset += len(rows)
@@ -0,0 +1,20 @@
+import os
+
+import fakeredis
+import pytest
+
+# top3_service → core.db 임포트에 DB_URL 이 필요 (엔진만 만들고 테스트 중 DB 에 연결하지 않음)
+os.environ.setdefault("DB_URL", "mysql://localhost:3306/test")
+
+
+@pytest.fixture
+def redis_pair(monkeypatch):
+    # 같은 fakeredis 서버를 보는 (디코딩, bytes) 클라이언트 쌍을 core.redis 전역에 끼워 넣는다
+    from core import redis as core_redis
+
+    server = fakeredis.FakeServer()
+    r = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    raw = fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+    monkeypatch.setattr(core_redis, "_redis", r)
+    monkeypatch.setattr(core_redis, "_redis_raw", raw)
+    return r, raw
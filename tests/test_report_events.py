@@ -0,0 +1,50 @@
+import asyncio
+from typing import Dict, List
+
+from config.settings import settings
+from services.report_events import EVENT_QUESTION_ADDED, ReportEventConsumer
+
+
+def test_failed_precompute_is_retried_then_dead_lettered(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    monkeypatch.setattr(settings, "EVENTS_DEBOUNCE_SEC", 0.0)
+    monkeypatch.setattr(settings, "EVENTS_CLAIM_IDLE_MS", 50)
+    monkeypatch.setattr(settings, "EVENTS_RECLAIM_SEC", 0.05)
+    monkeypatch.setattr(settings, "EVENTS_MAX_DELIVERIES", 3)
+
+    calls: Dict[str, int] = {}
+    fail_times = {"room-flaky": 1, "room-bad": 100}
+
+    async def precompute(room_id: str, final: bool = False) -> None:
+        calls[room_id] = calls.get(room_id, 0) + 1
+        if calls[room_id] <= fail_times.get(room_id, 0):
+            raise RuntimeError("일시적 오류")
+
+    async def run():
+        consumer = ReportEventConsumer(r)
+        monkeypatch.setattr(consumer, "_precompute", precompute)
+        await consumer.start()
+        try:
+            for room_id in ("room-ok", "room-flaky", "room-bad"):
+                await r.xadd(settings.EVENTS_STREAM, {"type": EVENT_QUESTION_ADDED, "roomId": room_id})
+
+            # 재시작 없이도 실패한 이벤트를 다시 가져오고, 계속 실패하면 dead-letter 로 옮긴다
+            dead: List = []
+            for _ in range(200):
+                dead = await r.xrange(settings.EVENTS_DEAD_STREAM)
+                pending = await r.xpending(settings.EVENTS_STREAM, settings.EVENTS_GROUP)
+                if dead and pending["pending"] == 0:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await consumer.stop()
+
+        assert pending["pending"] == 0
+        assert calls["room-ok"] == 1
+        assert calls["room-flaky"] == 2
+        assert calls["room-bad"] == settings.EVENTS_MAX_DELIVERIES
+        assert len(dead) == 1
+        fields = dead[0][1]
+        assert fields["roomId"] == "room-bad" and int(fields["deliveries"]) == settings.EVENTS_MAX_DELIVERIES
+
+    asyncio.run(run())
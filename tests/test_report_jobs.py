@@ -0,0 +1,182 @@
+import asyncio
+from typing import Any, Dict, List
+
+from config.settings import settings
+from exception.errors import AppException, ReportErrorCode
+from services import report_jobs
+from services.report_jobs import (
+    JOB_HEARTBEAT_KEY_FMT, JOB_KEY_FMT, JOB_PROCESSING_KEY_FMT, JOB_QUEUE_KEY, JOB_WORKERS_KEY,
+    ReportJobWorkers, get_job, submit_job, wait_job,
+)
+
+
+def _fake_run(monkeypatch, plan: Dict[str, List[Any]], calls: List[str]):
+    # 방별로 계획된 결과를 차례로 돌려준다 (예외면 raise, asyncio.Event 면 set 될 때까지 대기)
+    async def run(r, h):
+        calls.append(h["roomId"])
+        step = plan[h["roomId"]].pop(0)
+        if isinstance(step, asyncio.Event):
+            await step.wait()
+            return {"roomId": h["roomId"]}
+        if isinstance(step, BaseException):
+            raise step
+        return step
+
+    monkeypatch.setattr(report_jobs, "_run", run)
+    monkeypatch.setattr(report_jobs, "_MAINTAIN_INTERVAL_SEC", 0.05)
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF_SEC", 0.3)
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+
+
+def test_submit_dedupe_complete(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    calls: List[str] = []
+    _fake_run(monkeypatch, {"room-a": [{"roomId": "room-a"}, {"roomId": "room-a", "again": True}]}, calls)
+
+    async def run():
+        first = await submit_job(r, "top3", "room-a")
+        second = await submit_job(r, "top3", "room-a")
+        assert second.jobId == first.jobId  # 대기 중인 같은 리포트 작업에 합류
+        assert await r.llen(JOB_QUEUE_KEY) == 1
+
+        workers = ReportJobWorkers(r, 1)
+        workers.start()
+        try:
+            job = await wait_job(r, first.jobId, 5)
+            assert job.status == "done" and job.attempts == 1
+            assert job.result == {"roomId": "room-a"}
+            assert await r.llen(workers.processing_key) == 0
+
+            # 끝난 작업에는 합류하지 않고 새 작업
+            third = await submit_job(r, "top3", "room-a")
+            assert third.jobId != first.jobId
+            assert (await wait_job(r, third.jobId, 5)).status == "done"
+        finally:
+            await workers.stop()
+        assert calls == ["room-a", "room-a"]
+        assert not await r.sismember(JOB_WORKERS_KEY, workers.worker_id)
+
+    asyncio.run(run())
+
+
+def test_failure_retry_does_not_stall_worker(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    calls: List[str] = []
+    _fake_run(monkeypatch, {
+        "room-retry": [AppException(ReportErrorCode.REDIS_ERROR), {"roomId": "room-retry"}],
+        "room-next": [{"roomId": "room-next"}],
+        "room-bad": [AppException(ReportErrorCode.NO_QUESTIONS)],
+    }, calls)
+
+    async def run():
+        workers = ReportJobWorkers(r, 1)
+        workers.start()
+        try:
+            retry = await submit_job(r, "top3", "room-retry")
+            nxt = await submit_job(r, "top3", "room-next")
+            bad = await submit_job(r, "top3", "room-bad")
+
+            # 재시도 대기(0.3s) 동안에도 워커 1개가 뒤의 작업을 먼저 처리한다
+            assert (await wait_job(r, nxt.jobId, 5)).status == "done"
+            failed = await wait_job(r, bad.jobId, 5)
+            assert failed.status == "failed" and failed.attempts == 1  # 4xx 는 재시도하지 않음
+            assert failed.error.code == ReportErrorCode.NO_QUESTIONS.code
+            assert (await get_job(r, retry.jobId)).status == "queued"
+
+            job = await wait_job(r, retry.jobId, 5)
+            assert job.status == "done" and job.attempts == 2
+        finally:
+            await workers.stop()
+        assert calls == ["room-retry", "room-next", "room-bad", "room-retry"]
+
+    asyncio.run(run())
+
+
+def test_jobs_of_dead_worker_are_reclaimed(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    calls: List[str] = []
+    _fake_run(monkeypatch, {"room-a": [{"roomId": "room-a"}]}, calls)
+
+    async def run():
+        # 다른 워커 프로세스가 작업을 꺼내 실행하다 죽은 상태 (처리 목록에 남고 생존 신호는 만료)
+        job = await submit_job(r, "top3", "room-a")
+        dead = "dead-host:1:0"
+        await r.lmove(JOB_QUEUE_KEY, JOB_PROCESSING_KEY_FMT.format(worker=dead), "RIGHT", "LEFT")
+        await r.hset(JOB_KEY_FMT.format(jobId=job.jobId), mapping={"status": "running", "attempts": 1})
+        await r.sadd(JOB_WORKERS_KEY, dead)
+        assert not await r.exists(JOB_HEARTBEAT_KEY_FMT.format(worker=dead))
+
+        # 실행 중으로 남은 작업이라도 같은 리포트 요청은 그 작업에 합류
+        assert (await submit_job(r, "top3", "room-a")).jobId == job.jobId
+
+        workers = ReportJobWorkers(r, 1)
+        workers.start()
+        try:
+            done = await wait_job(r, job.jobId, 5)
+            assert done.status == "done" and done.attempts == 2
+        finally:
+            await workers.stop()
+        assert not await r.sismember(JOB_WORKERS_KEY, dead)
+        assert await r.llen(JOB_PROCESSING_KEY_FMT.format(worker=dead)) == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_job_goes_back_to_queue(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    calls: List[str] = []
+    gate = asyncio.Event()
+    _fake_run(monkeypatch, {"room-a": [gate, {"roomId": "room-a"}]}, calls)
+
+    async def run():
+        job = await submit_job(r, "top3", "room-a")
+        workers = ReportJobWorkers(r, 1)
+        workers.start()
+        while not calls:
+            await asyncio.sleep(0.01)
+        await workers.stop()
+
+        # 정상 종료: 시도 횟수를 되돌리고 큐 앞쪽으로
+        status = await get_job(r, job.jobId)
+        assert status.status == "queued" and status.attempts == 0
+        assert await r.lrange(JOB_QUEUE_KEY, 0, -1) == [job.jobId]
+
+        workers = ReportJobWorkers(r, 1)
+        workers.start()
+        try:
+            assert (await wait_job(r, job.jobId, 5)).status == "done"
+        finally:
+            await workers.stop()
+
+    asyncio.run(run())
+
+
+def test_concurrent_submits_after_finished_job_enqueue_once(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    calls: List[str] = []
+    _fake_run(monkeypatch, {"room-a": [{"roomId": "room-a"}]}, calls)
+    execute = r.execute_command
+
+    async def interleaved(*args, **kwargs):
+        # fakeredis 는 명령마다 이벤트 루프에 양보하지 않으므로 실제 서버처럼 요청들이 섞이게 한다
+        await asyncio.sleep(0)
+        return await execute(*args, **kwargs)
+
+    monkeypatch.setattr(r, "execute_command", interleaved)
+
+    async def run():
+        first = await submit_job(r, "top3", "room-a")
+        await r.hset(JOB_KEY_FMT.format(jobId=first.jobId), "status", "done")
+        await r.lpop(JOB_QUEUE_KEY)
+
+        # 끝난 작업을 본 동시 요청들도 새 작업 하나에만 합류
+        jobs = await asyncio.gather(*[submit_job(r, "top3", "room-a") for _ in range(10)])
+        assert len({j.jobId for j in jobs}) == 1 and jobs[0].jobId != first.jobId
+        assert await r.lrange(JOB_QUEUE_KEY, 0, -1) == [jobs[0].jobId]
+
+        # 늦게 끝난 예전 작업은 새 작업의 활성 키를 지우지 않는다
+        h = await r.hgetall(JOB_KEY_FMT.format(jobId=first.jobId))
+        await report_jobs._finish(r, h, {"status": "done"}, JOB_PROCESSING_KEY_FMT.format(worker="w"))
+        assert (await submit_job(r, "top3", "room-a")).jobId == jobs[0].jobId
+
+    asyncio.run(run())
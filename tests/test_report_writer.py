@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from services import report_writer
+from services.report_writer import ReportWriter
+
+
+def _fake_save(monkeypatch, saved: List[Dict[str, Dict[str, Any]]], fail: List[bool]):
+    async def save(batch):
+        if fail and fail.pop(0):
+            raise RuntimeError("DB 연결 끊김")
+        saved.append(batch)
+        return 1
+
+    monkeypatch.setattr(report_writer, "save_report_rows", save)
+
+
+def test_save_now_takes_over_pending_rows(monkeypatch):
+    saved: List[Dict[str, Dict[str, Any]]] = []
+    _fake_save(monkeypatch, saved, [True, True, False])  # write 두 번 실패 → save_now 성공
+
+    async def run():
+        writer = ReportWriter(max_rows=100, flush_ms=1000)
+        # write-through 저장 실패는 GET 응답으로 번지지 않고 버퍼에 남는다
+        await writer.write("room-a", top3question=["예전"], popular_question=["슬라이드"])
+        await writer.write("room-b", top3question=["다른 방"])
+        assert not saved and set(writer._pending) == {"room-a", "room-b"}
+
+        # 배치 저장: 같은 방의 버퍼 값은 밑에 깔려 함께 저장되고 버퍼에서 빠진다
+        await writer.save_now({"room-a": {"top3question": ["배치"]}})
+        assert saved == [{"room-a": {"top3question": ["배치"], "popular_question": ["슬라이드"]}}]
+        assert set(writer._pending) == {"room-b"}
+
+    asyncio.run(run())
+
+
+def test_failed_save_now_restores_pending_rows(monkeypatch):
+    saved: List[Dict[str, Dict[str, Any]]] = []
+    _fake_save(monkeypatch, saved, [True])
+
+    async def run():
+        writer = ReportWriter(max_rows=100, flush_ms=1000)
+        writer._pending["room-a"] = {"top3question": ["예전"]}
+        with pytest.raises(RuntimeError):
+            await writer.save_now({"room-a": {"popular_question": ["배치"]}})
+        assert not saved
+        assert writer._pending == {"room-a": {"top3question": ["예전"]}}  # 다음 flush 에서 다시 저장
+
+    asyncio.run(run())
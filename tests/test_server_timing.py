@@ -0,0 +1,52 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from core.metrics import ServerTimingMiddleware, register_resource_collector, stage
+
+
+def _app() -> FastAPI:
+    app = FastAPI(root_path="/ai")
+    app.add_middleware(ServerTimingMiddleware, prefix="/report")
+
+    @app.get("/report/json")
+    async def json_route():
+        with stage("calc"):
+            pass
+        return {"ok": True}
+
+    @app.get("/report/stream")
+    async def stream_route():
+        with stage("calc"):
+            pass
+
+        async def body():
+            for i in range(3):
+                yield f'{{"i": {i}}}\n'
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"ok": True}
+
+    return app
+
+
+def test_server_timing_header_on_json_and_stream():
+    client = TestClient(_app())
+
+    res = client.get("/ai/report/json")
+    assert res.json() == {"ok": True}
+    assert res.headers["server-timing"].startswith("calc;dur=")
+
+    res = client.get("/ai/report/stream")
+    assert res.text.splitlines() == ['{"i": 0}', '{"i": 1}', '{"i": 2}']
+    assert "calc;dur=" in res.headers["server-timing"] and "total;dur=" in res.headers["server-timing"]
+
+    assert "server-timing" not in client.get("/ai/healthz").headers
+
+
+def test_resource_collector_registers_once():
+    register_resource_collector()
+    register_resource_collector()  # 재등록해도 중복 등록 오류 없음
@@ -0,0 +1,101 @@
+import asyncio
+
+from redis.asyncio import Redis
+
+from config.settings import settings
+from services import slide_index
+from services.question_fetch import question_key
+from services.question_reader import ROOM_QUESTIONS_KEY_FMT
+from services.slide_index import (
+    SLIDE_COUNTS_KEY_FMT, SLIDE_COUNTS_TOTAL_KEY_FMT, SLIDE_COUNTS_WM_KEY_FMT, SLIDE_ZSET_FMT,
+)
+from services import top_slide_script
+from services.top_slide_script import fetch_top_slide
+
+ROOM = "t-room"
+
+
+async def _write_question(r: Redis, qid: str, slide: int, ts: int) -> None:
+    # 외부 질문 서비스와 같은 키만 쓴다 (index_question 호출 없음)
+    pipe = r.pipeline(transaction=False)
+    pipe.zadd(ROOM_QUESTIONS_KEY_FMT.format(roomId=ROOM), {qid: ts})
+    pipe.zadd(SLIDE_ZSET_FMT.format(roomId=ROOM, slide=slide), {qid: ts})
+    pipe.hset(question_key(ROOM, qid), mapping={
+        "id": qid, "roomId": ROOM, "slide": slide, "audienceId": "a", "content": f"질문 {qid}", "ts": ts,
+    })
+    await pipe.execute()
+
+
+async def _index(r: Redis):
+    counts = await r.zrange(SLIDE_COUNTS_KEY_FMT.format(roomId=ROOM), 0, -1, withscores=True)
+    total = await r.get(SLIDE_COUNTS_TOTAL_KEY_FMT.format(roomId=ROOM))
+    return {int(s): int(c) for s, c in counts}, int(total)
+
+
+async def _index_ttls(r: Redis):
+    fmts = (SLIDE_COUNTS_KEY_FMT, SLIDE_COUNTS_TOTAL_KEY_FMT, SLIDE_COUNTS_WM_KEY_FMT)
+    return [await r.ttl(fmt.format(roomId=ROOM)) for fmt in fmts]
+
+
+def test_index_follows_writer_without_index_question(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    rebuilds = []
+    real_rebuild = slide_index.rebuild_slide_index
+
+    async def counting_rebuild(rr, room_id):
+        rebuilds.append(room_id)
+        return await real_rebuild(rr, room_id)
+
+    monkeypatch.setattr(slide_index, "rebuild_slide_index", counting_rebuild)
+
+    async def run():
+        ts = 1_000
+        for i in range(30):
+            await _write_question(r, f"q{i:03d}", 1 if i < 14 else 2 if i < 24 else 3, ts)
+            ts += 10
+
+        # 인덱스가 없으면 첫 조회 때 한 번만 SCAN 재구성
+        slide_no, count, rows = await fetch_top_slide(r, ROOM)
+        assert (slide_no, count, len(rows)) == (1, 14, 14)
+        assert len(rebuilds) == 1
+        assert all(0 < ttl <= settings.SLIDE_INDEX_TTL_SEC for ttl in await _index_ttls(r))
+
+        # 발표 중 질문 유입: 인덱스는 워터마크 이후 질문만 증분 반영 (재구성 없음)
+        for fmt in (SLIDE_COUNTS_KEY_FMT, SLIDE_COUNTS_TOTAL_KEY_FMT, SLIDE_COUNTS_WM_KEY_FMT):
+            await r.persist(fmt.format(roomId=ROOM))
+        for i in range(30, 45):
+            await _write_question(r, f"q{i:03d}", 2, ts)
+            ts += 10
+        slide_no, count, rows = await fetch_top_slide(r, ROOM)
+        assert (slide_no, count, len(rows)) == (2, 25, 25)
+        assert len(rebuilds) == 1
+        assert await _index(r) == ({1: 14, 2: 25, 3: 6}, 45)
+        assert all(0 < ttl <= settings.SLIDE_INDEX_TTL_SEC for ttl in await _index_ttls(r))  # 증분 반영도 만료 갱신
+
+        # 워터마크보다 이른 ts 로 들어온 질문은 증분으로 맞출 수 없으므로 재구성
+        await _write_question(r, "late", 3, 1_005)
+        await fetch_top_slide(r, ROOM)
+        assert len(rebuilds) == 2
+        assert await _index(r) == ({1: 14, 2: 25, 3: 7}, 46)
+
+    asyncio.run(run())
+
+
+def test_question_arriving_during_rebuild_still_returns_top_slide(redis_pair, monkeypatch):
+    r, _ = redis_pair
+    real_sync = slide_index.sync_slide_index
+
+    async def sync_then_write(rr, room_id):
+        # 인덱스를 맞춘 직후 외부 서비스가 질문을 하나 더 씀 → 재시도도 인덱스가 낡았다고 판단
+        await real_sync(rr, room_id)
+        await _write_question(r, "racer", 2, 9_999)
+
+    monkeypatch.setattr(top_slide_script, "sync_slide_index", sync_then_write)
+
+    async def run():
+        for i in range(50):
+            await _write_question(r, f"q{i:03d}", 1 if i < 30 else 2, 1_000 + i)
+        slide_no, count, rows = await fetch_top_slide(r, ROOM)
+        assert (slide_no, count, len(rows)) == (1, 30, 30)
+
+    asyncio.run(run())
@@ -0,0 +1,42 @@
+import numpy as np
+
+from benchmarks.synth_questions import generate_questions
+from services import text_sim as TS
+from services.top3_service import JACCARD_FALLBACK, _ClusterIndex, _prepare
+
+
+class _ScanIndex(_ClusterIndex):
+    # 역색인 없이 모든 클러스터를 자카드 상한으로만 거르는 기준 구현
+    def _jaccard_candidates(self, cur):
+        n = len(self)
+        a = len(cur.sh)
+        lo = np.minimum(self._shlen[:n], a)
+        hi = np.maximum(self._shlen[:n], a)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bound = np.where(hi == 0, 1.0, lo / hi)
+        return np.flatnonzero(bound >= JACCARD_FALLBACK)
+
+
+def _groups(index: _ClusterIndex):
+    return [(c.rep, c.count, sorted(c.ids), c.samples) for c in index.clusters]
+
+
+def test_jaccard_index_matches_full_scan():
+    qs = generate_questions(3000, room_id="t-room", seed=3, topics=200, noise_ratio=0.5)
+    norms = [TS.normalize(q.content) for q in qs]
+    # 서로 거의 직교하는 무작위 임베딩 → 의미 유사도로는 합류하지 않고 해밍/자카드 fallback 만 쓰인다
+    embs = np.random.default_rng(3).standard_normal((len(qs), 256)).astype(np.float32)
+    embs /= np.linalg.norm(embs, axis=1, keepdims=True)
+    items = _prepare(qs, norms, embs)
+
+    indexed, scanned = _ClusterIndex(dim=embs.shape[1]), _ScanIndex(dim=embs.shape[1])
+    indexed.fold(items)
+    scanned.fold(items)
+    assert _groups(indexed) == _groups(scanned)
+
+    # 상태에서 복원한 인덱스도 같은 역색인을 다시 만든다
+    restored = _ClusterIndex.from_state(*indexed.to_state(), dim=embs.shape[1])
+    more = _prepare(qs[:500], norms[:500], embs[:500])
+    for index in (restored, scanned):
+        index.fold(more)
+    assert _groups(restored) == _groups(scanned)
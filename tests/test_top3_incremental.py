@@ -0,0 +1,72 @@
+import asyncio
+import zlib
+from typing import List
+
+import numpy as np
+
+from benchmarks.synth_questions import generate_questions
+from config.settings import settings
+from loadtest.seed import seed_room
+from services import top3_service
+from services.question_reader import iter_room_questions, list_room_questions
+from services.top3_service import build_top3, build_top3_incremental, build_top3_many
+
+ROOM = "t-room"
+
+
+def _fake_embed(texts: List[str]) -> np.ndarray:
+    # 문자 bigram 해시 벡터 → 같은 주제 질문끼리 코사인이 높아 의미 유사도 합류가 일어난다
+    embs = np.zeros((len(texts), 128), dtype=np.float32)
+    for i, t in enumerate(texts):
+        for j in range(len(t) - 1):
+            embs[i, zlib.crc32(t[j:j + 2].encode("utf-8")) % 128] += 1.0
+    embs /= np.maximum(np.linalg.norm(embs, axis=1, keepdims=True), 1e-6)
+    return embs
+
+
+def _items(report):
+    return [(it.representative, it.count, sorted(it.questionIds), it.samples) for it in report.top3]
+
+
+def test_incremental_report_returns_complete_members(redis_pair, monkeypatch):
+    r, _ = redis_pair
+
+    async def no_write(room_id, **columns):
+        pass
+
+    monkeypatch.setattr(top3_service, "_embed_batch", _fake_embed)
+    monkeypatch.setattr(top3_service, "write_report", no_write)
+    monkeypatch.setattr(settings, "EMB_CACHE_REDIS", False)
+    # 상태에는 클러스터별 ID 5개 / 샘플 1개만 남긴다
+    monkeypatch.setattr(settings, "TOP3_STATE_MAX_IDS", 5)
+    monkeypatch.setattr(settings, "TOP3_STATE_MAX_SAMPLES", 1)
+    monkeypatch.setattr(settings, "READER_CHUNK_SIZE", 64)  # 방 전체를 여러 청크로 나눠 합류
+    monkeypatch.setattr(settings, "READER_PAGE_SIZE", 100)  # 페이지 경계에서 짧은 청크가 생겨도 같은 결과
+
+    qs = generate_questions(600, room_id=ROOM, seed=5)
+
+    async def run():
+        await seed_room(r, ROOM, qs[:500], index=False)
+
+        # 첫 계산(전체): build_top3 와 같은 응답 (상태 상한과 무관, 리스트/스트림/배치 입력 모두 같은 청크 순서)
+        full = await build_top3_incremental(ROOM)
+        questions = await list_room_questions(ROOM)
+        expected = await build_top3(ROOM, questions)
+        assert _items(full) == _items(expected)
+        assert _items(await build_top3(ROOM, iter_room_questions(ROOM))) == _items(expected)
+        assert _items((await build_top3_many({ROOM: questions}))[ROOM]) == _items(expected)
+        assert max(it.count for it in full.top3) > settings.TOP3_STATE_MAX_IDS
+
+        # 증분 반영 후에도 TOP3 그룹은 전체 ID 와 샘플을 돌려준다
+        await seed_room(r, ROOM, qs[500:], index=False)
+        inc = await build_top3_incremental(ROOM)
+        assert inc.totalQuestions == len(qs)
+        for it in inc.top3:
+            assert len(set(it.questionIds)) == it.count
+            assert it.samples[0] == it.representative
+        assert max(len(it.samples) for it in inc.top3) > settings.TOP3_STATE_MAX_SAMPLES
+
+        # 새 질문이 없을 때도 같은 응답
+        assert _items(await build_top3_incremental(ROOM)) == _items(inc)
+
+    asyncio.run(run())